@@ -1,13 +1,15 @@
 from flask import Flask, render_template, send_from_directory, jsonify, request
+import click
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import text
 import os
+import re
 import logging
 from datetime import datetime
 from config import (
     BASE_DIR, DATA_FOLDER, UPLOAD_FOLDER, EXPORT_FOLDER, 
-    AUDIO_FOLDER, LOG_LEVEL, LOG_FILE, HEALTH_CHECK_ENDPOINT
+    AUDIO_FOLDER, LOG_LEVEL, LOG_FILE, HEALTH_CHECK_ENDPOINT, PREWARM_RESUME_ON_START
 )
 
 # 配置日志
@@ -32,6 +34,9 @@ logger = logging.getLogger(__name__)
 # 初始化扩展
 from extensions import db
 
+# /cache/ 路由只提供 <分片>/<缓存键>.mp3
+_CACHE_FILE_PATTERN = re.compile(r'^([0-9a-f]{2})/(\1[0-9a-f]{38})\.mp3$')
+
 def create_app():
     app = Flask(__name__)
     CORS(app)
@@ -110,7 +115,24 @@ def create_app():
 
     @app.route('/cache/<path:filename>')
     def audio_files(filename):
-        return send_from_directory(AUDIO_FOLDER, filename)
+        # 只提供按内容寻址的音频文件（<分片>/<缓存键>.mp3），不暴露目录中的其他文件
+        match = _CACHE_FILE_PATTERN.match(filename)
+        if not match:
+            return jsonify({'error': '页面未找到'}), 404
+        from routes.api import audio_service, send_audio_file
+        try:
+            response = send_audio_file(os.path.join(AUDIO_FOLDER, filename))
+        except OSError:
+            return jsonify({'error': '页面未找到'}), 404
+        # 播放器按清单中的 URL 直接请求片段，命中记录供 LRU/LFU 淘汰使用
+        audio_service.cache.touch(match.group(2))
+        if audio_service.is_fallback_version(response.get_etag()[0]):
+            # 回退引擎的输出之后会在同一路径下被首选引擎重新合成，只能协商缓存
+            response.headers['Cache-Control'] = 'public, no-cache'
+        else:
+            # 缓存文件按内容寻址，同一路径的内容不再改变，可以长期缓存
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
 
     # 错误处理
     @app.errorhandler(404)
@@ -139,12 +161,39 @@ def create_app():
     with app.app_context():
         try:
             # 确保模型被导入以便SQLAlchemy可以发现它们
-            from models import Word
+            from models import Word, WordAudio, WordTombstone
             db.create_all()
+            # create_all 不会修改已存在的表，补建的列和索引由迁移完成
+            import migrations
+            migrations.run(db.engine)
+            from services import search_index
+            search_index.ensure()
             logger.info("数据库表创建成功")
         except Exception as e:
             logger.error(f"数据库表创建失败: {e}")
 
+    # 命令行：预生成整个词库的音频
+    @app.cli.command('prewarm-audio')
+    @click.option('--restart', is_flag=True, help='忽略上次的进度，从头开始')
+    def prewarm_audio_command(restart):
+        """预生成词库中全部单词的音频"""
+        from routes.api import prewarm_service
+        state = prewarm_service.run(app, restart=restart)
+        click.echo(f"预生成结束: {state.get('status')}, 新生成 {state.get('generated', 0)}, "
+                   f"已缓存 {state.get('cached', 0)}, 失败 {state.get('failed', 0)}")
+
+    # flask 命令行（如 prewarm-audio）也会调用 create_app，后台任务只在服务进程中启动：
+    # 命令行进程中的守护线程会随命令结束被杀死，还会留下刚刷新过心跳的任务锁，阻塞 web worker
+    if os.environ.get('FLASK_RUN_FROM_CLI') != 'true':
+        # 启动音频缓存的后台维护（访问记录落盘、容量淘汰）
+        from routes.api import cache_manager
+        cache_manager.start(app)
+
+        # 恢复因进程重启而中断的预生成任务
+        if PREWARM_RESUME_ON_START:
+            from routes.api import prewarm_service
+            prewarm_service.resume_if_interrupted(app)
+
     logger.info("应用初始化完成")
     return app
 
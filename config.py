@@ -6,10 +6,14 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Database Configuration
 SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', f"sqlite:///{os.path.join(BASE_DIR, 'data', 'words.db')}")
 SQLALCHEMY_TRACK_MODIFICATIONS = False
-SQLALCHEMY_ENGINE_OPTIONS = {
+# SQLite 文件不会断开连接，不需要 pre-ping；连接参数由 extensions 中的 connect 事件设置
+SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {
     'pool_pre_ping': True,
     'pool_recycle': 300,
 }
+SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000'))  # 等待写锁的最长时间（毫秒）
+SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', str(20 * 1024)))  # 每个连接的页缓存（KB）
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # 内存映射读取的大小（字节），0 关闭
 
 # Security
 SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -22,12 +26,32 @@ DATA_FOLDER = os.path.join(BASE_DIR, 'data')
 
 # File Upload Settings
 MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB (支持音乐文件上传)
-ALLOWED_EXTENSIONS = {'csv', 'json'}  # 单词导入格式
+ALLOWED_EXTENSIONS = {'csv', 'json', 'jsonl', 'ndjson'}  # 单词导入格式（JSON 支持数组和每行一个对象）
 ALLOWED_AUDIO_EXTENSIONS = {'mp3', 'wav', 'ogg', 'm4a', 'flac', 'aac'}  # 音乐上传格式
 MUSIC_FOLDER = os.path.join(BASE_DIR, 'uploads', 'music')
 
+# Word List Settings
+WORDS_PAGE_SIZE = int(os.environ.get('WORDS_PAGE_SIZE', '50'))  # 单词列表分页默认每页条数
+WORDS_MAX_PAGE_SIZE = int(os.environ.get('WORDS_MAX_PAGE_SIZE', '500'))  # 每页最大条数
+SYNC_TOMBSTONE_RETENTION = int(os.environ.get('SYNC_TOMBSTONE_RETENTION', str(30 * 24 * 60 * 60)))  # 删除记录保留时间（秒），更早的客户端需全量同步
+SYNC_WATERMARK_MARGIN = int(os.environ.get('SYNC_WATERMARK_MARGIN', '60'))  # 同步水位回退的秒数，覆盖 updated_at 写入到事务提交之间的时间
+
+# Import Settings
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '1000'))  # 批量导入每个事务插入的行数
+IMPORT_JOBS_FOLDER = os.path.join(DATA_FOLDER, 'import_jobs')  # 后台导入任务状态目录
+IMPORT_JOB_STALE_AFTER = int(os.environ.get('IMPORT_JOB_STALE_AFTER', '300'))  # 任务状态超过该秒数未更新视为进程已退出
+IMPORT_JOB_RETENTION = int(os.environ.get('IMPORT_JOB_RETENTION', str(7 * 24 * 60 * 60)))  # 已结束任务记录保留时间（秒）
+
 # Audio Settings
-AUDIO_CACHE_TIMEOUT = 24 * 60 * 60  # 24小时
+AUDIO_CACHE_MANIFEST = os.path.join(DATA_FOLDER, 'audio_manifest.db')  # 缓存清单（合成参数与访问索引），不能放在对外提供的缓存目录中
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))  # 容量预算，0 表示不限
+AUDIO_CACHE_MAX_AGE = int(os.environ.get('AUDIO_CACHE_MAX_AGE', str(30 * 24 * 60 * 60)))  # 未固定条目的最长空闲时间，0 表示不过期
+AUDIO_CACHE_EVICTION_POLICY = os.environ.get('AUDIO_CACHE_EVICTION_POLICY', 'lru')  # lru 或 lfu
+AUDIO_CACHE_EVICT_INTERVAL = int(os.environ.get('AUDIO_CACHE_EVICT_INTERVAL', '600'))  # 后台淘汰间隔（秒）
+AUDIO_FALLBACK_RERENDER_BATCH = int(os.environ.get('AUDIO_FALLBACK_RERENDER_BATCH', '20'))  # 每轮维护最多用首选引擎重新合成的回退音频数
+AUDIO_CACHE_ACCESS_FLUSH_INTERVAL = int(os.environ.get('AUDIO_CACHE_ACCESS_FLUSH_INTERVAL', '30'))  # 访问记录落盘间隔（秒）
+AUDIO_CACHE_MAINTENANCE_STALE_AFTER = int(os.environ.get('AUDIO_CACHE_MAINTENANCE_STALE_AFTER', '300'))  # 维护锁心跳超时（秒），超时由其他 worker 接管固定和淘汰
+AUDIO_RESOLVE_CACHE_SIZE = int(os.environ.get('AUDIO_RESOLVE_CACHE_SIZE', '16384'))  # 请求参数到缓存键的解析结果缓存条数
 DEFAULT_AUDIO_SPEED = 1.0
 DEFAULT_AUDIO_LANG = 'en'  # 默认英文
 
@@ -36,6 +60,44 @@ AUDIO_MAX_RETRIES = int(os.environ.get('AUDIO_MAX_RETRIES', '3'))
 AUDIO_RETRY_DELAY = int(os.environ.get('AUDIO_RETRY_DELAY', '2'))
 AUDIO_REQUEST_TIMEOUT = int(os.environ.get('AUDIO_REQUEST_TIMEOUT', '10'))
 
+# TTS Engine Settings
+# 按顺序尝试的引擎列表：gtts（在线）、espeak（离线，需要 espeak-ng 和 ffmpeg）、stub（静音，测试用）
+TTS_ENGINES = [e.strip() for e in os.environ.get('TTS_ENGINES', 'gtts').split(',') if e.strip()]
+ESPEAK_COMMAND = os.environ.get('ESPEAK_COMMAND', 'espeak-ng')
+ESPEAK_VOICES = {'en': 'en-us', 'zh': 'cmn'}
+FFMPEG_COMMAND = os.environ.get('FFMPEG_COMMAND', 'ffmpeg')
+
+# Spell Audio Settings
+# clips：字母片段本地拼接（字母只合成一次，停顿精确）；tts：整串字母交给TTS引擎合成
+SPELL_AUDIO_MODE = os.environ.get('SPELL_AUDIO_MODE', 'clips')
+SPELL_WORD_PAUSE = float(os.environ.get('SPELL_WORD_PAUSE', '1.0'))  # 多词拼读时单词之间的停顿（秒）
+# 请求中字母间停顿 spell_delay 的上限（秒），超出的值按上限处理；静音帧按时长分配内存，必须有界
+SPELL_DELAY_MAX = float(os.environ.get('SPELL_DELAY_MAX', '5'))
+
+# Meaning Audio Settings
+# segments：含义按逗号/换行切分，片段单独缓存后拼接；full：整段合成
+MEANING_AUDIO_MODE = os.environ.get('MEANING_AUDIO_MODE', 'segments')
+MEANING_SEGMENT_PAUSE = float(os.environ.get('MEANING_SEGMENT_PAUSE', '0.3'))  # 逗号处停顿（秒）
+MEANING_LINE_PAUSE = float(os.environ.get('MEANING_LINE_PAUSE', '0.8'))  # 换行处停顿（秒）
+MEANING_NORMALIZE_CACHE_SIZE = int(os.environ.get('MEANING_NORMALIZE_CACHE_SIZE', '8192'))  # 含义规范化结果的内存缓存条数
+
+# Audio Generation Lock Settings（跨 worker 单飞生成）
+AUDIO_LOCK_FOLDER = os.path.join(AUDIO_FOLDER, '.locks')
+AUDIO_LOCK_TIMEOUT = int(os.environ.get('AUDIO_LOCK_TIMEOUT', '120'))  # 等待其他进程生成的最长时间（秒）
+AUDIO_LOCK_STALE_AFTER = int(os.environ.get('AUDIO_LOCK_STALE_AFTER', '180'))  # 锁目录超过该时间视为崩溃遗留
+
+# Audio Prewarm Settings（词库音频预生成）
+PREWARM_STATE_FILE = os.path.join(DATA_FOLDER, 'prewarm_state.json')
+PREWARM_CONCURRENCY = int(os.environ.get('PREWARM_CONCURRENCY', '2'))  # 并发合成数
+PREWARM_RATE_LIMIT = float(os.environ.get('PREWARM_RATE_LIMIT', '2'))  # 每秒最多合成次数（仅限缓存未命中）
+PREWARM_BATCH_SIZE = int(os.environ.get('PREWARM_BATCH_SIZE', '20'))  # 每批处理的单词数
+PREWARM_SPELL_DELAYS = [float(d) for d in os.environ.get('PREWARM_SPELL_DELAYS', '0.5').split(',') if d.strip()]
+PREWARM_STALE_AFTER = int(os.environ.get('PREWARM_STALE_AFTER', '300'))  # 任务心跳超时（秒），超时视为进程已退出
+PREWARM_AFTER_IMPORT = os.environ.get('PREWARM_AFTER_IMPORT', 'true').lower() == 'true'
+PREWARM_RESUME_ON_START = os.environ.get('PREWARM_RESUME_ON_START', 'true').lower() == 'true'
+AUDIO_MANIFEST_MAX_WORDS = int(os.environ.get('AUDIO_MANIFEST_MAX_WORDS', '200'))  # 批量音频清单单次最多单词数
+REVIEW_BATCH_MAX_EVENTS = int(os.environ.get('REVIEW_BATCH_MAX_EVENTS', '1000'))  # 批量提交复习记录单次最多条数
+
 # Playback Settings
 DEFAULT_PLAY_INTERVAL = 2.0  # 默认播放间隔2秒
 MIN_PLAY_INTERVAL = 0.5
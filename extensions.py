@@ -1,3 +1,28 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import sqlite3
+from config import SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE, SQLITE_MMAP_SIZE
 
 db = SQLAlchemy()
+
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """每个新的 SQLite 连接设置 WAL、同步级别、锁等待和缓存
+
+    WAL 模式下读写互不阻塞，多个 worker 同时写入时等待 busy_timeout 而不是立即报 database is locked；
+    WAL 下 synchronous=NORMAL 仍能保证崩溃后数据库一致（只可能丢失最后提交的事务）。
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}')
+        cursor.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE}')
+        cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+    finally:
+        cursor.close()
@@ -8,6 +8,7 @@ import Toast from './components/Toast';
 import ErrorBoundary from './components/ErrorBoundary';
 import { useAppStore } from './store/appStore';
 import { wordApi } from './services/api';
+import { startReviewQueue } from './services/reviewQueue';
 import type { Statistics } from './types';
 
 function App() {
@@ -20,6 +21,9 @@ function App() {
     fetchWords();
   }, [fetchWords]);
 
+  // 复习记录批量提交：定时以及页面隐藏/关闭时提交
+  useEffect(() => startReviewQueue(), []);
+
   // Fetch statistics
   const fetchStats = async () => {
     try {
@@ -151,7 +151,7 @@ export default function Navbar({ onStatsUpdate }: NavbarProps) {
           <input
             ref={fileInputRef}
             type="file"
-            accept=".csv"
+            accept=".csv,.json,.jsonl,.ndjson"
             className="hidden"
             onChange={handleImport}
           />
@@ -1,7 +1,8 @@
 import { useEffect, useRef, useCallback } from 'react';
 import { useAppStore } from '../store/appStore';
 import { audioApi } from '../services/api';
-import type { Word } from '../types';
+import { enqueueReview } from '../services/reviewQueue';
+import type { Word, AudioManifestItem } from '../types';
 import {
   Play,
   Pause,
@@ -15,6 +16,9 @@ import AdvancedSettings from './AdvancedSettings';
 // 播放步骤类型
 type PlayStep = 'pronunciation' | 'spelling' | 'meaning' | 'complete' | 'waiting';
 
+// 每次向后端请求音频清单的单词数（当前单词及其后续单词）
+const MANIFEST_WINDOW = 5;
+
 export default function PlayerPanel() {
   const {
     words,
@@ -58,6 +62,9 @@ export default function PlayerPanel() {
   useEffect(() => { playbackConfigRef.current = playbackConfig; }, [playbackConfig]);
   useEffect(() => { wordsLengthRef.current = words.length; }, [words.length]);
 
+  // 音频清单：单词ID -> 各音频的内容寻址 URL，已就绪的音频直接按 URL 播放并预取
+  const manifestRef = useRef<Map<number, AudioManifestItem>>(new Map());
+
   // Wake Lock: 防止手机息屏中断播放
   const wakeLockRef = useRef<WakeLockSentinel | null>(null);
 
@@ -108,11 +115,11 @@ export default function PlayerPanel() {
     isProcessingRef.current = true;
 
     try {
-      const url = audioApi.getWordAudioUrl(
-        word.id,
-        spellMode,
-        playbackConfig.spellDelay
-      );
+      const manifest = manifestRef.current.get(word.id);
+      const clip = spellMode ? manifest?.spell : manifest?.word;
+      const url = clip?.ready
+        ? clip.url
+        : audioApi.getWordAudioUrl(word.id, spellMode, playbackConfig.spellDelay);
 
       if (audioRef.current) {
         audioRef.current.src = url;
@@ -143,6 +150,15 @@ export default function PlayerPanel() {
     }
 
     try {
+      // 含义音频已就绪时直接播放缓存文件
+      const clip = manifestRef.current.get(word.id)?.meaning;
+      if (clip?.ready && meaningAudioRef.current) {
+        isProcessingRef.current = true;
+        meaningAudioRef.current.src = clip.url;
+        await meaningAudioRef.current.play();
+        return;
+      }
+
       // 清洗含义文本，用于 TTS 朗读
       const plainMeaning = word.meaning
         .replace(/<[^>]+>/g, ' ')           // 去除 HTML 标签
@@ -285,7 +301,10 @@ export default function PlayerPanel() {
         playMainAudio(false);
       }, config.playInterval * 1000);
     } else {
-      // 循环次数完成，进入下一个单词
+      // 循环次数完成，记一次复习并进入下一个单词
+      if (currentWordRef.current) {
+        enqueueReview(currentWordRef.current.id);
+      }
       currentStepRef.current = 'complete';
       handleNextWord();
     }
@@ -371,6 +390,40 @@ export default function PlayerPanel() {
     };
   }, [isPlaying]);
 
+  // 获取当前及后续单词的音频清单：缺失的音频由后端在后台生成，已就绪的后续音频提前预取
+  useEffect(() => {
+    const upcoming = words.slice(currentWordIndex, currentWordIndex + MANIFEST_WINDOW);
+    if (upcoming.length === 0) return;
+    let cancelled = false;
+
+    audioApi.getManifest(upcoming.map((w) => w.id), {
+      spell: playbackConfig.spellMode,
+      spellDelay: playbackConfig.spellDelay,
+      meaning: playbackConfig.autoMeaning,
+    }).then((items) => {
+      if (cancelled) return;
+      const manifest = new Map<number, AudioManifestItem>();
+      for (const item of items) {
+        manifest.set(item.id, item);
+        if (item.id === upcoming[0].id) continue;
+        for (const clip of [item.word, item.spell, item.meaning]) {
+          if (clip?.ready) {
+            // 缓存文件为 immutable，预取后播放时直接命中浏览器缓存
+            fetch(clip.url).catch(() => { });
+          }
+        }
+      }
+      manifestRef.current = manifest;
+    }).catch(() => {
+      // 清单获取失败时回退到逐个请求单词音频
+      if (!cancelled) manifestRef.current = new Map();
+    });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [words, currentWordIndex, playbackConfig.spellMode, playbackConfig.spellDelay, playbackConfig.autoMeaning]);
+
   // 监听 isPlaying 和 currentWordIndex 变化
   useEffect(() => {
     // 同步更新 currentWordRef
@@ -2,6 +2,7 @@ import type { Word } from '../types';
 import { Play, Volume2, Check, Pencil, Trash2 } from 'lucide-react';
 import { useAppStore } from '../store/appStore';
 import { wordApi } from '../services/api';
+import { enqueueReview } from '../services/reviewQueue';
 import { showToast } from '../lib/utils';
 import { useState } from 'react';
 
@@ -18,14 +19,10 @@ export default function WordCard({ word, isActive, onPlay, onPlayPronunciation }
   const [editWord, setEditWord] = useState(word.word);
   const [editMeaning, setEditMeaning] = useState(word.meaning);
 
-  const handleMarkReviewed = async () => {
-    try {
-      await wordApi.markReviewed(word.id);
-      showToast('已标记为复习', 'success');
-      fetchWords();
-    } catch {
-      showToast('操作失败', 'error');
-    }
+  // 复习记录进入本地队列，由 reviewQueue 定时批量提交
+  const handleMarkReviewed = () => {
+    enqueueReview(word.id);
+    showToast('已标记为复习', 'success');
   };
 
   const handleDelete = async () => {
@@ -1,4 +1,4 @@
-import type { Word, Statistics } from '../types';
+import type { Word, Statistics, ReviewEvent, WordSync, AudioManifestItem, ImportJob } from '../types';
 import { API_BASE } from '../lib/utils';
 import { toast } from '../store/toastStore';
 
@@ -43,6 +43,25 @@ export const wordApi = {
     return fetchApi<Word[]>(url, undefined, '获取单词列表失败');
   },
 
+  // 全文检索（单词、含义、音标、例句），按相关度排序
+  async searchWords(q: string, language?: string): Promise<Word[]> {
+    const params = new URLSearchParams({ q });
+    if (language) params.set('language', language);
+    return fetchApi<Word[]>(`${API_BASE}/words/search?${params}`, undefined, '搜索单词失败');
+  },
+
+  // 增量同步：传入上次返回的 watermark，reset 为 true 时需用 data 全量替换本地数据
+  async syncWords(since?: string): Promise<WordSync> {
+    const url = since ? `${API_BASE}/words/sync?since=${encodeURIComponent(since)}` : `${API_BASE}/words/sync`;
+    const res = await fetch(url);
+    const data = await res.json();
+    if (!data.success) {
+      throw new Error(data.error || '同步单词失败');
+    }
+    // 同步结果除 data 外还包含 deleted / watermark / reset，不能经 fetchApi 只取 data
+    return data;
+  },
+
   // 添加单词
   async addWord(word: Partial<Word>): Promise<Word> {
     const res = await fetch(`${API_BASE}/words`, {
@@ -92,15 +111,18 @@ export const wordApi = {
     }
   },
 
-  // 标记复习
-  async markReviewed(id: number): Promise<void> {
-    const res = await fetch(`${API_BASE}/words/${id}/review`, { method: 'POST' });
-    const data = await res.json();
-    
-    if (!data.success) {
-      toast.error(data.error || '标记复习失败');
-      throw new Error(data.error);
-    }
+  // 批量提交复习记录（单个事务写入），返回写入条数和不存在的单词ID
+  // keepalive=true 时请求在页面关闭后仍会发出
+  async submitReviews(
+    events: ReviewEvent[],
+    keepalive: boolean = false
+  ): Promise<{ recorded: number; missing: number[] }> {
+    return fetchApi(`${API_BASE}/reviews`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ events }),
+      keepalive,
+    }, '提交复习记录失败');
   },
 
   // 获取统计
@@ -144,15 +166,28 @@ export const wordApi = {
         body: formData,
       });
       const data = await res.json();
-      
-      if (data.success) {
-        const count = parseInt(data.message.match(/\d+/)?.[0] || '0');
-        toast.success(`成功导入 ${count} 个单词`);
-        return count;
-      } else {
+      if (!data.success) {
         toast.error(data.error || '导入失败');
         throw new Error(data.error);
       }
+
+      // 导入在后台执行，轮询任务进度直到结束
+      let job: ImportJob = data.data;
+      while (job.status === 'pending' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        const poll = await fetch(`${API_BASE}/import/jobs/${job.id}`);
+        const pollData = await poll.json();
+        if (!pollData.success) {
+          throw new Error(pollData.error);
+        }
+        job = pollData.data;
+      }
+
+      if (job.status !== 'completed') {
+        throw new Error(job.error || '导入未完成');
+      }
+      toast.success(`成功导入 ${job.inserted} 个单词`);
+      return job.inserted;
     } catch (error) {
       toast.error('导入失败');
       throw error;
@@ -201,4 +236,26 @@ export const audioApi = {
       // 不显示 toast，因为含义播放失败不应该打断用户体验
     }
   },
+
+  // 批量获取播放列表的音频清单，缺失的音频由后端在后台生成
+  async getManifest(
+    wordIds: number[],
+    options: { spell?: boolean; spellDelay?: number; meaning?: boolean } = {}
+  ): Promise<AudioManifestItem[]> {
+    const res = await fetch(`${API_BASE}/audio/manifest`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        word_ids: wordIds,
+        spell: options.spell ?? true,
+        spell_delay: options.spellDelay ?? 0.5,
+        meaning: options.meaning ?? true,
+      }),
+    });
+    const data = await res.json();
+    if (!data.success) {
+      throw new Error(data.error);
+    }
+    return data.data;
+  },
 };
@@ -0,0 +1,81 @@
+import type { ReviewEvent } from '../types';
+import { wordApi } from './api';
+
+// 复习记录先在本地排队，再通过 /api/reviews 批量提交，避免每次复习单独发请求
+const STORAGE_KEY = 'pte-review-queue';
+const FLUSH_INTERVAL_MS = 15000;  // 定时提交间隔
+const FLUSH_THRESHOLD = 50;       // 队列达到该条数时立即提交
+const BATCH_SIZE = 200;           // 单次请求条数，keepalive 请求体上限 64KB
+
+// 从 localStorage 读取上次未提交的记录（页面关闭前未发出的复习不丢失）
+const loadQueue = (): ReviewEvent[] => {
+  try {
+    const saved = localStorage.getItem(STORAGE_KEY);
+    return saved ? JSON.parse(saved) : [];
+  } catch {
+    return [];
+  }
+};
+
+let queue: ReviewEvent[] = loadQueue();
+let flushing: Promise<void> | null = null;
+
+const persist = () => {
+  try {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify(queue));
+  } catch { /* 存储已满时静默 */ }
+};
+
+// 记录一次复习；grade 为回答质量 0-5，省略时由后端按 4 处理
+export const enqueueReview = (wordId: number, grade?: number) => {
+  const event: ReviewEvent = { word_id: wordId, reviewed_at: new Date().toISOString() };
+  if (grade !== undefined) event.grade = grade;
+  queue.push(event);
+  persist();
+  if (queue.length >= FLUSH_THRESHOLD) {
+    void flushReviews();
+  }
+};
+
+// 分批提交队列中的记录；提交失败的批次保留在队列中等待下次重试
+export const flushReviews = (keepalive: boolean = false): Promise<void> => {
+  if (flushing) return flushing;
+  flushing = (async () => {
+    try {
+      while (queue.length > 0) {
+        const batch = queue.slice(0, BATCH_SIZE);
+        await wordApi.submitReviews(batch, keepalive);
+        // 提交期间可能有新记录入队，只移除已发送的部分
+        queue = queue.slice(batch.length);
+        persist();
+      }
+    } catch (error) {
+      console.error('提交复习记录失败:', error);
+    } finally {
+      flushing = null;
+    }
+  })();
+  return flushing;
+};
+
+// 启动定时提交，并在页面隐藏或关闭时用 keepalive 请求提交剩余记录；返回停止函数
+export const startReviewQueue = (): (() => void) => {
+  const onHidden = () => {
+    if (document.visibilityState === 'hidden') {
+      void flushReviews(true);
+    }
+  };
+  const onPageHide = () => {
+    void flushReviews(true);
+  };
+  const interval = setInterval(() => void flushReviews(), FLUSH_INTERVAL_MS);
+  document.addEventListener('visibilitychange', onHidden);
+  window.addEventListener('pagehide', onPageHide);
+  void flushReviews();
+
+  return () => {
+    clearInterval(interval);
+    document.removeEventListener('visibilitychange', onHidden);
+    window.removeEventListener('pagehide', onPageHide);
+  };
+};
@@ -8,10 +8,20 @@ export interface Word {
   difficulty: number;
   review_count: number;
   last_reviewed: string | null;
+  ease_factor?: number;
+  interval_days?: number;
+  repetitions?: number;
+  due_at?: string | null;
   created_at: string;
   updated_at: string;
 }
 
+export interface ReviewEvent {
+  word_id: number;
+  reviewed_at?: string;
+  grade?: number;
+}
+
 export interface Statistics {
   total_words: number;
   reviewed_words: number;
@@ -20,6 +30,39 @@ export interface Statistics {
   chinese_words: number;
 }
 
+export interface WordSync {
+  data: Word[];
+  deleted: number[];
+  watermark: string;
+  reset: boolean;
+}
+
+export interface AudioClip {
+  key: string;
+  url: string;
+  ready: boolean;
+  duration: number | null;
+}
+
+export interface AudioManifestItem {
+  id: number;
+  word: AudioClip | null;
+  spell: AudioClip | null;
+  meaning: AudioClip | null;
+}
+
+export interface ImportJob {
+  id: string;
+  filename: string;
+  status: 'pending' | 'running' | 'completed' | 'cancelled' | 'failed' | 'interrupted';
+  total: number;
+  inserted: number;
+  duplicate: number;
+  invalid: number;
+  rows_per_second: number;
+  error: string | null;
+}
+
 export interface PlaybackConfig {
   wordRepeat: number;
   enableWordRepeat: boolean;
@@ -0,0 +1,84 @@
+"""主数据库结构迁移
+
+db.create_all() 只创建不存在的表，不会给已有的表补建列和索引。
+迁移按 PRAGMA user_version 逐级执行，第 N 项把版本从 N 升级到 N+1。
+新建的数据库由 create_all 直接建出最新结构，因此每一步都必须幂等（先检查列或索引是否已存在）。
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _add_column(conn, table, name, definition):
+    """列不存在时添加"""
+    if name not in _columns(conn, table):
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+
+def _v1_word_indexes(conn):
+    """单词表索引：列表分页、增量同步和按语言过滤/统计"""
+    for statement in (
+        'CREATE INDEX IF NOT EXISTS idx_words_created_id ON words (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS idx_words_updated_at ON words (updated_at)',
+        'CREATE INDEX IF NOT EXISTS idx_words_language_created ON words (language, created_at, id)',
+        'CREATE INDEX IF NOT EXISTS idx_words_language_review ON words (language, review_count)',
+    ):
+        conn.execute(statement)
+
+
+def _v2_review_schedule(conn):
+    """间隔重复调度字段；已复习过的单词从上次复习的次日起到期，未复习的立即到期"""
+    _add_column(conn, 'words', 'ease_factor', 'FLOAT DEFAULT 2.5')
+    _add_column(conn, 'words', 'interval_days', 'FLOAT DEFAULT 0')
+    _add_column(conn, 'words', 'repetitions', 'INTEGER DEFAULT 0')
+    _add_column(conn, 'words', 'due_at', 'DATETIME')
+    conn.execute(
+        "UPDATE words SET due_at = CASE WHEN last_reviewed IS NULL"
+        " THEN COALESCE(created_at, datetime('now'))"
+        " ELSE datetime(last_reviewed, '+1 day') END"
+        " WHERE due_at IS NULL"
+    )
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_words_due_at ON words (due_at)')
+
+
+def _v3_drop_review_index(conn):
+    """删除 (review_count, last_reviewed) 索引：复习队列已改用 due_at，它只会增加每次复习的写入"""
+    conn.execute('DROP INDEX IF EXISTS idx_words_review')
+
+
+MIGRATIONS = [
+    _v1_word_indexes,
+    _v2_review_schedule,
+    _v3_drop_review_index,
+]
+
+
+def run(engine):
+    """执行未应用的迁移，返回迁移后的版本；非 SQLite 数据库不处理"""
+    if engine.dialect.name != 'sqlite':
+        return None
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        # 立即加写锁，避免多个 worker 同时迁移
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {target}')
+                logger.info(f"数据库已迁移到版本 {target}: {migration.__doc__}")
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return max(version, len(MIGRATIONS))
+    finally:
+        conn.isolation_level = isolation_level
+        raw.close()
@@ -4,6 +4,17 @@ from extensions import db
 class Word(db.Model):
     """单词数据模型"""
     __tablename__ = 'words'
+    __table_args__ = (
+        # 单词列表按 (created_at, id) 倒序做游标分页
+        db.Index('idx_words_created_id', 'created_at', 'id'),
+        # 增量同步按 updated_at 查询变更
+        db.Index('idx_words_updated_at', 'updated_at'),
+        # 按语言过滤的列表；按语言统计总数和已复习数（覆盖索引）
+        db.Index('idx_words_language_created', 'language', 'created_at', 'id'),
+        db.Index('idx_words_language_review', 'language', 'review_count'),
+        # 待复习队列：due_at <= 当前时间 的范围查询
+        db.Index('idx_words_due_at', 'due_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     word = db.Column(db.String(100), nullable=False, index=True)
@@ -14,20 +25,92 @@ class Word(db.Model):
     difficulty = db.Column(db.Integer, default=1)  # 难度等级 1-5
     review_count = db.Column(db.Integer, default=0)  # 复习次数
     last_reviewed = db.Column(db.DateTime)  # 最后复习时间
+    ease_factor = db.Column(db.Float, default=2.5)  # SM-2 难度系数
+    interval_days = db.Column(db.Float, default=0)  # 当前复习间隔（天）
+    repetitions = db.Column(db.Integer, default=0)  # 连续记住的次数
+    due_at = db.Column(db.DateTime, default=datetime.utcnow)  # 下次复习时间
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    def to_dict(self, fields=None):
+        """序列化为字典；fields 指定只输出的字段（未加载的列不会被访问）"""
+        return {field: WORD_FIELDS[field](self) for field in (fields or WORD_FIELDS)}
+
+
+# 可序列化字段及其取值方式，顺序即默认输出顺序
+WORD_FIELDS = {
+    'id': lambda w: w.id,
+    'word': lambda w: w.word,
+    'meaning': lambda w: w.meaning,
+    'phonetic': lambda w: w.phonetic,
+    'example': lambda w: w.example,
+    'language': lambda w: w.language,
+    'difficulty': lambda w: w.difficulty,
+    'review_count': lambda w: w.review_count,
+    'last_reviewed': lambda w: w.last_reviewed.isoformat() if w.last_reviewed else None,
+    'ease_factor': lambda w: w.ease_factor,
+    'interval_days': lambda w: w.interval_days,
+    'repetitions': lambda w: w.repetitions,
+    'due_at': lambda w: w.due_at.isoformat() if w.due_at else None,
+    'created_at': lambda w: w.created_at.isoformat(),
+    'updated_at': lambda w: w.updated_at.isoformat(),
+}
+
+
+class WordAudio(db.Model):
+    """单词音频元数据：每个单词的发音、拼读、含义音频的缓存键、时长、大小和生成状态"""
+    __tablename__ = 'word_audio'
+    __table_args__ = (
+        db.UniqueConstraint('word_id', 'variant', 'spell_delay', name='uq_word_audio_variant'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    word_id = db.Column(db.Integer, db.ForeignKey('words.id', ondelete='CASCADE'), nullable=False, index=True)
+    variant = db.Column(db.String(20), nullable=False)  # word=发音, spell=拼读, meaning=含义
+    spell_delay = db.Column(db.Float, nullable=False, default=0.0)  # 仅拼读音频使用
+    audio_key = db.Column(db.String(40))  # 音频缓存键
+    duration = db.Column(db.Float)  # 时长（秒）
+    size = db.Column(db.Integer)  # 文件大小（字节）
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending / ready / failed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'variant': self.variant,
+            'spell_delay': self.spell_delay,
+            'audio_key': self.audio_key,
+            'duration': self.duration,
+            'size': self.size,
+            'status': self.status,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class WordTombstone(db.Model):
+    """已删除单词的墓碑记录，供增量同步通知客户端删除"""
+    __tablename__ = 'word_tombstones'
+
+    word_id = db.Column(db.Integer, primary_key=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class ReviewLog(db.Model):
+    """复习历史（只追加）：每次回答一行，保留完整的复习记录而不只是最后一次复习时间"""
+    __tablename__ = 'review_logs'
+    __table_args__ = (
+        db.Index('idx_review_logs_word_time', 'word_id', 'reviewed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    word_id = db.Column(db.Integer, db.ForeignKey('words.id', ondelete='CASCADE'), nullable=False)
+    reviewed_at = db.Column(db.DateTime, nullable=False)  # 客户端记录的复习时间（UTC）
+    grade = db.Column(db.Integer, nullable=False)  # 回答质量 0-5
+    interval_days = db.Column(db.Float)  # 本次复习后安排的间隔（天），未参与调度的迟到记录为空
+
     def to_dict(self):
         return {
-            'id': self.id,
-            'word': self.word,
-            'meaning': self.meaning,
-            'phonetic': self.phonetic,
-            'example': self.example,
-            'language': self.language,
-            'difficulty': self.difficulty,
-            'review_count': self.review_count,
-            'last_reviewed': self.last_reviewed.isoformat() if self.last_reviewed else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'word_id': self.word_id,
+            'reviewed_at': self.reviewed_at.isoformat(),
+            'grade': self.grade,
+            'interval_days': self.interval_days
         }
@@ -1,34 +1,219 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, current_app
+from werkzeug.wsgi import wrap_file
 from services.word_service import WordService
-from services.audio_service import AudioService
+from services.audio_service import AudioService, audio_etag
 from services.export_service import ExportService
-from config import UPLOAD_FOLDER
+from services.prewarm_service import PrewarmService
+from services.cache_manager import AudioCacheManager
+from services.import_job_service import ImportJobService
+from services.word_audio_service import WordAudioService
+from services import scheduler
+from config import AUDIO_MANIFEST_MAX_WORDS, WORDS_PAGE_SIZE, WORDS_MAX_PAGE_SIZE, REVIEW_BATCH_MAX_EVENTS, SPELL_DELAY_MAX
+from models import WORD_FIELDS
 import os
+import math
+import time
+from datetime import datetime, timezone
+import hashlib
 import logging
+import threading
 
 api_bp = Blueprint('api', __name__)
 word_service = WordService()
 audio_service = AudioService()
 export_service = ExportService()
+word_audio_service = WordAudioService(audio_service)
+prewarm_service = PrewarmService(audio_service, word_audio_service)
+cache_manager = AudioCacheManager(audio_service, word_audio_service)
+import_job_service = ImportJobService(word_service, prewarm_service)
 logger = logging.getLogger(__name__)
 
+# 音乐文件内容哈希缓存: 路径 -> ((mtime_ns, size), etag)
+_music_etags = {}
+_music_etags_lock = threading.Lock()
+
+
+def send_audio_file(audio_path, cache_control='public, no-cache'):
+    """发送缓存音频：以缓存键和文件修改时间作为强 ETag，支持 304 和 Range 请求
+
+    打开文件后只做一次 fstat，大小、修改时间和 ETag 都取自这一次的结果
+    （send_file 按路径发送时会自己再 stat 一次）。文件不存在时抛出 FileNotFoundError。
+    单词被编辑后接口对应的键会变化，回退引擎生成的音频也会在原键下被重新合成，
+    所以 API 接口默认要求浏览器每次用 ETag 重新验证（命中时只返回 304）。
+    """
+    f = open(audio_path, 'rb')
+    try:
+        stat = os.fstat(f.fileno())
+        response = current_app.response_class(
+            wrap_file(request.environ, f), mimetype='audio/mp3', direct_passthrough=True
+        )
+        response.call_on_close(f.close)
+        response.content_length = stat.st_size
+        response.last_modified = stat.st_mtime
+        response.set_etag(audio_etag(audio_path, stat))
+        response.headers['Cache-Control'] = cache_control
+        return response.make_conditional(request.environ, accept_ranges=True, complete_length=stat.st_size)
+    except Exception:
+        f.close()
+        raise
+
+
+def _send_cached_audio(resolved, started):
+    """缓存命中的快速路径：按预先解析的缓存键直接发送文件，只做一次 fstat
+
+    resolved 为 (缓存键, 缓存路径)，文件不存在时返回 None，由调用方走生成流程。
+    """
+    if not resolved:
+        return None
+    audio_key, audio_path = resolved
+    try:
+        response = send_audio_file(audio_path)
+    except FileNotFoundError:
+        return None
+    audio_service.cache.touch(audio_key)
+    return _with_timing(response, 'hit', started)
+
+
+def _with_timing(response, outcome, started):
+    """附加缓存命中情况和服务端耗时（Server-Timing，可在浏览器开发者工具中查看）"""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    response.headers['X-Audio-Cache'] = outcome.upper()
+    response.headers['Server-Timing'] = f'audio;desc="{outcome}";dur={elapsed_ms:.3f}'
+    return response
+
+
+def _music_etag(filepath):
+    """音乐文件的内容哈希（文件未变化时复用上次的结果）"""
+    stat = os.stat(filepath)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _music_etags_lock:
+        cached = _music_etags.get(filepath)
+    if cached and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    etag = digest.hexdigest()
+    with _music_etags_lock:
+        _music_etags[filepath] = (signature, etag)
+    return etag
+
 # ==================== 单词管理 API ====================
 
 @api_bp.route('/words', methods=['GET'])
 def get_words():
-    """获取单词列表"""
+    """获取单词列表
+
+    不带分页参数时返回全部单词（兼容旧版前端）；带 limit、cursor 或 fields 时按游标分页：
+    limit 每页条数，cursor 上一页返回的 next_cursor，fields 逗号分隔的输出字段，
+    过滤参数 language、difficulty（可逗号分隔多个）、reviewed（true/false）、q（按单词或含义搜索）。
+    """
     try:
         language = request.args.get('language')  # 可选的语言过滤
-        words = word_service.get_all_words(language)
+        args = request.args
+        if not any(name in args for name in ('limit', 'cursor', 'fields', 'difficulty', 'reviewed', 'q')):
+            words = word_service.get_all_words(language)
+            return jsonify({
+                'success': True,
+                'data': [word.to_dict() for word in words],
+                'count': len(words)
+            })
+
+        fields = None
+        if args.get('fields'):
+            fields = [name.strip() for name in args['fields'].split(',') if name.strip()]
+            unknown = [name for name in fields if name not in WORD_FIELDS]
+            if unknown:
+                return jsonify({'success': False, 'error': f'未知字段: {", ".join(unknown)}'}), 400
+
+        try:
+            limit = min(max(int(args.get('limit', WORDS_PAGE_SIZE)), 1), WORDS_MAX_PAGE_SIZE)
+            difficulty = [int(d) for d in args['difficulty'].split(',')] if args.get('difficulty') else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit 和 difficulty 必须是整数'}), 400
+        reviewed = args.get('reviewed')
+        reviewed = None if reviewed is None else reviewed.lower() == 'true'
+
+        try:
+            words, next_cursor = word_service.list_words(
+                language=language,
+                difficulty=difficulty,
+                reviewed=reviewed,
+                search=args.get('q', '').strip() or None,
+                cursor=args.get('cursor'),
+                limit=limit,
+                fields=fields
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
         return jsonify({
             'success': True,
-            'data': [word.to_dict() for word in words],
-            'count': len(words)
+            'data': [word.to_dict(fields) for word in words],
+            'count': len(words),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
     except Exception as e:
         logger.error(f"获取单词列表失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@api_bp.route('/words/search', methods=['GET'])
+def search_words():
+    """全文检索单词（单词、含义、音标、例句），按相关度排序"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'success': False, 'error': '请提供搜索关键词 q'}), 400
+        try:
+            limit = min(max(int(request.args.get('limit', WORDS_PAGE_SIZE)), 1), WORDS_MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit 必须是整数'}), 400
+        fields = None
+        if request.args.get('fields'):
+            fields = [name.strip() for name in request.args['fields'].split(',') if name.strip()]
+            unknown = [name for name in fields if name not in WORD_FIELDS]
+            if unknown:
+                return jsonify({'success': False, 'error': f'未知字段: {", ".join(unknown)}'}), 400
+
+        words = word_service.search_words(query, request.args.get('language'), limit, fields)
+        return jsonify({
+            'success': True,
+            'data': [word.to_dict(fields) for word in words]
+        })
+    except Exception as e:
+        logger.error(f"搜索单词失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api_bp.route('/words/sync', methods=['GET'])
+def sync_words():
+    """增量同步：since 为上次返回的 watermark，返回之后变更的单词和删除的单词ID"""
+    try:
+        since = request.args.get('since')
+        try:
+            since = _parse_utc(since) if since else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'since 必须是 ISO 格式时间'}), 400
+        fields = None
+        if request.args.get('fields'):
+            fields = [name.strip() for name in request.args['fields'].split(',') if name.strip()]
+            unknown = [name for name in fields if name not in WORD_FIELDS]
+            if unknown:
+                return jsonify({'success': False, 'error': f'未知字段: {", ".join(unknown)}'}), 400
+
+        changes = word_service.get_changes(since, fields)
+        return jsonify({
+            'success': True,
+            'data': [word.to_dict(fields) for word in changes['words']],
+            'deleted': changes['deleted'],
+            'watermark': changes['watermark'].isoformat(),
+            'reset': changes['reset']
+        })
+    except Exception as e:
+        logger.error(f"同步单词失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @api_bp.route('/words', methods=['POST'])
 def add_word():
     """添加新单词"""
@@ -66,6 +251,13 @@ def update_word(word_id):
     """更新单词"""
     try:
         data = request.json
+        existing = word_service.get_word(word_id)
+        if not existing:
+            return jsonify({'success': False, 'error': '单词未找到'}), 404
+        # 修改前记录旧音频，文本变化时在后台清理并重新生成
+        before = (existing.word, existing.meaning, existing.language)
+        stale = (word_audio_service.audio_keys(existing), existing.word, existing.meaning)
+
         updated_word = word_service.update_word(
             word_id,
             word=data.get('word'),
@@ -77,6 +269,8 @@ def update_word(word_id):
         )
         
         if updated_word:
+            if (updated_word.word, updated_word.meaning, updated_word.language) != before:
+                prewarm_service.refresh_words(current_app._get_current_object(), [word_id], stale)
             return jsonify({
                 'success': True,
                 'data': updated_word.to_dict(),
@@ -92,8 +286,12 @@ def update_word(word_id):
 def delete_word(word_id):
     """删除单词"""
     try:
+        existing = word_service.get_word(word_id)
+        stale = (word_audio_service.audio_keys(existing), existing.word, existing.meaning) if existing else None
         success = word_service.delete_word(word_id)
         if success:
+            # 在后台清理不再被其他单词使用的音频
+            prewarm_service.refresh_words(current_app._get_current_object(), stale=stale)
             return jsonify({'success': True, 'message': '单词删除成功'})
         else:
             return jsonify({'success': False, 'error': '单词未找到'}), 404
@@ -103,9 +301,13 @@ def delete_word(word_id):
 
 @api_bp.route('/words/<int:word_id>/review', methods=['POST'])
 def mark_word_reviewed(word_id):
-    """标记单词为已复习"""
+    """标记单词为已复习，可选 grade（0-5，回答质量）用于安排下次复习"""
     try:
-        success = word_service.mark_reviewed(word_id)
+        data = request.get_json(silent=True) or {}
+        grade = data.get('grade', scheduler.DEFAULT_GRADE)
+        if not isinstance(grade, int) or isinstance(grade, bool) or grade not in scheduler.GRADES:
+            return jsonify({'success': False, 'error': 'grade 必须是 0-5 的整数'}), 400
+        success = word_service.mark_reviewed(word_id, grade)
         if success:
             return jsonify({'success': True, 'message': '复习标记成功'})
         else:
@@ -114,9 +316,57 @@ def mark_word_reviewed(word_id):
         logger.error(f"标记复习失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@api_bp.route('/reviews', methods=['POST'])
+def record_reviews():
+    """批量提交复习记录：{"events": [{"word_id", "reviewed_at"（ISO 时间，可选）, "grade"（0-5，可选）}]}
+
+    播放器可以在本地累积复习记录后一次提交，整批在单个事务中写入。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        events = data.get('events')
+        if not isinstance(events, list) or not events:
+            return jsonify({'success': False, 'error': '请提供复习记录 events'}), 400
+        if len(events) > REVIEW_BATCH_MAX_EVENTS:
+            return jsonify({'success': False, 'error': f'单次最多提交 {REVIEW_BATCH_MAX_EVENTS} 条复习记录'}), 400
+
+        now = datetime.utcnow()
+        parsed = []
+        for index, event in enumerate(events):
+            if not isinstance(event, dict) or not isinstance(event.get('word_id'), int):
+                return jsonify({'success': False, 'error': f'第 {index + 1} 条记录缺少 word_id'}), 400
+            grade = event.get('grade', scheduler.DEFAULT_GRADE)
+            if not isinstance(grade, int) or isinstance(grade, bool) or grade not in scheduler.GRADES:
+                return jsonify({'success': False, 'error': f'第 {index + 1} 条记录的 grade 必须是 0-5 的整数'}), 400
+            try:
+                reviewed_at = _parse_utc(event['reviewed_at']) if event.get('reviewed_at') is not None else now
+            except ValueError:
+                return jsonify({'success': False, 'error': f'第 {index + 1} 条记录的 reviewed_at 必须是 ISO 格式时间'}), 400
+            # 客户端时钟可能偏快，不接受未来的时间
+            parsed.append((event['word_id'], min(reviewed_at, now), grade))
+
+        result = word_service.record_reviews(parsed)
+        if result is None:
+            return jsonify({'success': False, 'error': '记录复习失败'}), 500
+        return jsonify({'success': True, 'data': result})
+    except Exception as e:
+        logger.error(f"批量记录复习失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api_bp.route('/words/<int:word_id>/reviews', methods=['GET'])
+def get_review_history(word_id):
+    """单词的复习历史，最近的在前"""
+    try:
+        limit = min(max(request.args.get('limit', 100, type=int), 1), REVIEW_BATCH_MAX_EVENTS)
+        logs = word_service.get_review_history(word_id, limit)
+        return jsonify({'success': True, 'data': [log.to_dict() for log in logs]})
+    except Exception as e:
+        logger.error(f"获取复习历史失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @api_bp.route('/words/review', methods=['GET'])
 def get_words_for_review():
-    """获取需要复习的单词"""
+    """获取已到期需要复习的单词，最早到期的在前"""
     try:
         limit = request.args.get('limit', 10, type=int)
         words = word_service.get_words_for_review(limit)
@@ -134,30 +384,33 @@ def get_words_for_review():
 @api_bp.route('/words/<int:word_id>/audio', methods=['GET'])
 def get_word_audio(word_id):
     """获取单词音频"""
+    started = time.perf_counter()
     try:
         word = word_service.get_word(word_id)
         if not word:
             return jsonify({'success': False, 'error': '单词未找到'}), 404
         
         spell_mode = request.args.get('spell', 'false').lower() == 'true'
-        spell_delay = float(request.args.get('spell_delay', 0.5))  # Default 0.5s
+        try:
+            spell_delay = _parse_spell_delay(request.args.get('spell_delay', 0.5))  # Default 0.5s
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        # 快速路径：缓存命中时不做文本处理，也不加载 TTS 引擎
+        resolved = audio_service.resolve_audio(word.word, word.language, spell_mode, spell_delay)
+        response = _send_cached_audio(resolved[1:] if resolved else None, started)
+        if response:
+            return response
         
         logger.info(f"请求音频: word_id={word_id}, spell_mode={spell_mode}, spell_delay={spell_delay}, word={word.word}")
         
         audio_path = audio_service.generate_audio(word.word, word.language, spell_mode, spell_delay)
         
-        if audio_path and os.path.exists(audio_path):
-            file_size = os.path.getsize(audio_path)
-            if file_size > 100:  # 确保文件不是空的
-                logger.info(f"返回音频文件: {audio_path}, 大小: {file_size}")
-                
-                # 添加缓存控制头
-                response = send_file(audio_path, mimetype='audio/mp3')
-                response.headers['Cache-Control'] = 'public, max-age=86400'  # 缓存24小时
-                return response
-            else:
-                logger.error(f"音频文件为空: {audio_path}, 大小: {file_size}")
-                return jsonify({'success': False, 'error': '音频文件为空，生成可能失败'}), 500
+        if audio_path:
+            # 生成流程已校验过文件大小；ETag 为缓存键，浏览器重新验证时直接返回 304
+            logger.info(f"返回音频文件: {audio_path}")
+            word_audio_service.refresh([word], [spell_delay] if spell_mode else None)
+            return _with_timing(send_audio_file(audio_path), 'miss', started)
         else:
             logger.error(f"音频生成失败: word_id={word_id}, audio_path={audio_path}")
             return jsonify({'success': False, 'error': '音频生成失败，可能是网络连接问题或API错误'}), 500
@@ -167,18 +420,38 @@ def get_word_audio(word_id):
         logger.error(f"详细信息: {traceback.format_exc()}")
         return jsonify({'success': False, 'error': f'生成音频时出错: {str(e)}'}), 500
 
+@api_bp.route('/words/<int:word_id>/audio-info', methods=['GET'])
+def get_word_audio_info(word_id):
+    """获取单词各音频变体的缓存键、时长、大小和生成状态"""
+    try:
+        word = word_service.get_word(word_id)
+        if not word:
+            return jsonify({'success': False, 'error': '单词未找到'}), 404
+        if request.args.get('refresh', 'false').lower() == 'true':
+            word_audio_service.refresh([word])
+        return jsonify({'success': True, 'data': word_audio_service.get_for_word(word_id)})
+    except Exception as e:
+        logger.error(f"获取音频信息失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @api_bp.route('/words/<int:word_id>/meaning-audio', methods=['GET'])
 def get_meaning_audio(word_id):
     """获取单词含义音频（中文）"""
+    started = time.perf_counter()
     try:
         word = word_service.get_word(word_id)
         if not word:
             return jsonify({'success': False, 'error': '单词未找到'}), 404
+
+        response = _send_cached_audio(audio_service.cached_meaning_audio(word.meaning), started)
+        if response:
+            return response
         
         audio_path = audio_service.generate_meaning_audio(word.meaning)
         
         if audio_path:
-            return send_file(audio_path, mimetype='audio/mp3')
+            word_audio_service.refresh([word])
+            return _with_timing(send_audio_file(audio_path), 'miss', started)
         else:
             return jsonify({'success': False, 'error': '音频生成失败'}), 500
     except Exception as e:
@@ -188,6 +461,7 @@ def get_meaning_audio(word_id):
 @api_bp.route('/tts', methods=['POST'])
 def generate_tts():
     """通用TTS接口 - 接收文本生成音频"""
+    started = time.perf_counter()
     try:
         data = request.json
         text = data.get('text')
@@ -195,23 +469,33 @@ def generate_tts():
         
         if not text:
             return jsonify({'success': False, 'error': '文本不能为空'}), 400
-        
+
+        # 注意：中文按片段缓存拼接，英文直接调用 generate_audio
+        if lang == 'zh':
+            resolved = audio_service.cached_meaning_audio(text, lang)
+        else:
+            resolved = audio_service.resolve_audio(text, lang)
+            resolved = resolved[1:] if resolved else None
+        if not resolved:
+            # 返回 204 No Content 表示文本被完全过滤（如时态、比较级等），前端应静默跳过
+            return '', 204
+
+        response = _send_cached_audio(resolved, started)
+        if response:
+            return response
+
         logger.info(f"收到TTS请求: text={text[:50]}, lang={lang}")
-            
-        # 使用 audio_service 生成音频
-        # 注意：这里直接调用 generate_audio，它会处理缓存和重试
-        audio_path = audio_service.generate_audio(text, lang)
+        if lang == 'zh':
+            audio_path = audio_service.generate_meaning_audio(text, lang)
+        else:
+            audio_path = audio_service.generate_audio(text, lang)
         
-        if audio_path and os.path.exists(audio_path):
-            file_size = os.path.getsize(audio_path)
-            if file_size > 100:
-                logger.info(f"TTS生成成功: {text[:20]}, 大小: {file_size}")
-                return send_file(audio_path, mimetype='audio/mp3')
-            else:
-                logger.error(f"TTS生成的文件过小: {file_size} bytes")
-                return '', 204  # 返回204，前端静默跳过
+        if audio_path:
+            # 生成流程已校验过文件大小，这里不再重复读取
+            logger.info(f"TTS生成成功: {text[:20]}")
+            return _with_timing(send_audio_file(audio_path), 'miss', started)
         else:
-            # 返回 204 No Content 表示文本被完全过滤（如时态、比较级等），前端应静默跳过
+            # 生成失败时返回204，前端静默跳过
             return '', 204
     except Exception as e:
         logger.error(f"TTS生成失败: {e}")
@@ -234,6 +518,114 @@ def cleanup_audio():
         logger.error(f"清理音频失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@api_bp.route('/audio/prewarm', methods=['POST'])
+def start_audio_prewarm():
+    """启动词库音频预生成任务"""
+    try:
+        data = request.get_json(silent=True) or {}
+        restart = bool(data.get('restart', False))
+        state = prewarm_service.start(current_app._get_current_object(), restart=restart)
+        return jsonify({'success': True, 'data': state}), 202
+    except Exception as e:
+        logger.error(f"启动音频预生成失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api_bp.route('/audio/prewarm', methods=['GET'])
+def get_audio_prewarm_status():
+    """获取音频预生成进度"""
+    try:
+        return jsonify({'success': True, 'data': prewarm_service.get_status()})
+    except Exception as e:
+        logger.error(f"获取预生成进度失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api_bp.route('/audio/prewarm', methods=['DELETE'])
+def cancel_audio_prewarm():
+    """取消音频预生成任务"""
+    try:
+        if prewarm_service.cancel():
+            return jsonify({'success': True, 'message': '已请求取消预生成任务'})
+        return jsonify({'success': False, 'error': '没有正在运行的预生成任务'}), 404
+    except Exception as e:
+        logger.error(f"取消预生成失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api_bp.route('/audio/manifest', methods=['POST'])
+def get_audio_manifest():
+    """批量获取播放列表的音频清单
+
+    一次返回每个单词发音、拼读和含义音频的内容寻址 URL 及就绪状态，
+    缺失的音频在后台生成，前端可按顺序预取后续条目。
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        word_ids = data.get('word_ids') or []
+        if not isinstance(word_ids, list) or not all(isinstance(i, int) for i in word_ids):
+            return jsonify({'success': False, 'error': 'word_ids 必须是整数列表'}), 400
+        if len(word_ids) > AUDIO_MANIFEST_MAX_WORDS:
+            return jsonify({
+                'success': False,
+                'error': f'单次最多 {AUDIO_MANIFEST_MAX_WORDS} 个单词'
+            }), 400
+
+        spell = bool(data.get('spell', True))
+        try:
+            spell_delay = _parse_spell_delay(data.get('spell_delay', 0.5))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        include_meaning = bool(data.get('meaning', True))
+
+        words = {word.id: word for word in word_service.get_words_by_ids(word_ids)}
+        # 已记录的音频时长，播放器可据此精确安排播放时间
+        metadata = word_audio_service.get_ready(list(words))
+        items = []
+        missing = []
+        missing_words = []
+        for word_id in word_ids:
+            word = words.get(word_id)
+            if not word:
+                continue
+            queued_before = len(missing)
+            item = {
+                'id': word.id,
+                'word': audio_service.describe_audio(word.word, word.language),
+                'spell': None,
+                'meaning': None,
+            }
+            if item['word'] and not item['word']['ready']:
+                missing.append((word.word, word.language, False, 0.0))
+            if spell:
+                item['spell'] = audio_service.describe_audio(word.word, word.language, True, spell_delay)
+                if item['spell'] and not item['spell']['ready']:
+                    missing.append((word.word, word.language, True, spell_delay))
+            if include_meaning and word.meaning:
+                item['meaning'] = audio_service.describe_meaning_audio(word.meaning)
+                if item['meaning'] and not item['meaning']['ready']:
+                    missing.append((word.meaning, 'zh', None, 0.0))
+            for clip in (item['word'], item['spell'], item['meaning']):
+                if clip:
+                    row = metadata.get((word.id, clip['key']))
+                    clip['duration'] = row.duration if row else None
+            if len(missing) > queued_before:
+                missing_words.append(word.id)
+            items.append(item)
+
+        # 按播放顺序提交，靠前的单词先生成；生成结束后刷新这些单词的时长
+        queued = 0
+        if missing:
+            queued = prewarm_service.enqueue(
+                missing, current_app._get_current_object(), missing_words
+            )
+        return jsonify({
+            'success': True,
+            'data': items,
+            'pending': len(missing),
+            'queued': queued
+        })
+    except Exception as e:
+        logger.error(f"获取音频清单失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ==================== 导入导出 API ====================
 
 @api_bp.route('/export', methods=['POST'])
@@ -300,21 +692,45 @@ def import_words():
         if not allowed_file(file.filename):
             return jsonify({'success': False, 'error': '只支持CSV和JSON格式'}), 400
         
-        import_path = os.path.join(UPLOAD_FOLDER, file.filename)
-        file.save(import_path)
-        
-        result = word_service.import_from_file(import_path)
-        if result:
-            return jsonify({
-                'success': True,
-                'message': f'成功导入 {result} 个单词'
-            })
-        else:
-            return jsonify({'success': False, 'error': '导入失败'}), 500
+        # 导入在后台执行，请求立即返回任务ID，前端轮询进度
+        job = import_job_service.create(current_app._get_current_object(), file)
+        return jsonify({'success': True, 'data': job}), 202
     except Exception as e:
         logger.error(f"导入失败: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@api_bp.route('/import/jobs', methods=['GET'])
+def list_import_jobs():
+    """最近的导入任务"""
+    try:
+        return jsonify({'success': True, 'data': import_job_service.list_jobs()})
+    except Exception as e:
+        logger.error(f"获取导入任务失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api_bp.route('/import/jobs/<job_id>', methods=['GET'])
+def get_import_job(job_id):
+    """获取导入任务进度"""
+    try:
+        job = import_job_service.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': '导入任务不存在'}), 404
+        return jsonify({'success': True, 'data': job})
+    except Exception as e:
+        logger.error(f"获取导入进度失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@api_bp.route('/import/jobs/<job_id>', methods=['DELETE'])
+def cancel_import_job(job_id):
+    """取消导入任务"""
+    try:
+        if import_job_service.cancel(job_id):
+            return jsonify({'success': True, 'message': '已请求取消导入任务'})
+        return jsonify({'success': False, 'error': '没有正在运行的导入任务'}), 404
+    except Exception as e:
+        logger.error(f"取消导入失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ==================== 统计 API ====================
 
 @api_bp.route('/statistics', methods=['GET'])
@@ -347,15 +763,10 @@ def get_supported_languages():
 def clear_all_words():
     """清空词库 - 删除所有单词"""
     try:
-        from models import Word
-        from extensions import db
-        
-        # 获取单词总数
-        total_count = Word.query.count()
-        
-        # 删除所有单词
-        Word.query.delete()
-        db.session.commit()
+        total_count = word_service.clear_all()
+
+        # 单词ID可能被复用，重置预生成游标
+        prewarm_service.reset()
         
         return jsonify({
             'success': True,
@@ -364,7 +775,6 @@ def clear_all_words():
         })
         
     except Exception as e:
-        db.session.rollback()
         logger.error(f"清空词库失败: {e}")
         return jsonify({
             'success': False,
@@ -433,7 +843,10 @@ def serve_music(filename):
     from config import MUSIC_FOLDER
     filepath = os.path.join(MUSIC_FOLDER, filename)
     if os.path.exists(filepath):
-        return send_file(filepath, mimetype='audio/mpeg')
+        # 内容哈希作为强 ETag；conditional 模式下支持 304 和 206 分段请求，拖动进度时不再重新下载
+        response = send_file(filepath, mimetype='audio/mpeg', conditional=True, etag=_music_etag(filepath))
+        response.headers['Cache-Control'] = 'public, no-cache'
+        return response
     return jsonify({'success': False, 'error': '文件未找到'}), 404
 
 
@@ -466,15 +879,9 @@ def list_music():
 def cache_info():
     """获取音频缓存信息"""
     try:
-        from config import AUDIO_FOLDER
-        os.makedirs(AUDIO_FOLDER, exist_ok=True)
-        total_size = 0
-        file_count = 0
-        for fname in os.listdir(AUDIO_FOLDER):
-            fpath = os.path.join(AUDIO_FOLDER, fname)
-            if os.path.isfile(fpath):
-                total_size += os.path.getsize(fpath)
-                file_count += 1
+        stats = audio_service.cache.stats()
+        total_size = stats['total_bytes']
+        file_count = stats['file_count']
         return jsonify({
             'success': True,
             'fileCount': file_count,
@@ -490,14 +897,7 @@ def cache_info():
 def cache_clear():
     """清空音频缓存"""
     try:
-        from config import AUDIO_FOLDER
-        os.makedirs(AUDIO_FOLDER, exist_ok=True)
-        count = 0
-        for fname in os.listdir(AUDIO_FOLDER):
-            fpath = os.path.join(AUDIO_FOLDER, fname)
-            if os.path.isfile(fpath):
-                os.remove(fpath)
-                count += 1
+        count = audio_service.cache.clear()
         logger.info(f"已清空音频缓存: {count} 个文件")
         return jsonify({'success': True, 'deleted': count})
     except Exception as e:
@@ -505,9 +905,50 @@ def cache_clear():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@api_bp.route('/cache/rebuild', methods=['POST'])
+def cache_rebuild():
+    """从磁盘重建音频缓存索引"""
+    try:
+        result = audio_service.cache.rebuild()
+        return jsonify({'success': True, 'data': result})
+    except Exception as e:
+        logger.error(f"重建缓存索引失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@api_bp.route('/cache/evict', methods=['POST'])
+def cache_evict():
+    """立即执行一轮缓存淘汰"""
+    try:
+        result = cache_manager.run_once()
+        return jsonify({'success': True, 'data': result})
+    except Exception as e:
+        logger.error(f"缓存淘汰失败: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # ==================== 工具函数 ====================
 
 def allowed_file(filename):
     """检查文件类型是否允许"""
     from config import ALLOWED_EXTENSIONS
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def _parse_utc(value):
+    """解析 ISO 时间为不带时区的 UTC 时间（与数据库中的时间一致），不是字符串或格式错误时抛出 ValueError"""
+    if not isinstance(value, str):
+        raise ValueError(f'时间必须是 ISO 格式字符串: {value!r}')
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _parse_spell_delay(value):
+    """解析字母间停顿（秒），限制在 0 到 SPELL_DELAY_MAX 之间；不是有限数值时抛出 ValueError"""
+    try:
+        delay = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('spell_delay 必须是数字')
+    if isinstance(value, bool) or not math.isfinite(delay):
+        raise ValueError('spell_delay 必须是数字')
+    return min(max(delay, 0.0), SPELL_DELAY_MAX)
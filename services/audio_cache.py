@@ -0,0 +1,408 @@
+import os
+import re
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from config import AUDIO_FOLDER, AUDIO_CACHE_MANIFEST
+
+logger = logging.getLogger(__name__)
+
+# 缓存键版本号，修改键的组成方式时递增，使旧缓存自然失效
+CACHE_KEY_VERSION = 1
+
+# manifest 表结构迁移，第 N 项把 user_version 从 N 升级到 N+1
+_MANIFEST_MIGRATIONS = [
+    [
+        'CREATE TABLE IF NOT EXISTS entries ('
+        ' key TEXT PRIMARY KEY,'
+        ' text TEXT NOT NULL,'
+        ' lang TEXT NOT NULL,'
+        ' spell INTEGER NOT NULL DEFAULT 0,'
+        ' spell_delay REAL NOT NULL DEFAULT 0,'
+        ' engine TEXT NOT NULL,'
+        ' size INTEGER NOT NULL DEFAULT 0,'
+        ' created_at TEXT NOT NULL)',
+    ],
+    [
+        # 访问索引与固定标记，供 LRU/LFU 淘汰使用
+        'ALTER TABLE entries ADD COLUMN last_access REAL NOT NULL DEFAULT 0',
+        'ALTER TABLE entries ADD COLUMN hits INTEGER NOT NULL DEFAULT 0',
+        'ALTER TABLE entries ADD COLUMN pinned INTEGER NOT NULL DEFAULT 0',
+        'CREATE INDEX IF NOT EXISTS idx_entries_text ON entries(text)',
+        'CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(pinned, last_access)',
+        'CREATE INDEX IF NOT EXISTS idx_entries_lfu ON entries(pinned, hits, last_access)',
+    ],
+    [
+        # 由触发器维护的汇总统计，缓存信息查询为 O(1)
+        'CREATE TABLE IF NOT EXISTS stats ('
+        ' id INTEGER PRIMARY KEY CHECK (id = 1),'
+        ' file_count INTEGER NOT NULL DEFAULT 0,'
+        ' total_bytes INTEGER NOT NULL DEFAULT 0)',
+        'INSERT OR REPLACE INTO stats (id, file_count, total_bytes) '
+        'SELECT 1, COUNT(*), COALESCE(SUM(size), 0) FROM entries',
+        'CREATE TRIGGER IF NOT EXISTS entries_after_insert AFTER INSERT ON entries BEGIN'
+        ' UPDATE stats SET file_count = file_count + 1, total_bytes = total_bytes + NEW.size WHERE id = 1;'
+        ' END',
+        'CREATE TRIGGER IF NOT EXISTS entries_after_delete AFTER DELETE ON entries BEGIN'
+        ' UPDATE stats SET file_count = file_count - 1, total_bytes = total_bytes - OLD.size WHERE id = 1;'
+        ' END',
+        'CREATE TRIGGER IF NOT EXISTS entries_after_update_size AFTER UPDATE OF size ON entries BEGIN'
+        ' UPDATE stats SET total_bytes = total_bytes - OLD.size + NEW.size WHERE id = 1;'
+        ' END',
+    ],
+]
+
+# 索引重建时识别内容寻址文件名
+_KEY_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+
+class AudioCache:
+    """内容寻址的音频缓存
+
+    缓存键由规范化文本、语言、拼读模式、拼读延迟和TTS引擎共同哈希得到，
+    文件按键的前两位分片存放到子目录，manifest 记录每个键对应的合成参数。
+    """
+
+    def __init__(self, root=AUDIO_FOLDER, manifest_path=AUDIO_CACHE_MANIFEST):
+        self.root = root
+        self.manifest_path = manifest_path
+        self.logger = logger
+        self._manifest_ready = False
+        # 索引早于统计表版本时，目录中可能有未登记的文件，需要从磁盘重建一次
+        self.needs_rebuild = False
+        # 命中记录先在内存中合并，再由缓存管理器批量写入，避免每次命中都写库
+        self._access_lock = threading.Lock()
+        self._pending_access = {}
+
+    @staticmethod
+    def normalize_text(text):
+        """规范化文本：统一Unicode形式并折叠空白"""
+        if not text:
+            return ""
+        text = unicodedata.normalize('NFC', text)
+        return ' '.join(text.split())
+
+    def make_key(self, text, lang, spell_mode=False, spell_delay=0.0, engine='gtts'):
+        """根据全部合成参数计算缓存键"""
+        # 非拼读模式下延迟不影响音频内容，统一为0避免产生重复缓存
+        delay = round(float(spell_delay), 2) if spell_mode else 0.0
+        parts = [
+            f"v{CACHE_KEY_VERSION}",
+            engine,
+            lang,
+            'spell' if spell_mode else 'plain',
+            f"{delay:.2f}",
+            self.normalize_text(text),
+        ]
+        return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def relative_path(self, key):
+        """缓存键对应的相对路径（相对于缓存根目录）"""
+        return f"{key[:2]}/{key}.mp3"
+
+    def path_for(self, key):
+        """缓存键对应的绝对路径"""
+        return os.path.join(self.root, key[:2], f"{key}.mp3")
+
+    def ensure_shard(self, key):
+        """确保分片目录存在并返回文件路径"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def iter_files(self):
+        """遍历缓存中的全部音频文件（含分片目录和旧版平铺文件）"""
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.mp3'):
+                    yield os.path.join(dirpath, filename)
+
+    def clear(self):
+        """按索引删除全部缓存音频并清空 manifest"""
+        conn = self.connect()
+        try:
+            rows = conn.execute('SELECT key, size FROM entries').fetchall()
+            count, _freed = self.remove(conn, rows)
+            return count
+        finally:
+            conn.close()
+
+    def stats(self):
+        """缓存文件数和总字节数（由触发器维护，O(1)）"""
+        conn = self.connect()
+        try:
+            row = conn.execute('SELECT file_count, total_bytes FROM stats WHERE id = 1').fetchone()
+            return {'file_count': row[0], 'total_bytes': row[1]} if row else {'file_count': 0, 'total_bytes': 0}
+        finally:
+            conn.close()
+
+    def remove(self, conn, rows):
+        """删除 (key, size) 列表对应的文件和 manifest 条目，返回 (删除数, 释放字节数)"""
+        if not rows:
+            return 0, 0
+        freed = 0
+        deleted = []
+        for key, size in rows:
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f"删除缓存文件失败: {key}, {e}")
+                continue
+            deleted.append((key,))
+            freed += size
+        try:
+            conn.executemany('DELETE FROM entries WHERE key = ?', deleted)
+            conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"删除缓存条目失败: {e}")
+        return len(deleted), freed
+
+    def discard(self, keys):
+        """删除指定缓存键的音频（包括未登记在索引中的文件），返回删除的条目数"""
+        keys = list(set(keys))
+        if not keys:
+            return 0
+        conn = self.connect()
+        try:
+            placeholders = ','.join('?' * len(keys))
+            rows = conn.execute(
+                f'SELECT key, size FROM entries WHERE key IN ({placeholders})', keys
+            ).fetchall()
+            count, _freed = self.remove(conn, rows)
+        finally:
+            conn.close()
+        indexed = {key for key, _size in rows}
+        for key in keys:
+            if key not in indexed:
+                try:
+                    os.remove(self.path_for(key))
+                except OSError:
+                    pass
+        return count
+
+    def expire(self, max_age_seconds):
+        """删除超过空闲时间且未固定的条目（按访问索引查询），返回 (删除数, 释放字节数)"""
+        cutoff = time.time() - max_age_seconds
+        conn = self.connect()
+        try:
+            rows = conn.execute(
+                'SELECT key, size FROM entries WHERE pinned = 0 AND last_access < ?', (cutoff,)
+            ).fetchall()
+            return self.remove(conn, rows)
+        finally:
+            conn.close()
+
+    def rebuild(self):
+        """从磁盘重建索引：登记未记录的文件、修正大小、移除丢失的条目、删除旧版平铺文件
+
+        其他进程可能在遍历期间生成并登记新文件。已知条目在遍历之前读取（登记总在写入文件之后，
+        快照中的条目其文件在遍历开始前已存在），删除丢失的条目前再确认一次文件不存在；
+        遍历期间新登记的条目不在快照中，既不会被当作丢失，登记未记录文件时也不会覆盖它们。
+        """
+        conn = self.connect()
+        try:
+            known = dict(conn.execute('SELECT key, size FROM entries').fetchall())
+        finally:
+            conn.close()
+
+        found = {}
+        legacy = 0
+        for filepath in self.iter_files():
+            name = os.path.basename(filepath)[:-4]
+            in_shard = os.path.basename(os.path.dirname(filepath)) == name[:2]
+            if _KEY_PATTERN.match(name) and in_shard:
+                try:
+                    found[name] = os.path.getsize(filepath)
+                except OSError:
+                    continue
+            else:
+                # 内容寻址之前的旧文件名，已无法被新的缓存键命中
+                try:
+                    os.remove(filepath)
+                    legacy += 1
+                except OSError:
+                    continue
+
+        now = time.time()
+        missing = [
+            (key,) for key in known
+            if key not in found and not os.path.exists(self.path_for(key))
+        ]
+        adopted = [
+            (key, size, datetime.utcnow().isoformat(), now)
+            for key, size in found.items() if key not in known
+        ]
+        resized = [(size, key) for key, size in found.items() if key in known and known[key] != size]
+        conn = self.connect()
+        try:
+            conn.executemany('DELETE FROM entries WHERE key = ?', missing)
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries (key, text, lang, engine, size, created_at, last_access) "
+                "VALUES (?, '', '', 'unknown', ?, ?, ?)",
+                adopted
+            )
+            conn.executemany('UPDATE entries SET size = ? WHERE key = ?', resized)
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.needs_rebuild = False
+        result = {'adopted': len(adopted), 'missing': len(missing), 'resized': len(resized), 'legacy_removed': legacy}
+        self.logger.info(f"音频缓存索引重建完成: {result}")
+        return result
+
+    def _move_legacy_manifest(self):
+        """旧版本把 manifest 放在缓存目录中（会被 /cache/ 路由对外提供），迁移到新位置"""
+        legacy_path = os.path.join(self.root, 'manifest.db')
+        if legacy_path == self.manifest_path or os.path.exists(self.manifest_path):
+            return
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.replace(legacy_path + suffix, self.manifest_path + suffix)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.logger.warning(f"迁移缓存清单失败: {legacy_path}{suffix}, {e}")
+
+    def connect(self):
+        """打开 manifest 数据库连接，首次连接时执行表结构迁移"""
+        if not self._manifest_ready:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            self._move_legacy_manifest()
+        conn = sqlite3.connect(self.manifest_path, timeout=10)
+        if not self._manifest_ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._migrate(conn)
+            self._manifest_ready = True
+        return conn
+
+    def _migrate(self, conn):
+        """按 PRAGMA user_version 逐级升级 manifest 表结构"""
+        conn.isolation_level = None
+        try:
+            # 立即加写锁，避免多个 worker 同时迁移
+            conn.execute('BEGIN IMMEDIATE')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version < 3:
+                self.needs_rebuild = True
+            for target, statements in enumerate(_MANIFEST_MIGRATIONS[version:], start=version + 1):
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {target}')
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.isolation_level = ''
+
+    def record(self, key, text, lang, spell_mode=False, spell_delay=0.0, engine='gtts'):
+        """生成成功后在 manifest 中登记缓存条目"""
+        path = self.path_for(key)
+        try:
+            size = os.path.getsize(path)
+            conn = self.connect()
+            try:
+                # 使用 UPSERT 而不是 INSERT OR REPLACE，确保统计触发器按更新处理
+                conn.execute(
+                    'INSERT INTO entries '
+                    '(key, text, lang, spell, spell_delay, engine, size, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(key) DO UPDATE SET text = excluded.text, lang = excluded.lang, '
+                    'spell = excluded.spell, spell_delay = excluded.spell_delay, engine = excluded.engine, '
+                    'size = excluded.size, created_at = excluded.created_at, last_access = excluded.last_access',
+                    (key, self.normalize_text(text), lang, int(bool(spell_mode)),
+                     float(spell_delay) if spell_mode else 0.0, engine, size,
+                     datetime.utcnow().isoformat(), time.time())
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"登记缓存条目失败: {key}, {e}")
+
+    def lookup(self, key):
+        """查询 manifest 中的缓存条目"""
+        try:
+            conn = self.connect()
+            try:
+                conn.row_factory = sqlite3.Row
+                row = conn.execute('SELECT * FROM entries WHERE key = ?', (key,)).fetchone()
+                return dict(row) if row else None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.logger.warning(f"查询缓存条目失败: {key}, {e}")
+            return None
+
+    def fallback_entries(self, engines, limit):
+        """由回退引擎生成的条目（最近访问的优先），[{'key', 'text', 'lang', 'spell', 'spell_delay'}]"""
+        engines = list(engines)
+        if not engines:
+            return []
+        conn = self.connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            placeholders = ','.join('?' * len(engines))
+            rows = conn.execute(
+                f'SELECT key, text, lang, spell, spell_delay FROM entries WHERE engine IN ({placeholders}) '
+                'ORDER BY last_access DESC LIMIT ?', (*engines, limit)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def keys_with_engine_suffix(self, suffix):
+        """engine 以 suffix 结尾的条目的缓存键"""
+        conn = self.connect()
+        try:
+            return [key for (key,) in conn.execute(
+                'SELECT key FROM entries WHERE substr(engine, -?) = ?', (len(suffix), suffix)
+            )]
+        finally:
+            conn.close()
+
+    def forget(self, key):
+        """从 manifest 中移除缓存条目"""
+        try:
+            conn = self.connect()
+            try:
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.logger.warning(f"移除缓存条目失败: {key}, {e}")
+
+    def touch(self, key):
+        """记录一次缓存命中（仅写入内存缓冲）"""
+        now = time.time()
+        with self._access_lock:
+            _last, hits = self._pending_access.get(key, (0, 0))
+            self._pending_access[key] = (now, hits + 1)
+
+    def flush_access(self):
+        """把缓冲的命中记录批量写入 manifest，返回写入条数"""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+        if not pending:
+            return 0
+        try:
+            conn = self.connect()
+            try:
+                conn.executemany(
+                    'UPDATE entries SET last_access = MAX(last_access, ?), hits = hits + ? WHERE key = ?',
+                    [(last, hits, key) for key, (last, hits) in pending.items()]
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.logger.warning(f"写入缓存访问记录失败: {e}")
+        return len(pending)
@@ -1,128 +1,106 @@
 import os
 import logging
-import re
-import time
-from gtts import gTTS
-from gtts.tts import gTTSError
-from config import AUDIO_FOLDER, DEFAULT_AUDIO_LANG, AUDIO_CACHE_TIMEOUT, AUDIO_MAX_RETRIES, AUDIO_RETRY_DELAY, AUDIO_REQUEST_TIMEOUT
-from datetime import datetime, timedelta
+import uuid
+from functools import lru_cache
+from services.audio_cache import AudioCache
+from services.single_flight import SingleFlight
+from services.tts_engines import TTSEngineChain
+from services.spell_audio import SpellAudioBuilder
+from services import mp3_utils
+from services import meaning_normalizer
+from config import AUDIO_FOLDER, DEFAULT_AUDIO_LANG, TTS_ENGINES, SPELL_AUDIO_MODE
+from config import MEANING_AUDIO_MODE, MEANING_SEGMENT_PAUSE, MEANING_LINE_PAUSE
+from config import AUDIO_LOCK_FOLDER, AUDIO_LOCK_TIMEOUT, AUDIO_LOCK_STALE_AFTER, AUDIO_RESOLVE_CACHE_SIZE
+from config import AUDIO_FALLBACK_RERENDER_BATCH
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# 拼接音频用到了回退引擎生成的片段时，登记的引擎名称带此后缀
+FALLBACK_SUFFIX = '+fallback'
+
+
+def audio_etag(audio_path, stat=None):
+    """缓存音频的 ETag：缓存键加修改时间（同一键下的音频被重新合成后 ETag 随之变化）
+
+    调用方已取得文件的 stat 结果时传入 stat，避免再 stat 一次。
+    """
+    key = os.path.splitext(os.path.basename(audio_path))[0]
+    if stat is None:
+        stat = os.stat(audio_path)
+    return f"{key}-{stat.st_mtime_ns:x}"
+
 class AudioService:
     """音频服务类"""
     
     def __init__(self):
         self.audio_folder = AUDIO_FOLDER
+        self.cache = AudioCache(AUDIO_FOLDER)
+        self.single_flight = SingleFlight(AUDIO_LOCK_FOLDER, AUDIO_LOCK_TIMEOUT, AUDIO_LOCK_STALE_AFTER)
+        self.tts = TTSEngineChain(TTS_ENGINES)
+        # 缓存键使用首选引擎名称：回退引擎的输出也登记在同一键下，manifest 记录实际引擎，
+        # 缓存管理器在首选引擎恢复后用它重新合成（rerender_fallbacks）
+        self.engine_name = self.tts.primary_name
+        self.fallback_engines = set(self.tts.fallback_names)
+        self.spell_builder = SpellAudioBuilder(self)
         self.logger = logger
+        # 请求参数 -> 缓存键的解析结果只依赖文本和配置，按参数缓存，缓存命中时无需再处理文本和计算哈希
+        self._resolve_memo = lru_cache(maxsize=AUDIO_RESOLVE_CACHE_SIZE)(self._resolve_audio)
+        self._resolve_meaning_memo = lru_cache(maxsize=AUDIO_RESOLVE_CACHE_SIZE)(self._resolve_meaning_audio)
+        # ETag（缓存键-修改时间）-> 是否为回退音频；重新合成后 ETag 变化，旧结果不会再被用到
+        self._fallback_memo = lru_cache(maxsize=AUDIO_RESOLVE_CACHE_SIZE)(self._fallback_version)
 
-    def _sanitize_filename(self, text):
-        """清理文件名，移除特殊字符"""
-        safe_text = "".join(c for c in text if c.isalnum() or c in (' ', '-', '_', '.')).rstrip()
-        return safe_text.replace(' ', '_')
+    def _get_audio_key(self, text, lang='en', spell_mode=False, spell_delay=0.5):
+        """计算音频缓存键（覆盖全部合成参数）"""
+        engine = self.engine_name
+        if self._use_spell_clips(text, lang, spell_mode):
+            # 片段拼接的拼读与整句合成的拼读内容不同，使用不同的键
+            engine = f"{engine}+clips"
+        return self.cache.make_key(text, lang, spell_mode, spell_delay, engine=engine)
 
-    def _get_audio_path(self, text, lang='en', spell_mode=False):
+    def _get_audio_path(self, text, lang='en', spell_mode=False, spell_delay=0.5):
         """生成音频文件路径"""
-        safe_text = self._sanitize_filename(text)
-        mode_suffix = "_spell" if spell_mode else ""
-        filename = f"{safe_text}_{lang}{mode_suffix}.mp3"
-        return os.path.join(self.audio_folder, filename)
+        return self.cache.path_for(self._get_audio_key(text, lang, spell_mode, spell_delay))
 
     def _is_audio_valid(self, filepath):
-        """检查音频文件是否有效（未过期）"""
-        if not os.path.exists(filepath):
-            return False
-        
-        # 检查文件修改时间
-        file_modified = datetime.fromtimestamp(os.path.getmtime(filepath))
-        if datetime.now() - file_modified > timedelta(seconds=AUDIO_CACHE_TIMEOUT):
-            try:
-                os.remove(filepath)
-                return False
-            except OSError:
-                pass
-        
-        return True
+        """检查音频文件是否存在（过期与容量淘汰由缓存管理器负责）"""
+        return os.path.exists(filepath)
 
     def _clean_chinese_text(self, text):
         """清理中文文本，移除格式标记并扩展词性缩写"""
-        if not text:
-            return ""
-        
-        # 移除角括号、尖括号和方括号
-        text = re.sub(r'[<>【】\[\]]', '', text)
-        
-        # 移除附加语法信息（时态、比较级、副词、名词等）
-        # 移除附加语法信息（时态、比较级、副词、名词等）
-        # 匹配模式：时态: xxx (匹配到换行符或字符串结束)
-        patterns_to_remove = [
-            r'时\s*态[:：].*', 
-            r'比较级[:：].*',
-            r'副\s*词[:：].*',
-            r'名\s*词[:：].*',
-            r'形容词[:：].*',
-            r'反义词[:：].*',
-            r'同义词[:：].*',
-        ]
-        
-        for pattern in patterns_to_remove:
-            # 使用 re.MULTILINE 确保 ^ 和 $ 也能匹配行首尾（虽然这里主要是一次性处理）
-            # 直接替换掉匹配到的内容为空
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # 词性缩写扩展映射表（英文缩写 -> 中文全称）
-        pos_mapping = {
-            'vt.': '及物动词',
-            'vi.': '不及物动词',
-            'v.': '动词',
-            'n.': '名词',
-            'adj.': '形容词',
-            'adv.': '副词',
-            'prep.': '介词',
-            'conj.': '连词',
-            'pron.': '代词',
-            'int.': '感叹词',
-            'art.': '冠词',
-            'num.': '数词',
-            'aux.': '助动词',
-        }
-        
-        # 替换词性缩写为中文全称
-        for abbr, full in pos_mapping.items():
-            text = text.replace(abbr, full)
-        
-        # 移除开头的数字和点（如 "1."、"2."） - 已注释掉保留序号
-        # text = re.sub(r'^\d+\.\s*', '', text)
-        
-        # 移除括号内的内容（如 "(猛力地)"）
-        text = re.sub(r'\([^)]*\)', '', text)
-        
-        # 移除时态和比较级标记
-        text = re.sub(r'\b(past|present|future|comparative|superlative)\b', '', text, flags=re.IGNORECASE)
-        
-        # 清理多余的空格和标点
-        text = re.sub(r'\s+', ' ', text).strip()
-        text = re.sub(r'[，,]\s*[，,]', '，', text)  # 合并多个逗号
-        text = text.strip('，,')
-        
-        return text
+        return meaning_normalizer.clean_chinese_text(text)
 
     def _split_chinese_with_pauses(self, text):
         """将中文文本按逗号分割，添加停顿"""
-        if not text:
-            return ""
-        
-        # 按逗号分割
-        parts = text.split('，')
-        # 过滤空部分并添加停顿
-        cleaned_parts = [part.strip() for part in parts if part.strip()]
+        return meaning_normalizer.split_with_pauses(text)
+
+    def _prepare_text(self, text, lang):
+        """合成前的文本预处理"""
+        text = text.strip()
         
-        # 如果没有逗号，直接返回原文本
-        if len(cleaned_parts) <= 1:
-            return text
+        # 对于中文，需要特殊处理（结果按原文缓存）
+        if lang == 'zh':
+            text = meaning_normalizer.prepare_chinese_text(text)
         
-        # 用停顿连接各部分
-        return '，'.join(cleaned_parts)
+        return text
+
+    def resolve_audio(self, text, lang=DEFAULT_AUDIO_LANG, spell_mode=False, spell_delay=0.5):
+        """解析文本对应的 (预处理文本, 缓存键, 缓存路径)，不触发合成"""
+        return self._resolve_memo(text, lang, bool(spell_mode), float(spell_delay))
+
+    def _resolve_audio(self, text, lang, spell_mode, spell_delay):
+        if not text or not text.strip():
+            return None
+        prepared = self._prepare_text(text, lang)
+        if not prepared:
+            return None
+        audio_key = self._get_audio_key(prepared, lang, spell_mode, spell_delay)
+        return prepared, audio_key, self.cache.path_for(audio_key)
+
+    def is_audio_cached(self, text, lang=DEFAULT_AUDIO_LANG, spell_mode=False, spell_delay=0.5):
+        """检查音频是否已在缓存中"""
+        resolved = self.resolve_audio(text, lang, spell_mode, spell_delay)
+        return bool(resolved) and self._is_audio_valid(resolved[2])
 
     def generate_audio(self, text, lang=DEFAULT_AUDIO_LANG, spell_mode=False, spell_delay=0.5):
         """生成音频文件"""
@@ -131,104 +109,165 @@ class AudioService:
                 self.logger.warning("文本为空，无法生成音频")
                 return None
 
-            text = text.strip()
-            
-            # 对于中文，需要特殊处理
-            if lang == 'zh':
-                text = self._clean_chinese_text(text)
-                # 换行符转换为较长的停顿
-                text = text.replace('\n', ' ... ... ')
-                text = self._split_chinese_with_pauses(text)
-            
-            if not text:
+            resolved = self.resolve_audio(text, lang, spell_mode, spell_delay)
+            if not resolved:
                 self.logger.warning("清理后文本为空，无法生成音频")
                 return None
             
-            audio_path = self._get_audio_path(text, lang, spell_mode)
+            text, audio_key, audio_path = resolved
             
             # 检查缓存
             if self._is_audio_valid(audio_path):
                 self.logger.debug(f"使用缓存音频: {audio_path}")
+                self.cache.touch(audio_key)
                 return audio_path
 
-            # 生成新音频
-            self.logger.info(f"生成新音频: {text} (lang: {lang}, spell: {spell_mode})")
+            # 同一缓存键只允许一次合成，其余调用等待结果
+            return self.single_flight.do(
+                audio_key,
+                check=lambda: audio_path if self._is_audio_valid(audio_path) else None,
+                produce=lambda: self._render_audio(text, lang, spell_mode, spell_delay, audio_key, audio_path)
+            )
             
-            # 对于拼读模式，逐个字母生成
-            if spell_mode:
-                # 根据 spell_delay 计算停顿字符数量 (每0.5秒约等于1个点)
-                pause_count = max(1, int(spell_delay * 2))
-                pause_str = ' ' + '.' * pause_count + ' '
-                
-                # 检查是否为多个单词（如 "world renowned"）
-                if ' ' in text:
-                    words = text.split()
-                    spelled_parts = []
-                    for word in words:
-                        # 每个单词的字母用停顿分隔
-                        spelled_parts.append(pause_str.join(word.upper()))
-                    # 单词之间用更长的停顿连接
-                    spelled_text = ' ... ... '.join(spelled_parts)
-                else:
-                    # 单个单词：字母间用停顿分隔
-                    spelled_text = pause_str.join(text.upper())
-            else:
-                spelled_text = text
+        except Exception as e:
+            self.logger.error(f"音频生成失败: {e}")
+            import traceback
+            self.logger.error(f"详细错误: {traceback.format_exc()}")
+            return None
 
-            # CRITICAL FIX: 添加tld='com'参数，禁用法语等其他语言模块
-            # 这样可以避免gTTS加载Francochinois等不需要的语言包
-            # 添加重试机制处理网络连接问题
-            self.logger.info(f"调用 gTTS: text={spelled_text[:50]}..., lang={lang}")
+    def _render_audio(self, text, lang, spell_mode, spell_delay, audio_key, audio_path, synthesize=None):
+        """合成音频并原子写入缓存路径；synthesize(output_path) 可替代默认的合成方式"""
+        # 生成新音频
+        self.logger.info(f"生成新音频: {text} (lang: {lang}, spell: {spell_mode})")
 
-            max_retries = AUDIO_MAX_RETRIES
-            retry_delay = AUDIO_RETRY_DELAY  # seconds
-            
-            for attempt in range(max_retries):
-                try:
-                    # 使用 tld='com' 明确使用 Google.com 服务器
-                    tts = gTTS(text=spelled_text, lang=lang, slow=False, tld='com')
-                    tts.save(audio_path)
-                    
-                    # 如果成功，跳出重试循环
-                    break
-                    
-                except gTTSError as e:
-                    self.logger.warning(f"gTTS API错误 (尝试 {attempt + 1}/{max_retries}): {e}")
-                    
-                    if attempt < max_retries - 1:
-                        self.logger.info(f"等待 {retry_delay} 秒后重试...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # 指数退避
-                    else:
-                        # 最后一次尝试失败，抛出异常
-                        raise
-                        
-                except Exception as e:
-                    self.logger.error(f"音频生成错误 (尝试 {attempt + 1}/{max_retries}): {e}")
-                    
-                    if attempt < max_retries - 1:
-                        self.logger.info(f"等待 {retry_delay} 秒后重试...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                    else:
-                        raise
-            
-            # 验证文件大小
-            if os.path.exists(audio_path):
-                file_size = os.path.getsize(audio_path)
-                self.logger.info(f"音频生成成功: {audio_path}, 大小: {file_size} bytes")
-                if file_size < 100:
-                    self.logger.warning(f"音频文件过小，可能生成失败: {audio_path}")
+        # 先写入临时文件再原子重命名，读取方永远不会拿到写了一半的MP3
+        self.cache.ensure_shard(audio_key)
+        tmp_path = f"{audio_path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        
+        try:
+            if synthesize is None:
+                engine_used = self._synthesize(text, lang, spell_mode, spell_delay, tmp_path)
             else:
-                self.logger.error(f"音频文件未创建: {audio_path}")
+                engine_used = synthesize(tmp_path)
             
+            # 验证文件大小，过小的文件不发布到缓存路径
+            file_size = os.path.getsize(tmp_path)
+            if file_size < 100:
+                self.logger.warning(f"音频文件过小，可能生成失败: {audio_path}, 大小: {file_size} bytes")
+                return None
+
+            os.replace(tmp_path, audio_path)
+            self.logger.info(f"音频生成成功: {audio_path}, 大小: {file_size} bytes")
+            self.cache.record(audio_key, text, lang, spell_mode, spell_delay, engine_used)
             return audio_path
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _use_spell_clips(self, text, lang, spell_mode):
+        """拼读音频是否由字母片段拼接生成"""
+        return spell_mode and SPELL_AUDIO_MODE == 'clips' and SpellAudioBuilder.can_spell(text, lang)
+
+    def _synthesize(self, text, lang, spell_mode, spell_delay, output_path, primary_only=False):
+        """把文本合成到 output_path，返回实际使用的引擎名称"""
+        if self._use_spell_clips(text, lang, spell_mode):
+            try:
+                data, fallback = self.spell_builder.build(text, spell_delay)
+                with open(output_path, 'wb') as f:
+                    f.write(data)
+                return 'clips' + (FALLBACK_SUFFIX if fallback else '')
+            except Exception as e:
+                self.logger.warning(f"字母片段拼接失败，回退到整句合成: {e}")
+
+        # 对于拼读模式，逐个字母生成
+        if spell_mode:
+            # 根据 spell_delay 计算停顿字符数量 (每0.5秒约等于1个点)
+            pause_count = max(1, int(spell_delay * 2))
+            pause_str = ' ' + '.' * pause_count + ' '
             
-        except Exception as e:
-            self.logger.error(f"音频生成失败: {e}")
-            import traceback
-            self.logger.error(f"详细错误: {traceback.format_exc()}")
-            return None
+            # 检查是否为多个单词（如 "world renowned"）
+            if ' ' in text:
+                words = text.split()
+                spelled_parts = []
+                for word in words:
+                    # 每个单词的字母用停顿分隔
+                    spelled_parts.append(pause_str.join(word.upper()))
+                # 单词之间用更长的停顿连接
+                spelled_text = ' ... ... '.join(spelled_parts)
+            else:
+                # 单个单词：字母间用停顿分隔
+                spelled_text = pause_str.join(text.upper())
+        else:
+            spelled_text = text
+
+        return self.tts.synthesize(spelled_text, lang, output_path, primary_only)
+
+    def _is_fallback_engine(self, engine):
+        return engine in self.fallback_engines or engine.endswith(FALLBACK_SUFFIX)
+
+    def is_fallback_audio(self, audio_path):
+        """缓存音频是否由回退引擎生成（或由含回退片段的音频拼接而成）"""
+        entry = self.cache.lookup(os.path.splitext(os.path.basename(audio_path))[0])
+        if not entry:
+            return False
+        return self._is_fallback_engine(entry['engine'])
+
+    def is_fallback_version(self, etag):
+        """按 audio_etag 判断该版本的音频是否为回退音频，结果按 ETag 缓存，不必每次请求都查询 manifest"""
+        try:
+            return self._fallback_memo(etag)
+        except LookupError:
+            return False
+
+    def _fallback_version(self, etag):
+        entry = self.cache.lookup(etag.split('-', 1)[0])
+        if not entry:
+            # 文件先发布后登记，尚未登记的版本不缓存结果（lru_cache 不缓存异常）
+            raise LookupError(etag)
+        return self._is_fallback_engine(entry['engine'])
+
+    def rerender_fallbacks(self, limit=AUDIO_FALLBACK_RERENDER_BATCH):
+        """用首选引擎重新合成回退引擎生成的缓存音频，返回替换的数量
+
+        首选引擎临时失败时，回退引擎的输出登记在首选引擎的缓存键下；不替换的话会一直被使用，
+        词库中的单词还会被固定而永远不被淘汰。首选引擎仍然失败时停止，等下一轮再试。
+        全部替换后，删除用回退片段拼接的拼读和含义音频，下次请求时用新的片段重新拼接。
+        """
+        entries = self.cache.fallback_entries(self.fallback_engines, limit)
+        replaced = 0
+        for entry in entries:
+            audio_key = entry['key']
+            audio_path = self.cache.path_for(audio_key)
+            if not os.path.exists(audio_path):
+                continue
+            text, lang = entry['text'], entry['lang']
+            spell_mode, spell_delay = bool(entry['spell']), entry['spell_delay']
+            try:
+                result = self.single_flight.do(
+                    audio_key,
+                    check=lambda: None,
+                    produce=lambda: self._render_audio(
+                        text, lang, spell_mode, spell_delay, audio_key, audio_path,
+                        lambda tmp_path: self._synthesize(text, lang, spell_mode, spell_delay, tmp_path, primary_only=True)
+                    )
+                )
+            except Exception as e:
+                self.logger.info(f"首选引擎仍不可用，稍后再重新合成回退音频: {e}")
+                break
+            if result:
+                replaced += 1
+
+        if replaced == len(entries) < limit:
+            composites = self.cache.keys_with_engine_suffix(FALLBACK_SUFFIX)
+            if composites:
+                self.cache.discard(composites)
+                self.logger.info(f"删除了 {len(composites)} 个含回退片段的拼接音频")
+        if replaced:
+            self.logger.info(f"用首选引擎重新合成了 {replaced} 个回退音频")
+        return replaced
 
     def generate_word_with_spell(self, word, lang=DEFAULT_AUDIO_LANG, spell_interval=0.5):
         """生成单词和拼读的组合音频"""
@@ -257,9 +296,101 @@ class AudioService:
             self.logger.error(f"生成单词拼读音频失败: {e}")
             return None
 
+    def _meaning_segments(self, meaning):
+        """把含义拆分为 [(片段, 片段后的停顿秒数)]，按换行和逗号切分"""
+        return meaning_normalizer.meaning_segments(meaning)
+
+    def resolve_meaning_audio(self, meaning, lang='zh'):
+        """解析含义音频的 (片段列表, 缓存键, 缓存路径)；不使用片段拼接时返回 None"""
+        return self._resolve_meaning_memo(meaning, lang)
+
+    def _resolve_meaning_audio(self, meaning, lang):
+        if MEANING_AUDIO_MODE != 'segments' or lang != 'zh' or not meaning or not meaning.strip():
+            return None
+        segments = self._meaning_segments(meaning.strip())
+        if len(segments) <= 1:
+            return None
+        # 停顿配置属于合成参数，一并计入缓存键
+        engine = f"{self.engine_name}+segments:{MEANING_SEGMENT_PAUSE:.2f}:{MEANING_LINE_PAUSE:.2f}"
+        text = '\n'.join(f"{part}|{pause:.2f}" for part, pause in segments)
+        audio_key = self.cache.make_key(text, lang, engine=engine)
+        return segments, audio_key, self.cache.path_for(audio_key)
+
+    def is_meaning_audio_cached(self, meaning, lang='zh'):
+        """检查含义音频是否已在缓存中"""
+        resolved = self.resolve_meaning_audio(meaning, lang)
+        if resolved is None:
+            return self.is_audio_cached(meaning, lang)
+        return self._is_audio_valid(resolved[2])
+
     def generate_meaning_audio(self, meaning, lang='zh'):
-        """生成中文含义音频"""
-        return self.generate_audio(meaning, lang, spell_mode=False)
+        """生成中文含义音频
+
+        含义按逗号和换行切分为片段，每个不同的片段只合成一次并单独缓存，
+        整段音频由片段和可配置的停顿在本地拼接而成。
+        """
+        try:
+            resolved = self.resolve_meaning_audio(meaning, lang)
+            if resolved is None:
+                return self.generate_audio(meaning, lang, spell_mode=False)
+
+            segments, audio_key, audio_path = resolved
+            if self._is_audio_valid(audio_path):
+                self.logger.debug(f"使用缓存含义音频: {audio_path}")
+                self.cache.touch(audio_key)
+                return audio_path
+
+            def synthesize(output_path):
+                parts = []
+                fallback = False
+                for part, pause in segments:
+                    segment_path = self.generate_audio(part, lang)
+                    if not segment_path:
+                        raise RuntimeError(f"含义片段生成失败: {part}")
+                    parts.append(mp3_utils.Clip.from_file(segment_path))
+                    parts.append(pause)
+                    fallback = fallback or self.is_fallback_audio(segment_path)
+                # 去掉末尾多余的停顿
+                with open(output_path, 'wb') as f:
+                    f.write(mp3_utils.concat(parts[:-1]))
+                return 'segments' + (FALLBACK_SUFFIX if fallback else '')
+
+            text = '，'.join(part for part, _pause in segments)
+            return self.single_flight.do(
+                audio_key,
+                check=lambda: audio_path if self._is_audio_valid(audio_path) else None,
+                produce=lambda: self._render_audio(text, lang, False, 0, audio_key, audio_path, synthesize)
+            )
+        except Exception as e:
+            self.logger.error(f"含义音频生成失败: {e}")
+            return None
+
+    def cached_meaning_audio(self, meaning, lang='zh'):
+        """含义音频的 (缓存键, 缓存路径)，不检查文件是否存在；文本无法发音时返回 None"""
+        resolved = self.resolve_meaning_audio(meaning, lang)
+        if resolved is None:
+            resolved = self.resolve_audio(meaning, lang)
+        return resolved[1:] if resolved else None
+
+    def audio_url(self, audio_key):
+        """缓存键对应的内容寻址 URL（由 /cache/ 静态路由提供）"""
+        return f"/cache/{self.cache.relative_path(audio_key)}"
+
+    def describe_audio(self, text, lang=DEFAULT_AUDIO_LANG, spell_mode=False, spell_delay=0.5):
+        """音频清单条目 {'key', 'url', 'ready'}，不触发合成；文本无法发音时返回 None"""
+        resolved = self.resolve_audio(text, lang, spell_mode, spell_delay)
+        if not resolved:
+            return None
+        _prepared, audio_key, audio_path = resolved
+        return {'key': audio_key, 'url': self.audio_url(audio_key), 'ready': self._is_audio_valid(audio_path)}
+
+    def describe_meaning_audio(self, meaning, lang='zh'):
+        """含义音频的清单条目，不触发合成"""
+        resolved = self.resolve_meaning_audio(meaning, lang)
+        if resolved is None:
+            return self.describe_audio(meaning, lang)
+        _segments, audio_key, audio_path = resolved
+        return {'key': audio_key, 'url': self.audio_url(audio_key), 'ready': self._is_audio_valid(audio_path)}
 
     def get_audio_info(self, audio_path):
         """获取音频文件信息"""
@@ -279,22 +410,10 @@ class AudioService:
             return None
 
     def cleanup_old_audio(self, max_age_hours=24):
-        """清理过期的音频文件"""
+        """清理长时间未访问的音频文件（按缓存索引查询，词库中固定的音频除外）"""
         try:
-            cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-            cleaned_count = 0
-            
-            for filename in os.listdir(self.audio_folder):
-                if filename.endswith('.mp3'):
-                    filepath = os.path.join(self.audio_folder, filename)
-                    try:
-                        file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
-                        if file_time < cutoff_time:
-                            os.remove(filepath)
-                            cleaned_count += 1
-                    except OSError:
-                        continue
-            
+            self.cache.flush_access()
+            cleaned_count, _freed = self.cache.expire(max_age_hours * 3600)
             self.logger.info(f"清理了 {cleaned_count} 个过期音频文件")
             return cleaned_count
         except Exception as e:
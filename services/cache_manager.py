@@ -0,0 +1,254 @@
+import os
+import time
+import atexit
+import logging
+import threading
+from config import (
+    AUDIO_CACHE_MAX_BYTES, AUDIO_CACHE_MAX_AGE, AUDIO_CACHE_EVICTION_POLICY,
+    AUDIO_CACHE_EVICT_INTERVAL, AUDIO_CACHE_ACCESS_FLUSH_INTERVAL, AUDIO_CACHE_MAINTENANCE_STALE_AFTER,
+    PREWARM_SPELL_DELAYS
+)
+from services.single_flight import break_stale_lock
+
+logger = logging.getLogger(__name__)
+
+# 淘汰顺序：LRU 按最近访问时间，LFU 按命中次数（次数相同再按访问时间）
+_EVICTION_ORDER = {
+    'lru': 'last_access ASC',
+    'lfu': 'hits ASC, last_access ASC',
+}
+
+# 刷新固定集合时每批解析的单词数，批次之间让出执行权
+_PIN_CHUNK = 500
+
+
+class AudioCacheManager:
+    """音频缓存容量管理
+
+    基于 manifest 中的访问索引（而不是扫描文件 mtime）执行淘汰：
+    超过容量预算时按 LRU/LFU 删除未固定的条目，长期未访问的条目按空闲时间过期。
+    当前词库中单词的发音、拼读、含义及其片段会被固定，练习用到的音频始终保留。
+    每个 worker 都落盘自己的访问记录，固定和淘汰只由持有维护锁的一个 worker 执行。
+    """
+
+    def __init__(self, audio_service, word_audio_service, max_bytes=AUDIO_CACHE_MAX_BYTES,
+                 max_age=AUDIO_CACHE_MAX_AGE, policy=AUDIO_CACHE_EVICTION_POLICY):
+        self.audio_service = audio_service
+        self.word_audio_service = word_audio_service
+        self.cache = audio_service.cache
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.order = _EVICTION_ORDER.get(policy, _EVICTION_ORDER['lru'])
+        self.logger = logger
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._run_lock = threading.Lock()
+        # 按单词缓存需要固定的缓存键：{word_id: ((updated_at, 拼读延迟), 缓存键集合)}，只重新解析有变化的单词
+        self._word_pins = {}
+        self.lock_path = f"{self.cache.manifest_path}.maintenance.lock"
+        self._lock_inode = None
+
+    # ==================== 后台任务 ====================
+
+    def start(self, app):
+        """启动后台维护线程：定期落盘访问记录，定期刷新固定集合并执行淘汰"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._loop, args=(app,), name='audio-cache-manager', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self._release_maintenance_lock)
+
+    def request_eviction(self):
+        """立即唤醒后台线程执行一轮淘汰"""
+        self._wakeup.set()
+
+    def _loop(self, app):
+        # 启动后尽快执行第一轮（含必要时的索引重建），之后按间隔执行
+        next_evict = time.monotonic() + AUDIO_CACHE_ACCESS_FLUSH_INTERVAL
+        while True:
+            woken = self._wakeup.wait(AUDIO_CACHE_ACCESS_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.cache.flush_access()
+                if not self._hold_maintenance_lock():
+                    continue
+                if woken or time.monotonic() >= next_evict:
+                    with app.app_context():
+                        self.run_once()
+                    next_evict = time.monotonic() + AUDIO_CACHE_EVICT_INTERVAL
+            except Exception as e:
+                self.logger.error(f"音频缓存维护失败: {e}")
+
+    def run_once(self):
+        """刷新固定集合并执行一轮淘汰"""
+        with self._run_lock:
+            self.cache.flush_access()
+            if self.cache.needs_rebuild:
+                self.cache.rebuild()
+            self.audio_service.rerender_fallbacks()
+            self._heartbeat()
+            self.refresh_pins()
+            return self.evict()
+
+    # ==================== 维护锁 ====================
+
+    def _hold_maintenance_lock(self):
+        """获取或续期维护锁，返回本进程是否负责维护
+
+        锁目录的修改时间作为心跳；持有者退出后超过 AUDIO_CACHE_MAINTENANCE_STALE_AFTER 秒由其他 worker 接管。
+        续期前确认锁仍是自己创建的那一个（inode 未变化），避免被判为过期后与新的持有者同时维护。
+        """
+        if self._lock_inode is not None:
+            try:
+                if os.stat(self.lock_path).st_ino == self._lock_inode:
+                    os.utime(self.lock_path)
+                    return True
+            except OSError:
+                pass
+            self.logger.warning("音频缓存维护锁已被其他进程接管")
+            self._lock_inode = None
+
+        try:
+            os.mkdir(self.lock_path)
+        except FileExistsError:
+            if not break_stale_lock(self.lock_path, AUDIO_CACHE_MAINTENANCE_STALE_AFTER):
+                return False
+            try:
+                os.mkdir(self.lock_path)
+            except FileExistsError:
+                return False
+        except OSError as e:
+            self.logger.error(f"创建音频缓存维护锁失败: {e}")
+            return False
+        self._lock_inode = os.stat(self.lock_path).st_ino
+        self.logger.info(f"本进程负责音频缓存维护: pid={os.getpid()}")
+        return True
+
+    def _heartbeat(self):
+        """长时间的维护步骤之间刷新维护锁心跳"""
+        if self._lock_inode is not None:
+            try:
+                os.utime(self.lock_path)
+            except OSError:
+                pass
+
+    def _release_maintenance_lock(self):
+        """进程退出时释放维护锁，其他 worker 可立即接管"""
+        if self._lock_inode is None:
+            return
+        try:
+            if os.stat(self.lock_path).st_ino == self._lock_inode:
+                os.rmdir(self.lock_path)
+        except OSError:
+            pass
+        self._lock_inode = None
+
+    # ==================== 固定 ====================
+
+    def _pinned_keys(self):
+        """当前词库需要常驻缓存的缓存键集合
+
+        按缓存键而不是文本固定：引擎、缓存键版本或停顿配置变化后，旧配置下的条目不再被任何请求命中，
+        不应继续固定。每个单词固定发音、各拼读延迟（预生成的延迟和已记录过的延迟）、含义及含义片段。
+        上一轮的解析结果按单词的 updated_at 和拼读延迟复用，只解析新增和修改过的单词；
+        解析分批进行，批次之间让出执行权（gevent worker 中不会长时间阻塞请求）。
+        """
+        from models import Word, WordAudio
+
+        delays = {}
+        for word_id, spell_delay in WordAudio.query.with_entities(WordAudio.word_id, WordAudio.spell_delay) \
+                .filter(WordAudio.variant == 'spell'):
+            delays.setdefault(word_id, set()).add(spell_delay)
+        current = {
+            word_id: (updated_at, frozenset(delays.get(word_id, ())))
+            for word_id, updated_at in Word.query.with_entities(Word.id, Word.updated_at)
+        }
+        for word_id in set(self._word_pins) - set(current):
+            del self._word_pins[word_id]
+        changed = [
+            word_id for word_id, signature in current.items()
+            if word_id not in self._word_pins or self._word_pins[word_id][0] != signature
+        ]
+
+        word_audio = self.word_audio_service
+        for start in range(0, len(changed), _PIN_CHUNK):
+            rows = Word.query.with_entities(Word.id, Word.word, Word.language, Word.meaning) \
+                .filter(Word.id.in_(changed[start:start + _PIN_CHUNK]))
+            for row in rows:
+                signature = current[row.id]
+                keys = {audio_key for _v, _d, audio_key, _p in
+                        word_audio.variants_for(row, set(PREWARM_SPELL_DELAYS) | signature[1])}
+                keys |= word_audio.segment_keys(row.meaning)
+                self._word_pins[row.id] = (signature, frozenset(keys))
+            time.sleep(0)
+            self._heartbeat()
+
+        keys = word_audio.letter_keys()
+        for _signature, word_keys in self._word_pins.values():
+            keys.update(word_keys)
+        return keys
+
+    def refresh_pins(self):
+        """根据当前词库更新条目的固定标记（只更新标记有变化的条目）"""
+        keys = self._pinned_keys()
+        conn = self.cache.connect()
+        try:
+            pin, unpin = [], []
+            cursor = conn.execute('SELECT key, pinned FROM entries')
+            while True:
+                rows = cursor.fetchmany(_PIN_CHUNK * 10)
+                if not rows:
+                    break
+                for key, pinned in rows:
+                    if key in keys:
+                        if not pinned:
+                            pin.append((key,))
+                    elif pinned:
+                        unpin.append((key,))
+                time.sleep(0)
+            conn.executemany('UPDATE entries SET pinned = 1 WHERE key = ?', pin)
+            conn.executemany('UPDATE entries SET pinned = 0 WHERE key = ?', unpin)
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ==================== 淘汰 ====================
+
+    def evict(self):
+        """执行淘汰，返回 {'removed': 条目数, 'freed': 释放字节数}"""
+        removed = 0
+        freed = 0
+
+        # 1. 空闲时间过期
+        if self.max_age:
+            removed, freed = self.cache.expire(self.max_age)
+
+        # 2. 容量预算：淘汰到预算的 90%，避免每次只删一个文件
+        total = self.cache.stats()['total_bytes']
+        if self.max_bytes and total > self.max_bytes:
+            target = int(self.max_bytes * 0.9)
+            victims = []
+            conn = self.cache.connect()
+            try:
+                cursor = conn.execute(
+                    f'SELECT key, size FROM entries WHERE pinned = 0 ORDER BY {self.order}'
+                )
+                for key, size in cursor:
+                    if total <= target:
+                        break
+                    victims.append((key, size))
+                    total -= size
+                cursor.close()
+                count, size = self.cache.remove(conn, victims)
+                removed += count
+                freed += size
+            finally:
+                conn.close()
+            if total > self.max_bytes:
+                self.logger.warning("固定的音频已超过缓存容量预算，请调大 AUDIO_CACHE_MAX_BYTES")
+
+        if removed:
+            self.logger.info(f"音频缓存淘汰了 {removed} 个文件，释放 {freed} bytes")
+        return {'removed': removed, 'freed': freed}
@@ -0,0 +1,70 @@
+"""把导入数据中的 HTML（欧路词典、Anki 等导出）转换为纯文本，保留列表结构
+
+所有正则在模块加载时编译一次；不含标签的文本直接走空白清理的快速路径。
+"""
+import re
+import html
+
+_FLAGS = re.DOTALL | re.IGNORECASE
+
+_SCRIPT = re.compile(r'<script[^>]*>.*?</script>', _FLAGS)
+_STYLE = re.compile(r'<style[^>]*>.*?</style>', _FLAGS)
+_ORDERED_LIST = re.compile(r'<ol[^>]*>(.*?)</ol>', _FLAGS)
+_UNORDERED_LIST = re.compile(r'<ul[^>]*>(.*?)</ul>', _FLAGS)
+_LIST_ITEM = re.compile(r'<li[^>]*>(.*?)</li>', _FLAGS)
+_LOOSE_LIST_ITEM = re.compile(r'<li[^>]*>', re.IGNORECASE)
+# 块级标签：开始标签含 br，结束标签不含
+_BLOCK_TAG = re.compile(r'<(?:br|div|p|h\d|tr)[^>]*>|</(?:div|p|h\d|tr)[^>]*>', re.IGNORECASE)
+_ANY_TAG = re.compile(r'<[^>]+>')
+
+
+def _replace_ordered(match):
+    """<ol> -> 1. 2. 3.，序号按 <li> 位置计数"""
+    items = _LIST_ITEM.findall(match.group(1))
+    if not items:
+        return match.group(1)
+    result = []
+    for index, item in enumerate(items, 1):
+        clean_item = _ANY_TAG.sub('', item).strip()
+        if clean_item:
+            result.append(f"{index}. {clean_item}")
+    return '\n'.join(result) + '\n'
+
+
+def _replace_unordered(match):
+    """<ul> -> •"""
+    items = _LIST_ITEM.findall(match.group(1))
+    if not items:
+        return match.group(1)
+    result = []
+    for item in items:
+        clean_item = _ANY_TAG.sub('', item).strip()
+        if clean_item:
+            result.append(f"• {clean_item}")
+    return '\n'.join(result) + '\n'
+
+
+def html_to_text(text):
+    """移除HTML标签，保留结构，并将列表转换为序号格式"""
+    if not text:
+        return ""
+
+    # 1. 解码HTML实体
+    text = html.unescape(text)
+
+    if '<' in text:
+        # 移除 script 和 style
+        text = _SCRIPT.sub('', text)
+        text = _STYLE.sub('', text)
+        # 2. 有序列表 -> 1. 2. 3.；3. 无序列表 -> •
+        text = _ORDERED_LIST.sub(_replace_ordered, text)
+        text = _UNORDERED_LIST.sub(_replace_unordered, text)
+        # 4. 处理独立的 <li>（未被列表包裹）
+        text = _LOOSE_LIST_ITEM.sub('\n• ', text)
+        # 5. 块级标签转换为换行
+        text = _BLOCK_TAG.sub('\n', text)
+        # 6. 移除剩余标签
+        text = _ANY_TAG.sub('', text)
+
+    # 7. 清理空白：去掉每行首尾空白并丢弃空行（同时合并了多余换行）
+    return '\n'.join(line.strip() for line in text.split('\n') if line.strip())
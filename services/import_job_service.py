@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from config import (
+    UPLOAD_FOLDER, IMPORT_JOBS_FOLDER, IMPORT_JOB_STALE_AFTER, IMPORT_JOB_RETENTION,
+    PREWARM_AFTER_IMPORT
+)
+
+logger = logging.getLogger(__name__)
+
+_JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{12}$')
+
+
+class ImportJobService:
+    """后台导入任务
+
+    上传文件保存后立即返回任务ID，导入在后台线程中流式执行。
+    每个任务的进度写入独立的状态文件，取消请求通过标记文件传递，
+    因此任意 worker 都能查询进度或取消其他 worker 上运行的任务。
+    """
+
+    def __init__(self, word_service, prewarm_service=None, jobs_dir=IMPORT_JOBS_FOLDER):
+        self.word_service = word_service
+        self.prewarm_service = prewarm_service
+        self.jobs_dir = jobs_dir
+        self.logger = logger
+
+    # ==================== 状态持久化 ====================
+
+    def _state_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _cancel_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.cancel")
+
+    def _read_state(self, job_id):
+        """读取任务状态，任务不存在时返回 None"""
+        if not _JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        try:
+            with open(self._state_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_state(self, state):
+        """原子写入任务状态"""
+        state['updated_at'] = datetime.utcnow().isoformat()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        path = self._state_path(state['id'])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _is_stale(self, job_id):
+        """运行中的任务状态长时间未更新，说明执行它的进程已退出"""
+        try:
+            return time.time() - os.path.getmtime(self._state_path(job_id)) > IMPORT_JOB_STALE_AFTER
+        except OSError:
+            return True
+
+    # ==================== 任务控制 ====================
+
+    def create(self, app, file_storage):
+        """保存上传文件并启动后台导入，返回任务初始状态"""
+        self._cleanup_expired()
+
+        job_id = uuid.uuid4().hex[:12]
+        ext = file_storage.filename.rsplit('.', 1)[1].lower()
+        # 上传文件按任务ID命名，避免同名文件互相覆盖和路径穿越
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+        file_path = os.path.join(UPLOAD_FOLDER, f"import_{job_id}.{ext}")
+        file_storage.save(file_path)
+
+        state = {
+            'id': job_id,
+            'filename': file_storage.filename,
+            'size': os.path.getsize(file_path),
+            'status': 'pending',
+            'total': 0,
+            'inserted': 0,
+            'duplicate': 0,
+            'invalid': 0,
+            'rows_per_second': 0,
+            'created_at': datetime.utcnow().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'error': None,
+        }
+        self._write_state(state)
+
+        thread = threading.Thread(
+            target=self._run, args=(app, state, file_path), name=f'import-{job_id}', daemon=True
+        )
+        thread.start()
+        return state
+
+    def get(self, job_id):
+        """获取任务进度"""
+        state = self._read_state(job_id)
+        if state and state['status'] in ('pending', 'running') and self._is_stale(job_id):
+            state['status'] = 'interrupted'
+        return state
+
+    def list_jobs(self, limit=20):
+        """最近的导入任务，按创建时间倒序"""
+        jobs = []
+        try:
+            names = os.listdir(self.jobs_dir)
+        except OSError:
+            return jobs
+        for name in names:
+            if name.endswith('.json'):
+                state = self.get(name[:-5])
+                if state:
+                    jobs.append(state)
+        jobs.sort(key=lambda job: job.get('created_at') or '', reverse=True)
+        return jobs[:limit]
+
+    def cancel(self, job_id):
+        """请求取消任务，返回是否已发出请求"""
+        state = self.get(job_id)
+        if not state or state['status'] not in ('pending', 'running'):
+            return False
+        with open(self._cancel_path(job_id), 'w', encoding='utf-8') as f:
+            f.write('cancel')
+        return True
+
+    def _cleanup_expired(self):
+        """删除超过保留时间的任务记录"""
+        cutoff = time.time() - IMPORT_JOB_RETENTION
+        try:
+            names = os.listdir(self.jobs_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                continue
+
+    # ==================== 任务执行 ====================
+
+    def _run(self, app, state, file_path):
+        """执行导入并持续更新进度"""
+        job_id = state['id']
+        cancel_path = self._cancel_path(job_id)
+        state['status'] = 'running'
+        state['started_at'] = datetime.utcnow().isoformat()
+        self._write_state(state)
+        started = time.monotonic()
+
+        def progress(report):
+            elapsed = time.monotonic() - started
+            state.update({key: report[key] for key in ('total', 'inserted', 'duplicate', 'invalid')})
+            state['rows_per_second'] = round(report['total'] / elapsed, 1) if elapsed > 0 else 0
+            self._write_state(state)
+            # gevent worker 中导入线程是协程，不主动让出时会阻塞整个 worker 直到导入结束；每批让出一次
+            time.sleep(0)
+            return not os.path.exists(cancel_path)
+
+        try:
+            with app.app_context():
+                from services import import_reader
+                report = self.word_service.bulk_import(import_reader.iter_rows(file_path), progress=progress)
+            progress(report)
+            state['status'] = 'cancelled' if report['cancelled'] else 'completed'
+            self.logger.info(
+                f"导入任务 {job_id} 结束: {state['status']}, 新增 {report['inserted']}, "
+                f"重复 {report['duplicate']}, 无效 {report['invalid']}"
+            )
+        except Exception as e:
+            self.logger.error(f"导入任务 {job_id} 失败: {e}")
+            state['status'] = 'failed'
+            state['error'] = str(e)
+        finally:
+            state['finished_at'] = datetime.utcnow().isoformat()
+            self._write_state(state)
+            for path in (file_path, cancel_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        if state['inserted'] and PREWARM_AFTER_IMPORT and self.prewarm_service:
+            # 导入完成后在后台预生成新单词的音频
+            self.prewarm_service.start(app)
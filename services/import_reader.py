@@ -0,0 +1,133 @@
+"""流式读取导入文件：逐行产出字典，内存占用与文件大小无关"""
+import csv
+import json
+import time
+import codecs
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 依次尝试的编码（gb2312 是 gbk 的子集，保留以兼容旧配置）
+IMPORT_ENCODINGS = ['utf-8', 'gbk', 'gb2312']
+
+# 编码校验每次读取的字节数
+DETECT_CHUNK_SIZE = 64 * 1024
+
+# JSON 增量解析每次读取的字符数
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def _decodes(file_path, encoding):
+    """文件能否完整地按指定编码解码（分块读取，内存占用与文件大小无关）"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(file_path, 'rb') as f:
+        try:
+            while True:
+                chunk = f.read(DETECT_CHUNK_SIZE)
+                # 块末尾截断的多字节字符由增量解码器留到下一块
+                decoder.decode(chunk, final=not chunk)
+                if not chunk:
+                    return True
+                # 大文件要读很多块，每块之间让出执行权（gevent 中导入在协程里运行）
+                time.sleep(0)
+        except UnicodeDecodeError:
+            return False
+
+
+def detect_encoding(file_path, encodings=IMPORT_ENCODINGS):
+    """探测编码：依次尝试，返回第一个能解码整个文件的编码
+
+    只看开头的样本不可靠：GBK 文件开头若全是 ASCII 也能按 UTF-8 解码，
+    后面的中文会在读取时损坏，因此每个候选编码都校验完整文件。
+    """
+    with open(file_path, 'rb') as f:
+        bom = f.read(len(codecs.BOM_UTF8))
+    if bom == codecs.BOM_UTF8 and _decodes(file_path, 'utf-8-sig'):
+        return 'utf-8-sig'
+    for encoding in encodings:
+        if _decodes(file_path, encoding):
+            return encoding
+    raise ValueError("无法识别文件编码")
+
+
+def _open_text(file_path):
+    encoding = detect_encoding(file_path)
+    # 编码已按完整文件校验，严格解码：宁可导入失败也不写入替换字符
+    return open(file_path, 'r', encoding=encoding, errors='strict', newline='')
+
+
+def iter_csv_rows(file_path):
+    """逐行读取 CSV"""
+    with _open_text(file_path) as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def iter_json_rows(file_path):
+    """增量读取 JSON：支持顶层数组、单个对象和 NDJSON（每行一个对象）"""
+    with _open_text(file_path) as f:
+        buffer = ''
+        pos = 0
+        eof = False
+        in_array = None
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                eof = True
+                return False
+            # 丢弃已解析的部分，缓冲区只保留未消费的数据
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        while True:
+            # 跳过空白以及数组元素之间的逗号
+            while True:
+                while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) and in_array and buffer[pos] == ',':
+                    pos += 1
+                    continue
+                if pos < len(buffer) or not fill():
+                    break
+
+            if pos >= len(buffer):
+                if in_array:
+                    raise ValueError("JSON数组未结束")
+                return
+
+            if in_array is None:
+                in_array = buffer[pos] == '['
+                if in_array:
+                    pos += 1
+                    continue
+            elif in_array and buffer[pos] == ']':
+                return
+
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 元素跨越了缓冲区边界，继续读取；已到文件末尾说明格式错误
+                if eof or not fill():
+                    raise
+                continue
+            if end == len(buffer) and not eof and isinstance(value, (int, float)):
+                # 数字可能被截断，读到更多数据后重新解析
+                fill()
+                continue
+            pos = end
+            yield value
+
+
+def iter_rows(file_path):
+    """按扩展名选择读取方式"""
+    if file_path.endswith('.csv'):
+        return iter_csv_rows(file_path)
+    if file_path.endswith(('.json', '.jsonl', '.ndjson')):
+        return iter_json_rows(file_path)
+    raise ValueError(f"不支持的文件格式: {file_path}")
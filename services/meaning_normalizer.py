@@ -0,0 +1,103 @@
+"""中文含义文本规范化：移除格式标记、扩展词性缩写、按逗号和换行切分
+
+所有正则在模块加载时编译一次，结果按原始文本缓存。
+同一个含义在播放、预生成和缓存固定时会被反复处理，缓存命中时不再做任何文本处理。
+"""
+import re
+from functools import lru_cache
+from config import MEANING_SEGMENT_PAUSE, MEANING_LINE_PAUSE, MEANING_NORMALIZE_CACHE_SIZE
+
+# 角括号、尖括号和方括号
+_BRACKETS = re.compile(r'[<>【】\[\]]')
+
+# 附加语法信息（时态、比较级、副词、名词等），从标记处一直删除到行尾
+_GRAMMAR_NOTES = re.compile(
+    r'(?:时\s*态|比较级|副\s*词|名\s*词|形容词|反义词|同义词)[:：].*',
+    re.IGNORECASE
+)
+
+# 词性缩写扩展映射表（英文缩写 -> 中文全称）
+POS_MAPPING = {
+    'vt.': '及物动词',
+    'vi.': '不及物动词',
+    'v.': '动词',
+    'n.': '名词',
+    'adj.': '形容词',
+    'adv.': '副词',
+    'prep.': '介词',
+    'conj.': '连词',
+    'pron.': '代词',
+    'int.': '感叹词',
+    'art.': '冠词',
+    'num.': '数词',
+    'aux.': '助动词',
+}
+
+# 一次扫描完成全部替换：长缩写优先，且缩写前不能紧跟字母（避免 adv. 被当成 v.）
+_POS_PATTERN = re.compile(
+    r'(?<![A-Za-z])(?:' + '|'.join(
+        re.escape(abbr) for abbr in sorted(POS_MAPPING, key=len, reverse=True)
+    ) + ')'
+)
+
+# 括号内的补充说明（如 "(猛力地)"）
+_PARENTHESES = re.compile(r'\([^)]*\)')
+
+# 时态和比较级标记
+_TENSE_WORDS = re.compile(r'\b(?:past|present|future|comparative|superlative)\b', re.IGNORECASE)
+
+_WHITESPACE = re.compile(r'\s+')
+_REPEATED_COMMAS = re.compile(r'[，,]\s*[，,]')
+_COMMAS = re.compile(r'[，,]')
+
+
+@lru_cache(maxsize=MEANING_NORMALIZE_CACHE_SIZE)
+def clean_chinese_text(text):
+    """清理中文文本，移除格式标记并扩展词性缩写"""
+    if not text:
+        return ""
+
+    text = _BRACKETS.sub('', text)
+    text = _GRAMMAR_NOTES.sub('', text)
+    text = _POS_PATTERN.sub(lambda match: POS_MAPPING[match.group(0)], text)
+    text = _PARENTHESES.sub('', text)
+    text = _TENSE_WORDS.sub('', text)
+
+    # 清理多余的空格和标点
+    text = _WHITESPACE.sub(' ', text).strip()
+    text = _REPEATED_COMMAS.sub('，', text)  # 合并多个逗号
+    return text.strip('，,')
+
+
+def split_with_pauses(text):
+    """将中文文本按逗号分割，去掉空片段后重新连接"""
+    if not text:
+        return ""
+
+    cleaned_parts = [part.strip() for part in text.split('，') if part.strip()]
+    # 如果没有逗号，直接返回原文本
+    if len(cleaned_parts) <= 1:
+        return text
+    return '，'.join(cleaned_parts)
+
+
+@lru_cache(maxsize=MEANING_NORMALIZE_CACHE_SIZE)
+def prepare_chinese_text(text):
+    """整段中文合成前的预处理"""
+    text = clean_chinese_text(text)
+    # 换行符转换为较长的停顿
+    text = text.replace('\n', ' ... ... ')
+    return split_with_pauses(text)
+
+
+@lru_cache(maxsize=MEANING_NORMALIZE_CACHE_SIZE)
+def meaning_segments(meaning):
+    """把含义拆分为 ((片段, 片段后的停顿秒数), ...)，按换行和逗号切分"""
+    segments = []
+    for line in meaning.split('\n'):
+        line = clean_chinese_text(line)
+        parts = [part.strip() for part in _COMMAS.split(line) if part.strip()]
+        for index, part in enumerate(parts):
+            pause = MEANING_SEGMENT_PAUSE if index < len(parts) - 1 else MEANING_LINE_PAUSE
+            segments.append((part, pause))
+    return tuple(segments)
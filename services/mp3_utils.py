@@ -0,0 +1,154 @@
+"""MP3 帧级工具：解析帧、生成静音帧、按帧拼接音频"""
+
+# 比特率表 (kbps)，按 (MPEG版本是否为1, 比特率索引) 查询，仅 Layer III
+_BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# 采样率表 (Hz)，按 MPEG 版本位查询：3=MPEG1, 2=MPEG2, 0=MPEG2.5
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+# gTTS 输出的帧头：MPEG-2 Layer III, 32kbps, 24kHz, 单声道
+DEFAULT_HEADER = b'\xff\xf3\x44\xc4'
+
+
+def parse_header(header):
+    """解析4字节帧头，返回帧信息字典；不是合法的 Layer III 帧头时返回 None"""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version_bits = (header[1] >> 3) & 0x03
+    layer_bits = (header[1] >> 1) & 0x03
+    bitrate_index = (header[2] >> 4) & 0x0F
+    sample_rate_index = (header[2] >> 2) & 0x03
+    if version_bits == 1 or layer_bits != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    is_mpeg1 = version_bits == 3
+    bitrate = _BITRATES[is_mpeg1][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = (header[2] >> 1) & 0x01
+    mono = (header[3] >> 6) & 0x03 == 3
+    samples = 1152 if is_mpeg1 else 576
+    frame_length = (samples // 8) * bitrate // sample_rate + padding
+
+    if is_mpeg1:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+
+    return {
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'samples': samples,
+        'frame_length': frame_length,
+        'side_info': side_info,
+        'protected': not (header[1] & 0x01),
+        'duration': samples / sample_rate,
+    }
+
+
+def silent_frame(header=DEFAULT_HEADER):
+    """根据帧头模板生成一帧静音（边信息与主数据全部为0）"""
+    # 清除填充位和CRC保护位，保证帧长固定且无需校验和
+    template = bytes([header[0], header[1] | 0x01, header[2] & 0xFD, header[3]])
+    info = parse_header(template)
+    if info is None:
+        raise ValueError("无效的MP3帧头")
+    return template + b'\x00' * (info['frame_length'] - 4)
+
+
+def silence(duration, header=DEFAULT_HEADER):
+    """生成指定时长（秒）的静音帧序列，精度为一帧"""
+    frame = silent_frame(header)
+    info = parse_header(frame)
+    count = max(0, int(round(duration / info['duration'])))
+    return frame * count
+
+
+def strip_tags(data):
+    """移除开头的 ID3v2 标签和结尾的 ID3v1 标签"""
+    start = 0
+    if data[:3] == b'ID3' and len(data) >= 10:
+        # ID3v2 长度为 4 字节 syncsafe 整数（每字节7位）
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        start = 10 + size + footer
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    return data[start:end]
+
+
+def _is_info_frame(frame, info):
+    """判断是否为 Xing/Info/VBRI 元数据帧（拼接到中间会被误当作音频）"""
+    offset = 4 + (2 if info['protected'] else 0) + info['side_info']
+    return frame[offset:offset + 4] in (b'Xing', b'Info') or frame[36:40] == b'VBRI'
+
+
+def iter_frames(data):
+    """遍历音频数据中的 Layer III 帧，返回 (帧字节, 帧信息)；遇到无法识别的数据时向后同步"""
+    data = strip_tags(data)
+    pos = 0
+    length = len(data)
+    while pos + 4 <= length:
+        info = parse_header(data[pos:pos + 4])
+        if info is None or pos + info['frame_length'] > length:
+            pos += 1
+            continue
+        yield data[pos:pos + info['frame_length']], info
+        pos += info['frame_length']
+
+
+class Clip:
+    """去除标签和元数据帧后的音频片段"""
+
+    def __init__(self, frames, header, duration):
+        self.frames = frames
+        self.header = header
+        self.duration = duration
+
+    @classmethod
+    def from_bytes(cls, data):
+        """从 MP3 文件内容构建片段，不含有效音频帧时抛出 ValueError"""
+        frames = []
+        header = None
+        duration = 0.0
+        for index, (frame, info) in enumerate(iter_frames(data)):
+            if index == 0 and _is_info_frame(frame, info):
+                continue
+            if header is None:
+                header = frame[:4]
+            frames.append(frame)
+            duration += info['duration']
+        if not frames:
+            raise ValueError("音频中没有可识别的MP3帧")
+        return cls(b''.join(frames), header, duration)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def concat(parts, header=None):
+    """拼接片段与静音：parts 中的元素为 Clip 或表示静音秒数的数字"""
+    if header is None:
+        header = next((p.header for p in parts if isinstance(p, Clip)), DEFAULT_HEADER)
+    chunks = []
+    for part in parts:
+        if isinstance(part, Clip):
+            chunks.append(part.frames)
+        elif part:
+            # 静音帧沿用片段的帧头，保证采样率和声道一致
+            chunks.append(silence(part, header))
+    return b''.join(chunks)
+
+
+def duration_of(data):
+    """计算 MP3 数据的时长（秒）"""
+    return sum(info['duration'] for _frame, info in iter_frames(data))
@@ -0,0 +1,417 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import (
+    PREWARM_STATE_FILE, PREWARM_CONCURRENCY, PREWARM_RATE_LIMIT,
+    PREWARM_BATCH_SIZE, PREWARM_SPELL_DELAYS, PREWARM_STALE_AFTER
+)
+from services.single_flight import break_stale_lock
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """简单的速率限制器：保证相邻两次放行间隔不小于 1/rate 秒"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def wait(self):
+        """阻塞直到允许下一次调用"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+class PrewarmService:
+    """音频预生成服务
+
+    按单词ID顺序遍历词库，为每个单词生成发音、拼读和含义音频。
+    进度写入状态文件，进程重启后从上次的游标继续；状态文件同时是
+    多个 worker 之间共享进度和取消请求的唯一来源。
+    """
+
+    def __init__(self, audio_service, word_audio_service=None, state_path=PREWARM_STATE_FILE):
+        self.audio_service = audio_service
+        self.word_audio_service = word_audio_service
+        self.state_path = state_path
+        self.cancel_path = f"{state_path}.cancel"
+        self.lock_path = f"{state_path}.lock"
+        self.concurrency = max(1, PREWARM_CONCURRENCY)
+        self.batch_size = max(1, PREWARM_BATCH_SIZE)
+        self.spell_delays = PREWARM_SPELL_DELAYS
+        self.rate_limiter = RateLimiter(PREWARM_RATE_LIMIT)
+        self.logger = logger
+        self._thread = None
+        # 按需生成队列（批量音频清单中缺失的音频）
+        self._executor = None
+        self._queued = {}  # 任务 -> Future，同一任务只提交一次
+        self._queue_lock = threading.Lock()
+
+    # ==================== 状态持久化 ====================
+
+    def _read_state(self):
+        """读取状态文件"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state):
+        """原子写入状态文件"""
+        state['updated_at'] = datetime.utcnow().isoformat()
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def get_status(self):
+        """获取预生成进度"""
+        state = self._read_state()
+        if not state:
+            return {'status': 'idle'}
+        if state.get('status') == 'running' and not self._is_lock_alive():
+            # 运行中的进程已退出（如容器重启），等待恢复
+            state['status'] = 'interrupted'
+        return state
+
+    # ==================== 任务互斥 ====================
+
+    def _acquire_job_lock(self):
+        """获取任务锁，保证同一时间只有一个 worker 在执行预生成"""
+        try:
+            os.mkdir(self.lock_path)
+            return True
+        except FileExistsError:
+            if not break_stale_lock(self.lock_path, PREWARM_STALE_AFTER):
+                return False
+            try:
+                os.mkdir(self.lock_path)
+                return True
+            except FileExistsError:
+                return False
+
+    def _is_lock_alive(self):
+        """任务锁存在且心跳未过期"""
+        try:
+            return time.time() - os.path.getmtime(self.lock_path) < PREWARM_STALE_AFTER
+        except OSError:
+            return False
+
+    def _heartbeat(self):
+        """刷新任务锁心跳"""
+        try:
+            os.utime(self.lock_path)
+        except OSError:
+            pass
+
+    def _release_job_lock(self):
+        """释放任务锁"""
+        try:
+            os.rmdir(self.lock_path)
+        except OSError:
+            pass
+
+    # ==================== 任务控制 ====================
+
+    def start(self, app, restart=False):
+        """在后台线程中启动预生成任务，已有任务运行时直接返回当前进度"""
+        if not self._acquire_job_lock():
+            self.logger.info("预生成任务已在运行")
+            return self.get_status()
+
+        state = self._prepare_state(restart)
+        self._thread = threading.Thread(
+            target=self._run_locked, args=(app, state), name='audio-prewarm', daemon=True
+        )
+        self._thread.start()
+        return state
+
+    def run(self, app, restart=False):
+        """在当前线程中执行预生成任务（用于命令行）"""
+        if not self._acquire_job_lock():
+            self.logger.warning("预生成任务已在其他进程中运行")
+            return self.get_status()
+        state = self._prepare_state(restart)
+        self._run_locked(app, state)
+        return self._read_state()
+
+    def resume_if_interrupted(self, app):
+        """进程启动时恢复被中断的预生成任务"""
+        state = self._read_state()
+        if state.get('status') == 'running' and not self._is_lock_alive():
+            self.logger.info(f"恢复中断的预生成任务，游标: {state.get('cursor', 0)}")
+            return self.start(app)
+        return None
+
+    def cancel(self, reason='cancel'):
+        """请求取消预生成任务（对所有 worker 生效）"""
+        state = self._read_state()
+        if state.get('status') != 'running':
+            return False
+        with open(self.cancel_path, 'w', encoding='utf-8') as f:
+            f.write(reason)
+        return True
+
+    def reset(self):
+        """清空进度游标（如词库被清空后单词ID可能被复用）"""
+        # 运行中的任务收到 reset 后会自行把游标归零
+        self.cancel(reason='reset')
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def _cancel_requested(self):
+        return os.path.exists(self.cancel_path)
+
+    def _prepare_state(self, restart):
+        """初始化任务状态：restart=True 时从头开始，否则沿用上次的游标"""
+        previous = {} if restart else self._read_state()
+        if os.path.exists(self.cancel_path):
+            os.remove(self.cancel_path)
+        state = {
+            'status': 'running',
+            'cursor': previous.get('cursor', 0),
+            'total': 0,
+            'processed': previous.get('processed', 0),
+            'generated': 0,
+            'cached': 0,
+            'failed': 0,
+            'started_at': datetime.utcnow().isoformat(),
+            'finished_at': None,
+            'error': None,
+        }
+        self._write_state(state)
+        return state
+
+    # ==================== 按需生成 ====================
+
+    def enqueue(self, tasks, app=None, word_ids=()):
+        """把缺失的音频加入后台生成队列，已在队列中的任务不会重复提交，返回新提交数
+
+        传入 app 和 word_ids 时，这批任务全部结束后刷新这些单词的音频元数据（时长、状态）。
+        """
+        submitted = 0
+        futures = {}
+        with self._queue_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix='audio-on-demand'
+                )
+            for task in tasks:
+                future = self._queued.get(task)
+                if future is None:
+                    future = self._executor.submit(self._render_queued, task)
+                    self._queued[task] = future
+                    submitted += 1
+                futures[future] = task
+        if app is not None and word_ids and futures and self.word_audio_service:
+            self._refresh_when_done(app, list(word_ids), futures)
+        return submitted
+
+    def _refresh_when_done(self, app, word_ids, futures):
+        """futures 全部结束后在最后完成的工作线程中刷新单词音频元数据"""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def on_done(_future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            failed = {task for future, task in futures.items() if future.result() == 'failed'}
+            spell_delays = set(self.spell_delays)
+            spell_delays.update(task[3] for task in futures.values() if task[2])
+            self._refresh_metadata(app, word_ids, sorted(spell_delays), failed)
+
+        for future in futures:
+            future.add_done_callback(on_done)
+
+    def _refresh_metadata(self, app, word_ids, spell_delays, failed_tasks):
+        """按需生成结束后刷新单词音频元数据，failed_tasks 为生成失败的任务"""
+        from models import Word
+        from extensions import db
+
+        try:
+            with app.app_context():
+                words = Word.query.filter(Word.id.in_(word_ids)).all()
+                failed = set()
+                for word in words:
+                    for text, lang, spell_mode, spell_delay in failed_tasks:
+                        if spell_mode is None:
+                            if text == word.meaning:
+                                failed.add((word.id, 'meaning', 0.0))
+                        elif text == word.word and lang == word.language:
+                            failed.add((word.id, 'spell' if spell_mode else 'word', spell_delay))
+                self.word_audio_service.refresh(words, spell_delays, failed)
+                db.session.remove()
+        except Exception as e:
+            self.logger.error(f"刷新单词音频元数据失败: {e}")
+
+    def refresh_words(self, app, word_ids=(), stale=None):
+        """单词被修改或删除后在后台清理旧音频，并重新生成新音频
+
+        stale 为 (旧缓存键集合, 旧单词文本, 旧含义)，由调用方在修改前收集。
+        """
+        thread = threading.Thread(
+            target=self._refresh_words, args=(app, list(word_ids), stale),
+            name='audio-refresh', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _refresh_words(self, app, word_ids, stale):
+        from models import Word
+        from extensions import db
+
+        try:
+            with app.app_context():
+                if stale and self.word_audio_service:
+                    keys, word_text, meaning = stale
+                    self.word_audio_service.discard_unused(keys, word_text, meaning)
+                if not word_ids:
+                    return
+                words = Word.query.filter(Word.id.in_(word_ids)).all()
+                failed = set()
+                for word in words:
+                    for task in self._tasks_for_word(word):
+                        if self._render(task) == 'failed':
+                            failed.add((word.id, self._variant_of(task), task[3]))
+                if self.word_audio_service:
+                    self.word_audio_service.refresh(words, self.spell_delays, failed)
+                db.session.remove()
+        except Exception as e:
+            self.logger.error(f"刷新单词音频失败: {e}")
+
+    def _render_queued(self, task):
+        try:
+            return self._render(task)
+        finally:
+            with self._queue_lock:
+                self._queued.pop(task, None)
+
+    # ==================== 任务执行 ====================
+
+    def _run_locked(self, app, state):
+        """执行任务并在结束后释放任务锁"""
+        try:
+            with app.app_context():
+                self._run(state)
+        except Exception as e:
+            self.logger.error(f"音频预生成失败: {e}")
+            state['status'] = 'failed'
+            state['error'] = str(e)
+            state['finished_at'] = datetime.utcnow().isoformat()
+            self._write_state(state)
+        finally:
+            self._release_job_lock()
+
+    def _run(self, state):
+        """按ID分批遍历词库并生成音频"""
+        from models import Word
+        from extensions import db
+
+        state['total'] = Word.query.count()
+        self._write_state(state)
+        self.logger.info(f"开始预生成音频，共 {state['total']} 个单词，游标: {state['cursor']}")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                if self._cancel_requested():
+                    with open(self.cancel_path, 'r', encoding='utf-8') as f:
+                        if f.read().strip() == 'reset':
+                            state['cursor'] = 0
+                            state['processed'] = 0
+                    os.remove(self.cancel_path)
+                    state['status'] = 'cancelled'
+                    break
+
+                words = Word.query.filter(Word.id > state['cursor']) \
+                    .order_by(Word.id.asc()).limit(self.batch_size).all()
+                if not words:
+                    state['status'] = 'completed'
+                    break
+
+                tasks = []
+                owners = []
+                for word in words:
+                    for task in self._tasks_for_word(word):
+                        tasks.append(task)
+                        owners.append((word.id, self._variant_of(task), task[3]))
+                # 释放会话，避免后台线程长时间持有数据库连接
+                db.session.remove()
+
+                failed = set()
+                for owner, outcome in zip(owners, executor.map(self._render, tasks)):
+                    state[outcome] += 1
+                    if outcome == 'failed':
+                        failed.add(owner)
+
+                if self.word_audio_service:
+                    # 一个批次的元数据在一个事务中写入
+                    self.word_audio_service.refresh(words, self.spell_delays, failed)
+                    db.session.remove()
+
+                state['cursor'] = words[-1].id
+                state['processed'] += len(words)
+                self._heartbeat()
+                self._write_state(state)
+
+        state['finished_at'] = datetime.utcnow().isoformat()
+        self._write_state(state)
+        self.logger.info(
+            f"音频预生成结束: {state['status']}, 新生成 {state['generated']}, "
+            f"已缓存 {state['cached']}, 失败 {state['failed']}"
+        )
+
+    def _tasks_for_word(self, word):
+        """单词需要预生成的全部音频变体：(文本, 语言, 拼读模式, 拼读延迟)，拼读模式为 None 表示含义音频"""
+        tasks = [(word.word, word.language, False, 0.0)]
+        if word.language == 'en' and len(word.word.strip()) > 1:
+            for delay in self.spell_delays:
+                tasks.append((word.word, word.language, True, float(delay)))
+        if word.meaning:
+            tasks.append((word.meaning, 'zh', None, 0.0))
+        return tasks
+
+    @staticmethod
+    def _variant_of(task):
+        """任务对应的音频变体名称"""
+        spell_mode = task[2]
+        if spell_mode is None:
+            return 'meaning'
+        return 'spell' if spell_mode else 'word'
+
+    def _render(self, task):
+        """生成单个音频变体，仅在缓存未命中时受速率限制"""
+        text, lang, spell_mode, spell_delay = task
+        try:
+            if spell_mode is None:
+                if self.audio_service.is_meaning_audio_cached(text, lang):
+                    return 'cached'
+                self.rate_limiter.wait()
+                audio_path = self.audio_service.generate_meaning_audio(text, lang)
+                self._heartbeat()
+                return 'generated' if audio_path else 'failed'
+
+            if self.audio_service.is_audio_cached(text, lang, spell_mode, spell_delay):
+                return 'cached'
+            self.rate_limiter.wait()
+            audio_path = self.audio_service.generate_audio(text, lang, spell_mode, spell_delay)
+            self._heartbeat()
+            return 'generated' if audio_path else 'failed'
+        except Exception as e:
+            self.logger.warning(f"预生成音频失败: {text[:20]}, {e}")
+            return 'failed'
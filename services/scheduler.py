@@ -0,0 +1,44 @@
+"""SM-2 间隔重复调度
+
+每次复习按回答质量 grade（0-5）更新单词的难度系数、间隔和下次复习时间：
+grade < 3 视为遗忘，重新从 1 天开始；否则间隔依次为 1 天、6 天，之后每次乘以难度系数。
+只读写单词自身的几个字段，一次回答的更新是 O(1) 的；
+待复习队列即 due_at <= 当前时间 的索引范围查询。
+"""
+from datetime import timedelta
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+GRADES = range(0, 6)
+# 未给出回答质量时（旧的“标记已复习”）按“记得，略有犹豫”处理
+DEFAULT_GRADE = 4
+
+
+def next_schedule(ease_factor, interval_days, repetitions, grade, now):
+    """根据本次回答计算新的 (ease_factor, interval_days, repetitions, due_at)"""
+    ease = ease_factor or INITIAL_EASE
+    repetitions = repetitions or 0
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+    if grade < 3:
+        repetitions = 0
+        interval = 1.0
+    else:
+        if repetitions == 0:
+            interval = 1.0
+        elif repetitions == 1:
+            interval = 6.0
+        else:
+            interval = round((interval_days or 1.0) * ease, 2)
+        repetitions += 1
+    return round(ease, 2), interval, repetitions, now + timedelta(days=interval)
+
+
+def review(word, grade, now):
+    """把一次回答应用到单词上（不提交）"""
+    word.ease_factor, word.interval_days, word.repetitions, word.due_at = next_schedule(
+        word.ease_factor, word.interval_days, word.repetitions, grade, now
+    )
+    word.review_count = (word.review_count or 0) + 1
+    word.last_reviewed = now
@@ -0,0 +1,159 @@
+"""单词全文检索：SQLite FTS5 虚拟表 words_fts，rowid 与 words.id 一致
+
+索引覆盖单词、含义、音标和例句。unicode61 分词器按空白和标点切分，
+对中文整段视为一个词，因此写入前把连续的中文切分为重叠的双字词（末尾补一个单字），
+查询时中文转换为双字词短语、英文按前缀匹配。
+索引由 WordService 在增删改和批量导入的同一事务中维护；
+SQLite 未编译 FTS5 或使用其他数据库时 is_available() 返回 False，由调用方回退到 LIKE 查询。
+"""
+import re
+import logging
+from sqlalchemy import text
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'words_fts'
+COLUMNS = ('word', 'meaning', 'phonetic', 'example')
+
+# bm25 列权重：单词命中优先于含义，含义优先于例句和音标
+_RANK = f"bm25({TABLE}, 10.0, 5.0, 1.0, 2.0)"
+
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RUN = re.compile(f'[{_CJK}]+')
+# 查询词：连续中文，或连续的其他字母数字
+_QUERY_TERM = re.compile(f'[{_CJK}]+|[^\\W_{_CJK}]+')
+
+_available = None
+
+
+def _bigrams(run):
+    """苹果汁 -> 苹果 果汁 汁：相邻双字词在短语查询中连续，末尾单字使单字前缀查询能命中每个位置"""
+    if len(run) == 1:
+        return run
+    return ' '.join(run[i:i + 2] for i in range(len(run) - 1)) + ' ' + run[-1]
+
+
+def index_text(value):
+    """写入索引前的文本：中文段替换为双字词序列"""
+    if not value:
+        return ''
+    return _CJK_RUN.sub(lambda match: f' {_bigrams(match.group(0))} ', value)
+
+
+def build_query(query):
+    """把用户输入转换为 FTS5 MATCH 表达式，各词之间为 AND；没有可检索的词时返回 None"""
+    terms = []
+    for term in _QUERY_TERM.findall(query or ''):
+        if _CJK_RUN.fullmatch(term) and len(term) > 1:
+            # 双字词短语（末尾的单字不参与，否则会要求匹配到中文段结尾）
+            terms.append('"' + ' '.join(term[i:i + 2] for i in range(len(term) - 1)) + '"')
+        else:
+            terms.append(f'"{term}"*')
+    return ' '.join(terms) or None
+
+
+def is_available():
+    """索引表是否可用（按进程缓存）"""
+    global _available
+    if _available is None:
+        if db.engine.dialect.name != 'sqlite':
+            _available = False
+        else:
+            row = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': TABLE}
+            ).first()
+            _available = row is not None
+    return _available
+
+
+def ensure():
+    """创建索引表；与单词表行数不一致时（首次启用或曾绕过服务写入）重建"""
+    global _available
+    if db.engine.dialect.name != 'sqlite':
+        _available = False
+        return False
+    try:
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            f"{', '.join(COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"SQLite 不支持 FTS5，搜索将使用 LIKE 查询: {e}")
+        _available = False
+        return False
+    _available = True
+
+    indexed = db.session.execute(text(f"SELECT count(*) FROM {TABLE}")).scalar()
+    total = db.session.execute(text("SELECT count(*) FROM words")).scalar()
+    if indexed != total:
+        rebuild()
+        db.session.commit()
+        logger.info(f"已重建全文索引: {total} 个单词")
+    return True
+
+
+def index_words(words):
+    """写入或更新单词的索引（在调用方的事务中执行）
+
+    words 为 Word 对象或包含 id 和各索引列的字典。
+    """
+    if not words or not is_available():
+        return
+    rows = []
+    for word in words:
+        get = word.get if isinstance(word, dict) else lambda name: getattr(word, name)
+        row = {'rowid': get('id')}
+        row.update({name: index_text(get(name)) for name in COLUMNS})
+        rows.append(row)
+    remove([row['rowid'] for row in rows])
+    db.session.execute(
+        text(f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) "
+             f"VALUES (:rowid, {', '.join(':' + name for name in COLUMNS)})"),
+        rows
+    )
+
+
+def remove(word_ids):
+    """删除单词的索引（在调用方的事务中执行）"""
+    if not word_ids or not is_available():
+        return
+    db.session.execute(
+        text(f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(str(int(i)) for i in word_ids)})")
+    )
+
+
+def clear():
+    """清空索引（在调用方的事务中执行）"""
+    if is_available():
+        db.session.execute(text(f"DELETE FROM {TABLE}"))
+
+
+def rebuild():
+    """按单词表重建全部索引（在调用方的事务中执行）"""
+    clear()
+    result = db.session.execute(text(f"SELECT id, {', '.join(COLUMNS)} FROM words"))
+    while True:
+        rows = result.mappings().fetchmany(1000)
+        if not rows:
+            break
+        index_words([dict(row) for row in rows])
+
+
+def search(query, limit, language=None):
+    """返回按相关度排序的单词ID；索引不可用或查询不含可检索的词时返回 None"""
+    match = build_query(query)
+    if match is None or not is_available():
+        return None
+    sql = f"SELECT {TABLE}.rowid FROM {TABLE}"
+    params = {'match': match, 'limit': limit}
+    if language:
+        sql += f" JOIN words ON words.id = {TABLE}.rowid"
+    sql += f" WHERE {TABLE} MATCH :match"
+    if language:
+        sql += " AND words.language = :language"
+        params['language'] = language
+    rows = db.session.execute(text(f"{sql} ORDER BY {_RANK} LIMIT :limit"), params)
+    return [word_id for (word_id,) in rows]
@@ -0,0 +1,151 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def break_stale_lock(lock_path, stale_after):
+    """清除超过 stale_after 秒未更新的锁目录，返回锁是否已不存在
+
+    判断过期和删除之间，锁可能已被其他进程清除并重新获取，直接删除会误删新锁。
+    因此清除过程由短暂的 .break 锁目录互斥，并在持有它时确认锁仍是判断为过期的那一个
+    （inode 和修改时间都未变化）后才删除。
+    """
+    try:
+        observed = os.stat(lock_path)
+    except FileNotFoundError:
+        return True
+    if time.time() - observed.st_mtime <= stale_after:
+        return False
+
+    break_path = f"{lock_path}.break"
+    try:
+        os.mkdir(break_path)
+    except FileExistsError:
+        # 其他进程正在清除；清除者中途退出时，其 .break 锁同样按过期处理
+        try:
+            if time.time() - os.path.getmtime(break_path) > stale_after:
+                os.rmdir(break_path)
+        except OSError:
+            pass
+        return False
+    try:
+        try:
+            current = os.stat(lock_path)
+        except FileNotFoundError:
+            return True
+        if (current.st_ino, current.st_mtime_ns) != (observed.st_ino, observed.st_mtime_ns):
+            return False
+        os.rmdir(lock_path)
+        logger.warning(f"清除过期的锁: {lock_path}")
+        return True
+    except OSError:
+        return False
+    finally:
+        try:
+            os.rmdir(break_path)
+        except OSError:
+            pass
+
+
+class _Call:
+    """一次进行中的生成调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """单飞执行：同一个键同时只允许一次生成
+
+    进程内的并发调用共享同一次执行结果；跨进程（多个 gunicorn worker）
+    通过在共享缓存卷上原子创建锁目录实现互斥，等待方轮询锁释放后重新检查缓存。
+    """
+
+    def __init__(self, lock_dir, wait_timeout=120, stale_after=180, poll_interval=0.1):
+        self.lock_dir = lock_dir
+        self.wait_timeout = wait_timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, check, produce):
+        """执行单飞调用
+
+        check() 返回已存在的结果（如缓存命中）或 None；
+        produce() 真正生成结果，仅由获得锁的调用方执行。
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            # 进程内已有相同键的生成在进行，等待其结果
+            call.done.wait(self.wait_timeout)
+            if call.error is not None:
+                raise call.error
+            return call.result if call.done.is_set() else check()
+
+        try:
+            call.result = self._run_locked(key, check, produce)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run_locked(self, key, check, produce):
+        """在跨进程锁保护下检查并生成"""
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+        if not self._acquire(lock_path):
+            # 等待超时，最后再检查一次其他进程是否已生成
+            result = check()
+            if result is not None:
+                return result
+            raise TimeoutError(f"等待生成锁超时: {key}")
+        try:
+            # 获得锁后再次检查，其他进程可能刚刚生成完毕
+            result = check()
+            if result is not None:
+                return result
+            return produce()
+        finally:
+            self._release(lock_path)
+
+    def _acquire(self, lock_path):
+        """创建锁目录，已存在时轮询等待（过期锁会被强制清除）"""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                os.mkdir(lock_path)
+                return True
+            except FileExistsError:
+                pass
+
+            if break_stale_lock(lock_path, self.stale_after):
+                # 锁刚好被释放，或过期的锁已被清除
+                continue
+
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def _release(self, lock_path):
+        """删除锁目录"""
+        try:
+            os.rmdir(lock_path)
+        except OSError:
+            pass
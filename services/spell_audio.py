@@ -0,0 +1,71 @@
+import os
+import logging
+import threading
+from services import mp3_utils
+from config import SPELL_WORD_PAUSE
+
+logger = logging.getLogger(__name__)
+
+# 单个字符的朗读文本：字母和数字直接朗读，连字符读作 hyphen
+_SPOKEN = {chr(c): chr(c) for c in range(ord('A'), ord('Z') + 1)}
+_SPOKEN.update({str(d): str(d) for d in range(10)})
+_SPOKEN['-'] = 'hyphen'
+
+
+def spoken_letters():
+    """全部字母片段的朗读文本"""
+    return list(_SPOKEN.values())
+
+
+class SpellAudioBuilder:
+    """拼读音频拼接引擎
+
+    每个字母（及数字、连字符）只合成一次并作为普通缓存条目保存，
+    拼读音频通过按帧拼接字母片段和精确时长的静音在本地生成，不再需要网络合成。
+    """
+
+    def __init__(self, audio_service):
+        self.audio_service = audio_service
+        self.logger = logger
+        self._clips = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def can_spell(text, lang):
+        """文本能否完全由字母片段拼出（仅英文）"""
+        if lang != 'en' or not text:
+            return False
+        return all(char in _SPOKEN or char == ' ' for char in text.upper())
+
+    def _letter_clip(self, char):
+        """获取字母片段（进程内缓存解析结果）"""
+        spoken = _SPOKEN[char]
+        path = self.audio_service.generate_audio(spoken, 'en')
+        if not path:
+            raise RuntimeError(f"字母音频生成失败: {spoken}")
+        # 片段被首选引擎重新合成后文件会被替换，按修改时间区分
+        signature = (path, os.stat(path).st_mtime_ns)
+        with self._lock:
+            cached = self._clips.get(signature)
+        if cached is not None:
+            return cached
+        clip = (mp3_utils.Clip.from_file(path), self.audio_service.is_fallback_audio(path))
+        with self._lock:
+            self._clips[signature] = clip
+        return clip
+
+    def build(self, text, spell_delay):
+        """拼接拼读音频，返回 (MP3 字节, 是否用到了回退引擎生成的字母片段)"""
+        parts = []
+        fallback = False
+        for word_index, word in enumerate(text.upper().split()):
+            if word_index:
+                # 单词之间的停顿更长
+                parts.append(SPELL_WORD_PAUSE)
+            for char_index, char in enumerate(word):
+                if char_index:
+                    parts.append(spell_delay)
+                clip, clip_fallback = self._letter_clip(char)
+                parts.append(clip)
+                fallback = fallback or clip_fallback
+        return mp3_utils.concat(parts), fallback
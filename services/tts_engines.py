@@ -0,0 +1,182 @@
+import os
+import time
+import shutil
+import logging
+import subprocess
+from services import mp3_utils
+from config import (
+    AUDIO_MAX_RETRIES, AUDIO_RETRY_DELAY, AUDIO_REQUEST_TIMEOUT,
+    ESPEAK_COMMAND, ESPEAK_VOICES, FFMPEG_COMMAND
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TTSEngine:
+    """TTS 引擎基类：把文本合成为 MP3 文件"""
+
+    name = 'base'
+
+    def __init__(self):
+        self.logger = logger
+
+    def is_available(self):
+        """引擎在当前环境中是否可用"""
+        return True
+
+    def synthesize(self, text, lang, output_path):
+        """合成音频并写入 output_path，失败时抛出异常"""
+        raise NotImplementedError
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS（需要网络）"""
+
+    name = 'gtts'
+
+    def __init__(self, max_retries=AUDIO_MAX_RETRIES):
+        super().__init__()
+        self.max_retries = max(1, max_retries)
+
+    def is_available(self):
+        try:
+            import gtts  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def synthesize(self, text, lang, output_path):
+        # 延迟导入，缓存命中时无需加载 gTTS
+        from gtts import gTTS
+        from gtts.tts import gTTSError
+
+        # CRITICAL FIX: 添加tld='com'参数，禁用法语等其他语言模块
+        # 这样可以避免gTTS加载Francochinois等不需要的语言包
+        # 添加重试机制处理网络连接问题
+        self.logger.info(f"调用 gTTS: text={text[:50]}..., lang={lang}")
+
+        max_retries = self.max_retries
+        retry_delay = AUDIO_RETRY_DELAY  # seconds
+
+        for attempt in range(max_retries):
+            try:
+                # 使用 tld='com' 明确使用 Google.com 服务器
+                tts = gTTS(text=text, lang=lang, slow=False, tld='com')
+                tts.save(output_path)
+                return
+
+            except gTTSError as e:
+                self.logger.warning(f"gTTS API错误 (尝试 {attempt + 1}/{max_retries}): {e}")
+
+                if attempt < max_retries - 1:
+                    self.logger.info(f"等待 {retry_delay} 秒后重试...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # 指数退避
+                else:
+                    # 最后一次尝试失败，抛出异常
+                    raise
+
+            except Exception as e:
+                self.logger.error(f"音频生成错误 (尝试 {attempt + 1}/{max_retries}): {e}")
+
+                if attempt < max_retries - 1:
+                    self.logger.info(f"等待 {retry_delay} 秒后重试...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                else:
+                    raise
+
+
+class EspeakEngine(TTSEngine):
+    """本地离线引擎：espeak-ng 合成 WAV，再由 ffmpeg 编码为与 gTTS 相同规格的 MP3"""
+
+    name = 'espeak'
+
+    def is_available(self):
+        return bool(shutil.which(ESPEAK_COMMAND) and shutil.which(FFMPEG_COMMAND))
+
+    def synthesize(self, text, lang, output_path):
+        voice = ESPEAK_VOICES.get(lang, lang)
+        wav = subprocess.run(
+            [ESPEAK_COMMAND, '-v', voice, '--stdout', text],
+            capture_output=True, check=True, timeout=AUDIO_REQUEST_TIMEOUT
+        ).stdout
+        # 24kHz 单声道 32kbps，与 gTTS 输出一致，便于拼接
+        mp3 = subprocess.run(
+            [FFMPEG_COMMAND, '-hide_banner', '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0',
+             '-codec:a', 'libmp3lame', '-ar', '24000', '-ac', '1', '-b:a', '32k', '-f', 'mp3', 'pipe:1'],
+            input=wav, capture_output=True, check=True, timeout=AUDIO_REQUEST_TIMEOUT
+        ).stdout
+        with open(output_path, 'wb') as f:
+            f.write(mp3)
+
+
+class StubEngine(TTSEngine):
+    """确定性的静音引擎，用于测试和无语音环境：时长与文本长度成正比"""
+
+    name = 'stub'
+
+    def synthesize(self, text, lang, output_path):
+        duration = 0.3 + 0.08 * len(text)
+        with open(output_path, 'wb') as f:
+            f.write(mp3_utils.silence(duration))
+
+
+ENGINES = {
+    GTTSEngine.name: GTTSEngine,
+    EspeakEngine.name: EspeakEngine,
+    StubEngine.name: StubEngine,
+}
+
+
+class TTSEngineChain:
+    """按配置顺序依次尝试的引擎链，前一个引擎失败时自动回退到下一个"""
+
+    def __init__(self, names):
+        self.engines = []
+        known = []
+        for name in names:
+            if name in ENGINES:
+                known.append(name)
+            else:
+                logger.warning(f"未知的TTS引擎: {name}")
+        names = known
+        for index, name in enumerate(names):
+            if name == GTTSEngine.name and index < len(names) - 1:
+                # 后面还有回退引擎时不再走指数退避重试，直接回退
+                self.engines.append(GTTSEngine(max_retries=1))
+            else:
+                self.engines.append(ENGINES[name]())
+        if not self.engines:
+            self.engines.append(GTTSEngine())
+        self.logger = logger
+
+    @property
+    def primary_name(self):
+        """首选引擎名称，作为缓存键的一部分"""
+        return self.engines[0].name
+
+    @property
+    def fallback_names(self):
+        """回退引擎名称（不含首选引擎）"""
+        return [engine.name for engine in self.engines[1:] if engine.name != self.primary_name]
+
+    def synthesize(self, text, lang, output_path, primary_only=False):
+        """合成音频，返回实际使用的引擎名称；所有引擎都失败时抛出最后一个异常
+
+        primary_only 为 True 时只尝试首选引擎（用于重新合成回退引擎生成的音频）。
+        """
+        last_error = None
+        for engine in (self.engines[:1] if primary_only else self.engines):
+            if not engine.is_available():
+                self.logger.debug(f"TTS引擎不可用，跳过: {engine.name}")
+                continue
+            try:
+                engine.synthesize(text, lang, output_path)
+                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                    return engine.name
+                last_error = RuntimeError(f"TTS引擎未输出音频: {engine.name}")
+            except Exception as e:
+                self.logger.warning(f"TTS引擎 {engine.name} 合成失败: {e}")
+                last_error = e
+        raise last_error or RuntimeError("没有可用的TTS引擎")
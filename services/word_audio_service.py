@@ -0,0 +1,196 @@
+import os
+import logging
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import WordAudio
+from services import mp3_utils, meaning_normalizer
+from services.spell_audio import spoken_letters
+from config import PREWARM_SPELL_DELAYS
+
+logger = logging.getLogger(__name__)
+
+
+class WordAudioService:
+    """单词音频元数据
+
+    记录每个单词各音频变体的缓存键、时长、大小和生成状态，
+    播放器据此安排播放时间，界面据此显示哪些单词的音频已就绪。
+    元数据在音频生成后刷新，单词的文本被修改时由 WordService 清除。
+    """
+
+    def __init__(self, audio_service):
+        self.audio_service = audio_service
+        self.logger = logger
+
+    def variants_for(self, word, spell_delays=None):
+        """单词的全部音频变体：[(variant, spell_delay, 缓存键, 缓存路径)]"""
+        service = self.audio_service
+        variants = []
+        resolved = service.resolve_audio(word.word, word.language)
+        if resolved:
+            variants.append(('word', 0.0, resolved[1], resolved[2]))
+        if word.language == 'en' and len(word.word.strip()) > 1:
+            for delay in sorted(set(spell_delays or PREWARM_SPELL_DELAYS)):
+                resolved = service.resolve_audio(word.word, word.language, True, delay)
+                if resolved:
+                    variants.append(('spell', float(delay), resolved[1], resolved[2]))
+        if word.meaning:
+            resolved = service.cached_meaning_audio(word.meaning)
+            if resolved:
+                variants.append(('meaning', 0.0, resolved[0], resolved[1]))
+        return variants
+
+    def audio_keys(self, word):
+        """单词当前全部音频的缓存键（包括已记录的其他拼读延迟）"""
+        delays = set(PREWARM_SPELL_DELAYS)
+        keys = set()
+        for row in WordAudio.query.filter_by(word_id=word.id):
+            if row.variant == 'spell':
+                delays.add(row.spell_delay)
+            if row.audio_key:
+                keys.add(row.audio_key)
+        keys.update(audio_key for _v, _d, audio_key, _p in self.variants_for(word, delays))
+        return keys
+
+    def letter_keys(self):
+        """全部字母片段的缓存键"""
+        keys = set()
+        for letter in spoken_letters():
+            resolved = self.audio_service.resolve_audio(letter, 'en')
+            if resolved:
+                keys.add(resolved[1])
+        return keys
+
+    def segment_keys(self, meaning):
+        """含义按逗号/换行切分后各片段的缓存键"""
+        keys = set()
+        if not meaning or not meaning.strip():
+            return keys
+        for part, _pause in meaning_normalizer.meaning_segments(meaning.strip()):
+            resolved = self.audio_service.resolve_audio(part, 'zh')
+            if resolved:
+                keys.add(resolved[1])
+        return keys
+
+    def shared_clip_keys(self, meaning=None):
+        """可能被其他单词共享的片段音频的缓存键：全部字母片段，以及 meaning 的各片段"""
+        return self.letter_keys() | self.segment_keys(meaning)
+
+    def discard_unused(self, keys, word_text, meaning):
+        """删除不再被任何单词使用的旧音频
+
+        其他单词（或修改后的同一单词）的文本或含义与旧值相同时，对应音频仍在使用，予以保留。
+        含义片段和字母片段可能被多个单词共享，不在此删除（单字母单词和单片段含义的音频即是这样的片段），
+        由缓存淘汰处理。
+        """
+        from models import Word
+        # 单字母单词与字母片段、单片段含义与其他含义的同名片段是同一个缓存键
+        keys = set(keys) - self.shared_clip_keys(meaning)
+        if not keys:
+            return 0
+        sharing = Word.query.filter(db.or_(Word.word == word_text, Word.meaning == meaning)).all()
+        for word in sharing:
+            keys -= self.audio_keys(word)
+        removed = self.audio_service.cache.discard(keys)
+        if keys:
+            self.logger.info(f"清理了 {removed} 个过期的单词音频")
+        return removed
+
+    def refresh(self, words, spell_delays=None, failed=()):
+        """根据缓存文件刷新单词的音频元数据（单个事务）
+
+        failed 为生成失败的 (word_id, variant, spell_delay) 集合，对应的缺失文件标记为 failed。
+        缓存键和大小都未变化时沿用已记录的时长，不重新解析音频。
+        同一单词可能被多个请求或 worker 同时刷新，新变体以 upsert 写入，不会因唯一约束冲突回滚整批。
+        """
+        if not words:
+            return
+        try:
+            existing = {
+                (row.word_id, row.variant, row.spell_delay): row
+                for row in WordAudio.query.filter(WordAudio.word_id.in_([w.id for w in words]))
+            }
+            inserts = []
+            for word in words:
+                for variant, spell_delay, audio_key, audio_path in self.variants_for(word, spell_delays):
+                    ident = (word.id, variant, spell_delay)
+                    row = existing.get(ident)
+                    values = self._row_values(row, audio_key, audio_path, ident in failed)
+                    if values is None:
+                        continue
+                    if row is None:
+                        values.update(word_id=word.id, variant=variant, spell_delay=spell_delay)
+                        inserts.append(values)
+                    else:
+                        for name, value in values.items():
+                            setattr(row, name, value)
+            self._upsert(inserts)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"刷新单词音频元数据失败: {e}")
+
+    def _row_values(self, row, audio_key, audio_path, failed):
+        """变体的新元数据；已就绪且缓存键和大小都未变化时返回 None"""
+        try:
+            size = os.path.getsize(audio_path)
+        except OSError:
+            size = None
+
+        if size is None:
+            return {
+                'audio_key': audio_key, 'size': None, 'duration': None,
+                'status': 'failed' if failed else 'pending',
+            }
+
+        if row is not None and row.status == 'ready' and row.audio_key == audio_key and row.size == size:
+            return None
+        with open(audio_path, 'rb') as f:
+            duration = mp3_utils.duration_of(f.read())
+        return {'audio_key': audio_key, 'size': size, 'duration': round(duration, 3), 'status': 'ready'}
+
+    def _upsert(self, rows):
+        """插入新变体；其他事务已插入同一变体时改为更新"""
+        if not rows:
+            return
+        now = datetime.utcnow()
+        for values in rows:
+            values['updated_at'] = now
+        dialect = db.engine.dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            statement = insert(WordAudio)
+            statement = statement.on_conflict_do_update(
+                index_elements=['word_id', 'variant', 'spell_delay'],
+                set_={name: statement.excluded[name]
+                      for name in ('audio_key', 'size', 'duration', 'status', 'updated_at')}
+            )
+            db.session.execute(statement, rows)
+            return
+        # 其他数据库：逐行在保存点中插入，冲突时更新已有的行
+        for values in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(WordAudio(**values))
+            except IntegrityError:
+                WordAudio.query.filter_by(
+                    word_id=values['word_id'], variant=values['variant'], spell_delay=values['spell_delay']
+                ).update({name: value for name, value in values.items()
+                          if name not in ('word_id', 'variant', 'spell_delay')})
+
+    def get_for_word(self, word_id):
+        """单词的全部音频元数据"""
+        rows = WordAudio.query.filter_by(word_id=word_id) \
+            .order_by(WordAudio.variant, WordAudio.spell_delay).all()
+        return [row.to_dict() for row in rows]
+
+    def get_ready(self, word_ids):
+        """批量获取已就绪的元数据：{(word_id, audio_key): WordAudio}"""
+        if not word_ids:
+            return {}
+        rows = WordAudio.query.filter(WordAudio.word_id.in_(word_ids), WordAudio.status == 'ready')
+        return {(row.word_id, row.audio_key): row for row in rows}
@@ -1,10 +1,14 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
-import csv
-import json
+import base64
 import logging
+from sqlalchemy import insert, func, case
+from sqlalchemy.orm import load_only
 from extensions import db
-from models import Word
+from models import Word, WordAudio, WordTombstone, ReviewLog
+from config import IMPORT_BATCH_SIZE, WORDS_PAGE_SIZE, SYNC_TOMBSTONE_RETENTION, SYNC_WATERMARK_MARGIN
+from services import import_reader, search_index, scheduler
+from services.html_sanitizer import html_to_text
 
 logger = logging.getLogger(__name__)
 
@@ -23,84 +27,95 @@ class WordService:
             query = query.filter_by(language=language)
         return query.order_by(Word.created_at.desc()).all()
 
+    @staticmethod
+    def encode_cursor(word):
+        """把一页最后一行的 (created_at, id) 编码为不透明的游标"""
+        raw = f"{word.created_at.isoformat()}|{word.id}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """解析游标，格式错误时抛出 ValueError"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            created_at, word_id = raw.rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(word_id)
+        except Exception:
+            raise ValueError('无效的分页游标')
+
+    def list_words(self, language=None, difficulty=None, reviewed=None, search=None,
+                   cursor=None, limit=WORDS_PAGE_SIZE, fields=None):
+        """按 (created_at, id) 倒序的游标分页查询单词
+
+        每页只读取 limit + 1 行（多读的一行用于判断是否还有下一页），
+        与所在页数无关；fields 指定时只加载需要的列。返回 (单词列表, 下一页游标或 None)。
+        """
+        query = Word.query
+        if language:
+            query = query.filter(Word.language == language)
+        if difficulty:
+            query = query.filter(Word.difficulty.in_(difficulty))
+        if reviewed is True:
+            query = query.filter(Word.review_count > 0)
+        elif reviewed is False:
+            query = query.filter(db.or_(Word.review_count == 0, Word.review_count.is_(None)))
+        if search:
+            pattern = f"%{search}%"
+            query = query.filter(db.or_(Word.word.ilike(pattern), Word.meaning.ilike(pattern)))
+        if cursor:
+            created_at, word_id = self.decode_cursor(cursor)
+            query = query.filter(db.or_(
+                Word.created_at < created_at,
+                db.and_(Word.created_at == created_at, Word.id < word_id)
+            ))
+        if fields:
+            # 游标需要 created_at 和 id
+            columns = set(fields) | {'id', 'created_at'}
+            query = query.options(load_only(*[getattr(Word, name) for name in columns]))
+
+        words = query.order_by(Word.created_at.desc(), Word.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(words) > limit:
+            words = words[:limit]
+            next_cursor = self.encode_cursor(words[-1])
+        return words, next_cursor
+
+    def search_words(self, query, language=None, limit=WORDS_PAGE_SIZE, fields=None):
+        """全文检索单词，按相关度排序；全文索引不可用时回退到 LIKE 查询（按创建时间倒序）"""
+        ids = search_index.search(query, limit, language)
+        base = Word.query
+        if fields:
+            base = base.options(load_only(*[getattr(Word, name) for name in set(fields) | {'id'}]))
+        if ids is not None:
+            words = {word.id: word for word in base.filter(Word.id.in_(ids))} if ids else {}
+            return [words[word_id] for word_id in ids if word_id in words]
+
+        pattern = f"%{query.strip()}%"
+        base = base.filter(db.or_(
+            Word.word.ilike(pattern), Word.meaning.ilike(pattern),
+            Word.phonetic.ilike(pattern), Word.example.ilike(pattern)
+        ))
+        if language:
+            base = base.filter(Word.language == language)
+        return base.order_by(Word.created_at.desc(), Word.id.desc()).limit(limit).all()
+
     def get_word(self, word_id):
         """根据ID获取单词"""
         return Word.query.get(word_id)
 
+    def get_words_by_ids(self, word_ids):
+        """根据ID列表批量获取单词（单次查询）"""
+        if not word_ids:
+            return []
+        return Word.query.filter(Word.id.in_(word_ids)).all()
+
     def get_word_by_text(self, word_text):
         """根据单词文本获取单词"""
         return Word.query.filter_by(word=word_text).first()
 
     def _strip_html_tags(self, text):
         """移除HTML标签，保留结构，并将列表转换为序号格式"""
-        if not text:
-            return ""
-        
-        import re
-        import html
-        
-        # 1. 解码HTML实体
-        text = html.unescape(text)
-        
-        # 移除script和style
-        text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-        text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-
-        # 2. 处理有序列表 <ol> -> 1. 2. 3.
-        def replace_ol(match):
-            content = match.group(1)
-            # 查找所有<li>项
-            items = re.findall(r'<li[^>]*>(.*?)</li>', content, flags=re.DOTALL | re.IGNORECASE)
-            if not items:
-                return content
-            
-            result = []
-            for i, item in enumerate(items, 1):
-                # 清理item内部的标签（递归或简单清理）
-                clean_item = re.sub(r'<[^>]+>', '', item).strip()
-                if clean_item:
-                    result.append(f"{i}. {clean_item}")
-            
-            return '\n'.join(result) + '\n'
-
-        # 匹配 <ol>...</ol>
-        text = re.sub(r'<ol[^>]*>(.*?)</ol>', replace_ol, text, flags=re.DOTALL | re.IGNORECASE)
-        
-        # 3. 处理无序列表 <ul> -> • 
-        def replace_ul(match):
-            content = match.group(1)
-            items = re.findall(r'<li[^>]*>(.*?)</li>', content, flags=re.DOTALL | re.IGNORECASE)
-            if not items:
-                return content
-            
-            result = []
-            for item in items:
-                clean_item = re.sub(r'<[^>]+>', '', item).strip()
-                if clean_item:
-                    result.append(f"• {clean_item}")
-            
-            return '\n'.join(result) + '\n'
-
-        text = re.sub(r'<ul[^>]*>(.*?)</ul>', replace_ul, text, flags=re.DOTALL | re.IGNORECASE)
-        
-        # 4. 处理独立的 <li> (如果存在且未被包裹)
-        text = re.sub(r'<li[^>]*>', '\n• ', text, flags=re.IGNORECASE)
-        
-        # 5. 将块级标签转换为换行
-        text = re.sub(r'<(br|div|p|h\d|tr)[^>]*>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'</(div|p|h\d|tr)[^>]*>', '\n', text, flags=re.IGNORECASE)
-        
-        # 6. 移除剩余标签
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # 7. 清理空白
-        # 合并多余换行
-        text = re.sub(r'\n\s*\n', '\n', text)
-        # 清理每行首尾空白
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        text = '\n'.join(lines)
-        
-        return text
+        return html_to_text(text)
 
     def add_word(self, word, meaning, phonetic='', example='', language='en', difficulty=1):
         """添加新单词"""
@@ -120,6 +135,8 @@ class WordService:
                 difficulty=difficulty
             )
             db.session.add(new_word)
+            db.session.flush()
+            search_index.index_words([new_word])
             db.session.commit()
             self.logger.info(f"成功添加单词: {word}")
             return new_word
@@ -135,6 +152,9 @@ class WordService:
             if not existing_word:
                 return None
 
+            # 记录影响音频的字段，变化时清除音频元数据
+            audio_fields = (existing_word.word, existing_word.meaning, existing_word.language)
+
             # 更新字段
             if word is not None:
                 existing_word.word = word.strip()
@@ -149,6 +169,18 @@ class WordService:
             if difficulty is not None:
                 existing_word.difficulty = difficulty
 
+            # 只清除受影响变体的元数据：单词或语言变化影响发音和拼读，含义变化影响含义音频
+            stale_variants = []
+            if (existing_word.word, existing_word.language) != (audio_fields[0], audio_fields[2]):
+                stale_variants.extend(['word', 'spell'])
+            if existing_word.meaning != audio_fields[1]:
+                stale_variants.append('meaning')
+            if stale_variants:
+                WordAudio.query.filter(
+                    WordAudio.word_id == word_id, WordAudio.variant.in_(stale_variants)
+                ).delete(synchronize_session=False)
+
+            search_index.index_words([existing_word])
             db.session.commit()
             self.logger.info(f"成功更新单词: {word_id}")
             return existing_word
@@ -163,7 +195,11 @@ class WordService:
             word = Word.query.get(word_id)
             if not word:
                 return False
+            WordAudio.query.filter_by(word_id=word_id).delete()
+            ReviewLog.query.filter_by(word_id=word_id).delete()
             db.session.delete(word)
+            search_index.remove([word_id])
+            self._add_tombstones([word_id])
             db.session.commit()
             self.logger.info(f"成功删除单词: {word_id}")
             return True
@@ -172,135 +208,230 @@ class WordService:
             self.logger.error(f"删除单词失败: {e}")
             return False
 
-    def mark_reviewed(self, word_id):
-        """标记单词为已复习"""
+    def clear_all(self):
+        """删除全部单词及其音频元数据，返回删除数"""
         try:
-            word = Word.query.get(word_id)
-            if word:
-                word.review_count += 1
-                word.last_reviewed = datetime.utcnow()
-                db.session.commit()
-                return True
+            ids = [word_id for (word_id,) in db.session.query(Word.id)]
+            WordAudio.query.delete()
+            ReviewLog.query.delete()
+            Word.query.delete()
+            search_index.clear()
+            self._add_tombstones(ids)
+            db.session.commit()
+            self.logger.info(f"已清空词库: {len(ids)} 个单词")
+            return len(ids)
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _add_tombstones(self, word_ids):
+        """在当前事务中记录删除（单词ID可能被复用，重复删除时更新时间），并清理过期的记录"""
+        now = datetime.utcnow()
+        WordTombstone.query.filter(
+            WordTombstone.deleted_at < now - timedelta(seconds=SYNC_TOMBSTONE_RETENTION)
+        ).delete(synchronize_session=False)
+        if word_ids:
+            WordTombstone.query.filter(WordTombstone.word_id.in_(word_ids)).delete(synchronize_session=False)
+            db.session.execute(insert(WordTombstone), [{'word_id': i, 'deleted_at': now} for i in word_ids])
+
+    def get_changes(self, since=None, fields=None):
+        """增量同步：返回 since 之后变更的单词和删除的单词ID
+
+        返回 {'words', 'deleted', 'watermark', 'reset'}。客户端保存 watermark 作为下次的 since；
+        reset 为 True 时（首次同步或 since 早于删除记录的保留期）客户端应丢弃本地数据，用 words 全量替换。
+        """
+        # updated_at 和 deleted_at 在写入（flush）时取值，事务提交可能晚于此：
+        # 同步发生在两者之间时，这些行的时间戳早于查询时间却尚不可见。
+        # 水位回退一个安全余量，下次同步会重新返回余量内的变更（客户端按 ID 覆盖，重复无害）
+        now = datetime.utcnow()
+        watermark = now - timedelta(seconds=SYNC_WATERMARK_MARGIN)
+        horizon = now - timedelta(seconds=SYNC_TOMBSTONE_RETENTION)
+        reset = since is None or since < horizon
+
+        query = Word.query
+        if fields:
+            query = query.options(load_only(*[getattr(Word, name) for name in set(fields) | {'id'}]))
+        deleted = []
+        if not reset:
+            query = query.filter(Word.updated_at >= since)
+            deleted = [
+                word_id for (word_id,) in db.session.query(WordTombstone.word_id)
+                .filter(WordTombstone.deleted_at >= since).order_by(WordTombstone.word_id)
+            ]
+        words = query.order_by(Word.updated_at.asc(), Word.id.asc()).all()
+        if deleted and words:
+            # 删除后 ID 被新单词复用时以现存的单词为准
+            live = {word.id for word in words}
+            deleted = [word_id for word_id in deleted if word_id not in live]
+        return {'words': words, 'deleted': deleted, 'watermark': watermark, 'reset': reset}
+
+    def mark_reviewed(self, word_id, grade=scheduler.DEFAULT_GRADE):
+        """记录一次复习，按回答质量 grade（0-5）更新复习计划"""
+        result = self.record_reviews([(word_id, datetime.utcnow(), grade)])
+        return bool(result and result['recorded'])
+
+    def record_reviews(self, events):
+        """批量记录复习：events 为 [(word_id, reviewed_at, grade)]
+
+        一次查询取出涉及的单词，按时间顺序应用到复习计划，复习历史批量插入，整批在单个事务中提交。
+        早于单词上次复习时间的迟到记录只写入历史，不改变复习计划。
+        返回 {'recorded': 写入条数, 'missing': 不存在的单词ID}，失败时返回 None。
+        """
+        try:
+            words = {word.id: word for word in self.get_words_by_ids(list({e[0] for e in events}))}
+            logs = []
+            missing = set()
+            for word_id, reviewed_at, grade in sorted(events, key=lambda e: e[1]):
+                word = words.get(word_id)
+                if word is None:
+                    missing.add(word_id)
+                    continue
+                interval = None
+                if word.last_reviewed is None or reviewed_at >= word.last_reviewed:
+                    scheduler.review(word, grade, reviewed_at)
+                    interval = word.interval_days
+                logs.append({'word_id': word_id, 'reviewed_at': reviewed_at, 'grade': grade, 'interval_days': interval})
+            if logs:
+                db.session.execute(insert(ReviewLog), logs)
+            db.session.commit()
+            return {'recorded': len(logs), 'missing': sorted(missing)}
         except Exception as e:
             db.session.rollback()
-            self.logger.error(f"标记复习失败: {e}")
-        return False
+            self.logger.error(f"记录复习失败: {e}")
+            return None
+
+    def get_review_history(self, word_id, limit=100):
+        """单词的复习历史，最近的在前"""
+        return ReviewLog.query.filter_by(word_id=word_id) \
+            .order_by(ReviewLog.reviewed_at.desc()).limit(limit).all()
 
     def get_words_for_review(self, limit=10):
-        """获取需要复习的单词"""
-        # 获取复习次数较少或很久未复习的单词
-        return Word.query.filter(
-            db.or_(
-                Word.last_reviewed.is_(None),
-                Word.last_reviewed < datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            )
-        ).order_by(
-            db.asc(Word.review_count),
-            db.asc(Word.last_reviewed)
-        ).limit(limit).all()
+        """获取已到期的单词，最早到期的在前（due_at 索引范围查询）"""
+        return Word.query.filter(Word.due_at <= datetime.utcnow()) \
+            .order_by(Word.due_at.asc()).limit(limit).all()
+
+    def _normalize_row(self, row):
+        """把导入行标准化为插入用的字典，缺少单词或释义时返回 None"""
+        if not isinstance(row, dict):
+            return None
+        # 标准化列名
+        word = str(row.get('单词', row.get('word', ''))).strip()
+        meaning = str(row.get('解释', row.get('meaning', ''))).strip()
+        phonetic = str(row.get('音标', row.get('phonetic', ''))).strip()
+        example = str(row.get('笔记', row.get('example', ''))).strip()
+
+        # 清理HTML标签（防止欧路词典等第三方数据污染）
+        meaning = self._strip_html_tags(meaning).strip()
+        example = self._strip_html_tags(example).strip()
+
+        if not word or not meaning:
+            return None
+        # 检测语言
+        language = 'zh' if any(ord(char) > 127 for char in word) else 'en'
+        return {
+            'word': word,
+            'meaning': meaning,
+            'phonetic': phonetic,
+            'example': example,
+            'language': language,
+            'difficulty': 1,
+        }
+
+    def bulk_import(self, rows, batch_size=IMPORT_BATCH_SIZE, progress=None):
+        """批量导入单词
+
+        一次查询取出已有单词集合，在内存中去重（包括文件内部的重复），
+        再按批次单事务批量插入。返回导入报告：
+        {'total': 总行数, 'inserted': 新增数, 'duplicate': 重复数, 'invalid': 无效行数, 'cancelled': 是否中止}
+
+        progress(report) 每处理 batch_size 行调用一次，返回 False 时提交已处理的批次后停止。
+        """
+        report = {'total': 0, 'inserted': 0, 'duplicate': 0, 'invalid': 0, 'cancelled': False}
+        existing = {text for (text,) in db.session.query(Word.word)}
+        batch = []
+
+        def flush():
+            if not batch:
+                return
+            try:
+                db.session.execute(insert(Word), batch)
+                # 批量插入不返回ID，按单词文本（已去重）取回后写入全文索引
+                ids = dict(
+                    db.session.query(Word.word, Word.id).filter(Word.word.in_([row['word'] for row in batch]))
+                )
+                search_index.index_words([dict(row, id=ids[row['word']]) for row in batch])
+                db.session.commit()
+                report['inserted'] += len(batch)
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                batch.clear()
+
+        for row in rows:
+            report['total'] += 1
+            try:
+                values = self._normalize_row(row)
+            except Exception as e:
+                self.logger.warning(f"导入行数据失败: {e}")
+                values = None
+            if values is None:
+                report['invalid'] += 1
+            elif values['word'] in existing:
+                report['duplicate'] += 1
+            else:
+                existing.add(values['word'])
+                batch.append(values)
+                if len(batch) >= batch_size:
+                    flush()
+            if progress and report['total'] % batch_size == 0:
+                flush()
+                if progress(report) is False:
+                    report['cancelled'] = True
+                    break
+        flush()
+        return report
 
     def import_from_file(self, file_path):
-        """从文件导入单词"""
+        """从文件导入单词，返回导入报告，失败时返回 False"""
         try:
             if not os.path.exists(file_path):
                 self.logger.error(f"文件不存在: {file_path}")
                 return False
 
-            imported_count = 0
-            
-            if file_path.endswith('.csv'):
-                # 尝试不同的编码
-                encodings = ['utf-8', 'gbk', 'gb2312']
-                df = None
-                for encoding in encodings:
-                    try:
-                        with open(file_path, 'r', encoding=encoding) as f:
-                            reader = csv.DictReader(f)
-                            rows = list(reader)
-                            break
-                    except UnicodeDecodeError:
-                        continue
-                
-                if not rows:
-                    raise ValueError("无法解码CSV文件或文件为空")
-                
-                for row in rows:
-                    try:
-                        # 标准化列名
-                        word = str(row.get('单词', row.get('word', ''))).strip()
-                        meaning = str(row.get('解释', row.get('meaning', row.get('解释', '')))).strip()
-                        phonetic = str(row.get('音标', row.get('phonetic', ''))).strip()
-                        example = str(row.get('笔记', row.get('example', ''))).strip()
-                        
-                        # 清理HTML标签（防止欧路词典等第三方数据污染）
-                        meaning = self._strip_html_tags(meaning)
-                        example = self._strip_html_tags(example)
-                        
-                        if word and meaning:
-                            # 检测语言
-                            language = 'zh' if any(ord(char) > 127 for char in word) else 'en'
-                            self.add_word(word, meaning, phonetic, example, language)
-                            imported_count += 1
-                    except Exception as e:
-                        self.logger.warning(f"导入行数据失败: {e}")
-                        continue
-                        
-            elif file_path.endswith('.json'):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                if isinstance(data, list):
-                    rows = data
-                elif isinstance(data, dict):
-                    rows = [data]
-                else:
-                    raise ValueError("JSON格式不支持")
-                
-                for row in rows:
-                    try:
-                        # 标准化列名
-                        word = str(row.get('单词', row.get('word', ''))).strip()
-                        meaning = str(row.get('解释', row.get('meaning', row.get('解释', '')))).strip()
-                        phonetic = str(row.get('音标', row.get('phonetic', ''))).strip()
-                        example = str(row.get('笔记', row.get('example', ''))).strip()
-                        
-                        # 清理HTML标签
-                        meaning = self._strip_html_tags(meaning)
-                        example = self._strip_html_tags(example)
-                        
-                        if word and meaning:
-                            # 检测语言
-                            language = 'zh' if any(ord(char) > 127 for char in word) else 'en'
-                            self.add_word(word, meaning, phonetic, example, language)
-                            imported_count += 1
-                    except Exception as e:
-                        self.logger.warning(f"导入行数据失败: {e}")
-                        continue
-            else:
+            if not file_path.endswith(('.csv', '.json', '.jsonl', '.ndjson')):
                 self.logger.error(f"不支持的文件格式: {file_path}")
                 return False
 
-            self.logger.info(f"成功导入 {imported_count} 个单词")
-            return imported_count
+            # 流式读取，边解析边按批次提交，内存占用不随文件大小增长
+            report = self.bulk_import(import_reader.iter_rows(file_path))
+            self.logger.info(
+                f"成功导入 {report['inserted']} 个单词，重复 {report['duplicate']}，无效 {report['invalid']}"
+            )
+            return report
         except Exception as e:
             self.logger.error(f"导入文件失败: {e}")
             return False
 
     def get_statistics(self):
-        """获取单词统计信息"""
+        """获取单词统计信息（单次聚合查询，使用 (language, review_count) 覆盖索引）"""
         try:
-            total_words = Word.query.count()
-            english_words = Word.query.filter_by(language='en').count()
-            chinese_words = Word.query.filter_by(language='zh').count()
-            reviewed_words = Word.query.filter(Word.review_count > 0).count()
-            
+            rows = db.session.query(
+                Word.language,
+                func.count(),
+                func.sum(case((Word.review_count > 0, 1), else_=0))
+            ).group_by(Word.language).all()
+            counts = {language: (total, reviewed or 0) for language, total, reviewed in rows}
+            total_words = sum(total for total, _ in counts.values())
+            reviewed_words = sum(reviewed for _, reviewed in counts.values())
+
             return {
                 'total_words': total_words,
-                'english_words': english_words,
-                'chinese_words': chinese_words,
+                'english_words': counts.get('en', (0, 0))[0],
+                'chinese_words': counts.get('zh', (0, 0))[0],
                 'reviewed_words': reviewed_words,
                 'unreviewed_words': total_words - reviewed_words
             }
         except Exception as e:
             self.logger.error(f"获取统计信息失败: {e}")
-            return {}
\ No newline at end of file
+            return {}
@@ -0,0 +1,32 @@
+"""html_to_text 微基准：python tests/bench_html_sanitizer.py [重复次数]
+
+对黄金语料中的每条输入计时，输出每行的平均耗时（导入时每行的含义和例句各调用一次）。
+不由 pytest 收集，用于修改 html_sanitizer 前后对比。
+"""
+import os
+import sys
+import json
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.html_sanitizer import html_to_text  # noqa: E402
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'data', 'html_sanitizer_golden.json')
+
+
+def main(repeat=2000):
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        inputs = [case['input'] for case in json.load(f)]
+    plain = [text for text in inputs if '<' not in text and '&' not in text]
+    tagged = [text for text in inputs if text not in plain]
+
+    for label, rows in (('全部', inputs), ('含标签/实体', tagged), ('纯文本', plain)):
+        if not rows:
+            continue
+        seconds = min(timeit.repeat(lambda: [html_to_text(row) for row in rows], number=repeat, repeat=5))
+        print(f"{label:8} {len(rows):3} 条  {seconds / (repeat * len(rows)) * 1e6:7.2f} us/行")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
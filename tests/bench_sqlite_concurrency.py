@@ -0,0 +1,142 @@
+"""SQLite 并发压力测试：python tests/bench_sqlite_concurrency.py [mixed|import] [--duration 秒]
+
+模拟生产环境的多个 worker 进程同时访问同一个数据库文件（临时目录中新建，不影响 data/words.db）：
+  mixed   两个进程各 8 个线程混合读写（列表 / 统计 / 标记复习 / 添加单词），输出吞吐和错误数，
+          其中 locked 为 database is locked 错误的次数
+  import  一个进程持续批量导入，主进程同时反复读取统计，输出读取延迟分布
+用于修改连接参数（extensions 中的 PRAGMA）或写入路径前后对比。不由 pytest 收集。
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+import multiprocessing as mp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SEED_WORDS = 2000
+THREADS = 8
+
+
+def _create_app():
+    import logging
+    logging.disable(logging.CRITICAL)
+    from app import create_app
+    return create_app()
+
+
+def _mixed_worker(pid, duration, results):
+    app = _create_app()
+    counts = {'ok': 0, 'errors': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def run(tid):
+        client = app.test_client()
+        rnd = random.Random(pid * 100 + tid)
+        n = 0
+        end = time.time() + duration
+        while time.time() < end:
+            n += 1
+            r = rnd.random()
+            if r < 0.5:
+                response = client.get('/api/words?limit=50')
+            elif r < 0.6:
+                response = client.get('/api/statistics')
+            elif r < 0.85:
+                response = client.post(f'/api/words/{rnd.randint(1, SEED_WORDS)}/review')
+            else:
+                response = client.post('/api/words', json={'word': f'p{pid}t{tid}n{n}', 'meaning': '含义'})
+            body = response.get_data(as_text=True)
+            with lock:
+                if response.status_code < 300:
+                    counts['ok'] += 1
+                else:
+                    counts['errors'] += 1
+                    if 'locked' in body:
+                        counts['locked'] += 1
+
+    threads = [threading.Thread(target=run, args=(tid,)) for tid in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(counts)
+
+
+def bench_mixed(duration):
+    app = _create_app()
+    with app.app_context():
+        from routes.api import word_service
+        word_service.bulk_import([{'word': f'seed{i}', 'meaning': '含义'} for i in range(SEED_WORDS)])
+
+    results = mp.Queue()
+    processes = [mp.Process(target=_mixed_worker, args=(pid, duration, results)) for pid in range(2)]
+    for process in processes:
+        process.start()
+    totals = {'ok': 0, 'errors': 0, 'locked': 0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for process in processes:
+        process.join()
+    print(f"mixed: ok={totals['ok']} ({totals['ok'] / duration:.0f} 请求/秒) "
+          f"errors={totals['errors']} locked={totals['locked']}")
+
+
+def _importer(started, batches):
+    app = _create_app()
+    with app.app_context():
+        from routes.api import word_service
+        started.set()
+        for k in range(batches):
+            rows = ({'word': f'imp{k}_{i}', 'meaning': '含义 meaning'} for i in range(10000))
+            word_service.bulk_import(rows, batch_size=5000)
+
+
+def bench_import(batches):
+    app = _create_app()
+    client = app.test_client()
+    started = mp.Event()
+    process = mp.Process(target=_importer, args=(started, batches))
+    process.start()
+    started.wait()
+
+    latencies = []
+    errors = 0
+    while process.is_alive():
+        t = time.perf_counter()
+        response = client.get('/api/statistics')
+        latencies.append(time.perf_counter() - t)
+        errors += response.status_code != 200
+    process.join()
+    latencies.sort()
+    print(f"import: reads={len(latencies)} p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms "
+          f"max={latencies[-1] * 1000:.0f}ms errors={errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('mode', nargs='?', choices=['mixed', 'import', 'all'], default='all')
+    parser.add_argument('--duration', type=float, default=10, help='mixed 模式的运行时间（秒）')
+    parser.add_argument('--batches', type=int, default=6, help='import 模式导入的批数（每批 10000 行）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 在导入 config 之前设置，子进程继承；命令行模式下 create_app 不启动后台任务
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'words.db')}"
+        os.environ['FLASK_RUN_FROM_CLI'] = 'true'
+        os.environ['PREWARM_AFTER_IMPORT'] = 'false'
+        os.chdir(ROOT)
+        if args.mode in ('mixed', 'all'):
+            bench_mixed(args.duration)
+        if args.mode in ('import', 'all'):
+            bench_import(args.batches)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""测试公共设置：从仓库根目录导入应用模块（与 app.py 的运行方式一致），临时目录中的音频服务"""
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extensions import db  # noqa: E402
+from services import audio_service as audio_service_module  # noqa: E402
+from services.audio_cache import AudioCache  # noqa: E402
+from services.word_audio_service import WordAudioService  # noqa: E402
+
+
+@pytest.fixture
+def audio_env(tmp_path, monkeypatch):
+    """临时数据库上的 (AudioService, WordAudioService, 合成过的文本列表)"""
+    # 缓存、锁目录和 manifest 都放在临时目录，使用不联网的 stub 引擎
+    monkeypatch.setattr(audio_service_module, 'AUDIO_FOLDER', str(tmp_path / 'cache'))
+    monkeypatch.setattr(audio_service_module, 'AUDIO_LOCK_FOLDER', str(tmp_path / 'locks'))
+    monkeypatch.setattr(audio_service_module, 'TTS_ENGINES', ['stub'])
+    monkeypatch.setattr(
+        audio_service_module, 'AudioCache', lambda root: AudioCache(root, str(tmp_path / 'manifest.db'))
+    )
+    os.makedirs(tmp_path / 'cache')
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'words.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        import models  # noqa: F401
+        db.create_all()
+        audio = audio_service_module.AudioService()
+        synthesized = []
+        synthesize = audio.tts.synthesize
+
+        def counting(text, lang, output_path, primary_only=False):
+            synthesized.append(text)
+            return synthesize(text, lang, output_path, primary_only)
+
+        audio.tts.synthesize = counting
+        yield audio, WordAudioService(audio), synthesized
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,101 @@
+"""缓存音频的发送：强 ETag、304、Range，每次请求只对文件做一次 stat；回退音频的判断按版本缓存"""
+import os
+
+import pytest
+from flask import Flask
+
+import routes.api as api
+from services.audio_service import audio_etag
+
+KEY = 'ab' + '0' * 38
+
+
+@pytest.fixture
+def audio_path(tmp_path):
+    path = tmp_path / 'ab' / f'{KEY}.mp3'
+    path.parent.mkdir()
+    path.write_bytes(bytes(range(256)) * 8)
+    return str(path)
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """统计 os.stat / os.fstat 的调用次数"""
+    calls = []
+    stat, fstat = os.stat, os.fstat
+    monkeypatch.setattr(os, 'stat', lambda *a, **k: calls.append('stat') or stat(*a, **k))
+    monkeypatch.setattr(os, 'fstat', lambda *a, **k: calls.append('fstat') or fstat(*a, **k))
+    return calls
+
+
+def _send(audio_path, headers=None):
+    app = Flask(__name__)
+    with app.test_request_context(headers=headers or {}):
+        response = api.send_audio_file(audio_path)
+        body = b''.join(response.response) if response.status_code != 304 else b''
+        response.close()
+        return response, body
+
+
+def test_full_response(audio_path, stats):
+    response, body = _send(audio_path)
+    assert stats == ['fstat']
+    assert response.status_code == 200
+    assert body == bytes(range(256)) * 8
+    assert response.content_length == 2048
+    assert response.get_etag() == (audio_etag(audio_path), False)
+    assert response.get_etag()[0].startswith(KEY)
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+
+
+def test_not_modified(audio_path, stats):
+    etag = audio_etag(audio_path)
+    stats.clear()
+    response, _body = _send(audio_path, {'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert stats == ['fstat']
+
+
+def test_range(audio_path, stats):
+    response, body = _send(audio_path, {'Range': 'bytes=256-511'})
+    assert response.status_code == 206
+    assert body == bytes(range(256))
+    assert response.headers['Content-Range'] == 'bytes 256-511/2048'
+    assert stats == ['fstat']
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        _send(str(tmp_path / f'{KEY}.mp3'))
+
+
+def test_fallback_lookup_is_memoized_per_version(audio_env, monkeypatch):
+    audio, _word_audio, _synthesized = audio_env
+    path = audio.generate_audio('memo', 'en')
+    key = os.path.basename(path)[:-4]
+    lookups = []
+    lookup = audio.cache.lookup
+    monkeypatch.setattr(audio.cache, 'lookup', lambda k: lookups.append(k) or lookup(k))
+
+    etag = audio_etag(path)
+    assert audio.is_fallback_version(etag) is False
+    assert audio.is_fallback_version(etag) is False
+    assert lookups == [key]
+
+    # 同一键下的音频被替换为回退引擎的输出：修改时间变化，重新查询
+    audio.cache.record(key, 'memo', 'en', engine='espeak')
+    audio.fallback_engines.add('espeak')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1000))
+    assert audio.is_fallback_version(audio_etag(path)) is True
+    assert lookups == [key, key]
+
+
+def test_unrecorded_version_is_not_memoized(audio_env, monkeypatch):
+    audio, _word_audio, _synthesized = audio_env
+    etag = 'cd' + '0' * 38 + '-1'
+    assert audio.is_fallback_version(etag) is False
+    lookups = []
+    lookup = audio.cache.lookup
+    monkeypatch.setattr(audio.cache, 'lookup', lambda k: lookups.append(k) or lookup(k))
+    assert audio.is_fallback_version(etag) is False
+    assert lookups == ['cd' + '0' * 38]
@@ -0,0 +1,65 @@
+"""缓存固定按缓存键而不是文本
+
+配置变化（引擎、缓存键版本、含义停顿）后，同一文本的旧条目不会再被命中，不能因文本相同而一直固定。
+"""
+from extensions import db
+from services.cache_manager import AudioCacheManager
+
+
+def _pinned(cache):
+    conn = cache.connect()
+    try:
+        return {key for (key,) in conn.execute('SELECT key FROM entries WHERE pinned = 1')}
+    finally:
+        conn.close()
+
+
+def _record_stale(cache, text, lang, engine):
+    """模拟旧配置下生成的同文本条目"""
+    key = cache.make_key(text, lang, engine=engine)
+    cache.ensure_shard(key)
+    with open(cache.path_for(key), 'wb') as f:
+        f.write(b'\xff\xfb\x90\x00' + b'\x00' * 413)
+    cache.record(key, text, lang, engine=engine)
+    return key
+
+
+def test_pins_current_keys_only(audio_env):
+    from models import Word
+    audio, word_audio, _synthesized = audio_env
+    db.session.add(Word(word='cab', meaning='出租车，车', language='en'))
+    db.session.commit()
+    assert audio.generate_audio('cab', 'en')
+    assert audio.generate_audio('cab', 'en', spell_mode=True, spell_delay=0.5)
+    assert audio.generate_meaning_audio('出租车，车')
+    stale = _record_stale(audio.cache, 'cab', 'en', engine='gtts')
+
+    manager = AudioCacheManager(audio, word_audio)
+    manager.refresh_pins()
+    pinned = _pinned(audio.cache)
+
+    assert audio.resolve_audio('cab', 'en')[1] in pinned
+    assert audio.resolve_audio('cab', 'en', True, 0.5)[1] in pinned
+    assert audio.resolve_meaning_audio('出租车，车')[1] in pinned
+    assert audio.resolve_audio('出租车', 'zh')[1] in pinned
+    assert audio.resolve_audio('C', 'en')[1] in pinned
+    assert stale not in pinned
+
+
+def test_unpins_deleted_words(audio_env):
+    from models import Word
+    audio, word_audio, _synthesized = audio_env
+    word = Word(word='dog', meaning='狗', language='en')
+    db.session.add(word)
+    db.session.commit()
+    assert audio.generate_audio('dog', 'en')
+    key = audio.resolve_audio('dog', 'en')[1]
+
+    manager = AudioCacheManager(audio, word_audio)
+    manager.refresh_pins()
+    assert key in _pinned(audio.cache)
+
+    db.session.delete(word)
+    db.session.commit()
+    manager.refresh_pins()
+    assert key not in _pinned(audio.cache)
@@ -0,0 +1,30 @@
+"""html_to_text 的输出回归测试
+
+data/html_sanitizer_golden.json 中的期望输出由重构前的 WordService._strip_html_tags 生成，
+预编译正则和快速路径不得改变任何一条的结果。新增用例时用当前实现生成期望输出并人工核对。
+"""
+import os
+import json
+
+import pytest
+
+from services.html_sanitizer import html_to_text
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'data', 'html_sanitizer_golden.json')
+
+with open(GOLDEN_PATH, encoding='utf-8') as f:
+    GOLDEN = json.load(f)
+
+
+@pytest.mark.parametrize('case', GOLDEN, ids=[case['name'] for case in GOLDEN])
+def test_golden_output(case):
+    assert html_to_text(case['input']) == case['expected']
+
+
+def test_none_is_empty():
+    assert html_to_text(None) == ''
+
+
+def test_plain_text_skips_tag_passes():
+    # 不含标签的文本只做空白清理
+    assert html_to_text(' 苹果 \n\n 梨 ') == '苹果\n梨'
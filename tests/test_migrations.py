@@ -0,0 +1,135 @@
+"""主数据库迁移的查询计划回归测试
+
+分别从最初版本的单词表（只有 ix_words_word 索引）迁移、以及由 create_all 新建数据库，
+捕获 WordService 实际发出的复习、统计和按语言列表查询，用 EXPLAIN QUERY PLAN 确认它们走索引。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import event, text
+
+import migrations
+from extensions import db
+from services.word_service import WordService
+
+# 加入迁移之前的单词表结构
+BASELINE_SCHEMA = (
+    'CREATE TABLE words ('
+    ' id INTEGER NOT NULL, word VARCHAR(100) NOT NULL, meaning VARCHAR(500) NOT NULL,'
+    ' phonetic VARCHAR(200), example TEXT, language VARCHAR(10), difficulty INTEGER,'
+    ' review_count INTEGER, last_reviewed DATETIME, created_at DATETIME, updated_at DATETIME,'
+    ' PRIMARY KEY (id))',
+    'CREATE INDEX ix_words_word ON words (word)',
+)
+
+
+def _seed_baseline(conn, count=200):
+    now = datetime.utcnow()
+    conn.execute(text(
+        'INSERT INTO words (word, meaning, language, difficulty, review_count, last_reviewed, created_at, updated_at)'
+        ' VALUES (:word, :meaning, :language, 1, :review_count, :last_reviewed, :created_at, :created_at)'
+    ), [{
+        'word': f'word{i}',
+        'meaning': f'含义{i}',
+        'language': 'zh' if i % 3 == 0 else 'en',
+        'review_count': i % 4,
+        'last_reviewed': now - timedelta(days=i % 5) if i % 4 else None,
+        'created_at': now - timedelta(minutes=i),
+    } for i in range(count)])
+
+
+@pytest.fixture(params=['baseline', 'fresh'])
+def app(request, tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'words.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        if request.param == 'baseline':
+            with db.engine.begin() as conn:
+                for statement in BASELINE_SCHEMA:
+                    conn.execute(text(statement))
+                _seed_baseline(conn)
+        # 与 create_app 的启动顺序一致：先 create_all 再迁移
+        import models  # noqa: F401
+        db.create_all()
+        migrations.run(db.engine)
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _query_plans(call):
+    """执行 call，返回其中每条 SELECT 的查询计划（各步骤以 | 连接）"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert statements
+    plans = []
+    with db.engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            plans.append(' | '.join(row[3] for row in rows))
+    return plans
+
+
+def test_schema_version(app):
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA user_version').scalar() == len(migrations.MIGRATIONS)
+        columns = {row[1] for row in conn.exec_driver_sql('PRAGMA table_info(words)')}
+    assert {'ease_factor', 'interval_days', 'repetitions', 'due_at'} <= columns
+
+
+def test_unused_review_index_dropped(app):
+    with db.engine.connect() as conn:
+        indexes = {row[1] for row in conn.exec_driver_sql('PRAGMA index_list(words)')}
+    assert 'idx_words_review' not in indexes
+    assert {'idx_words_due_at', 'idx_words_language_review', 'idx_words_language_created'} <= indexes
+
+
+def test_review_index_dropped_on_upgrade(app):
+    # 版本 2 的数据库仍带有旧索引
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('CREATE INDEX idx_words_review ON words (review_count, last_reviewed)')
+        conn.exec_driver_sql('PRAGMA user_version = 2')
+    migrations.run(db.engine)
+    with db.engine.connect() as conn:
+        indexes = {row[1] for row in conn.exec_driver_sql('PRAGMA index_list(words)')}
+    assert 'idx_words_review' not in indexes
+
+
+def test_migration_is_idempotent(app):
+    assert migrations.run(db.engine) == len(migrations.MIGRATIONS)
+
+
+def test_review_queue_uses_due_index(app):
+    (plan,) = _query_plans(lambda: WordService().get_words_for_review(limit=10))
+    assert 'idx_words_due_at (due_at<?)' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_statistics_use_covering_index(app):
+    (plan,) = _query_plans(WordService().get_statistics)
+    assert 'USING COVERING INDEX idx_words_language_review' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_language_list_uses_language_index(app):
+    (plan,) = _query_plans(lambda: WordService().list_words(language='en', limit=20))
+    assert 'idx_words_language_created (language=?)' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_list_uses_created_index(app):
+    (plan,) = _query_plans(lambda: WordService().list_words(limit=20))
+    assert 'idx_words_created_id' in plan
+    assert 'TEMP B-TREE' not in plan
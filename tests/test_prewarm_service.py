@@ -0,0 +1,68 @@
+"""按需生成队列：批量音频清单提交的音频生成后刷新单词音频元数据"""
+from flask import current_app
+
+from extensions import db
+from services.prewarm_service import PrewarmService, RateLimiter
+
+
+def _service(audio, word_audio, tmp_path):
+    service = PrewarmService(audio, word_audio, state_path=str(tmp_path / 'prewarm.json'))
+    service.rate_limiter = RateLimiter(0)
+    return service
+
+
+def _rows(word_id):
+    from models import WordAudio
+    db.session.expire_all()
+    return {
+        (row.variant, row.spell_delay): row
+        for row in WordAudio.query.filter_by(word_id=word_id)
+    }
+
+
+def test_enqueued_audio_refreshes_word_metadata(audio_env, tmp_path):
+    from models import Word
+    audio, word_audio, _synthesized = audio_env
+    word = Word(word='cab', meaning='出租车', language='en')
+    db.session.add(word)
+    db.session.commit()
+    service = _service(audio, word_audio, tmp_path)
+
+    tasks = [('cab', 'en', False, 0.0), ('cab', 'en', True, 0.3), ('出租车', 'zh', None, 0.0)]
+    assert service.enqueue(tasks, current_app._get_current_object(), [word.id]) == 3
+    service._executor.shutdown(wait=True)
+
+    rows = _rows(word.id)
+    for ident in [('word', 0.0), ('spell', 0.3), ('meaning', 0.0)]:
+        assert rows[ident].status == 'ready'
+        assert rows[ident].duration is not None
+
+
+def test_enqueue_without_app_leaves_metadata_alone(audio_env, tmp_path):
+    from models import Word
+    audio, word_audio, _synthesized = audio_env
+    word = Word(word='cab', meaning='出租车', language='en')
+    db.session.add(word)
+    db.session.commit()
+    service = _service(audio, word_audio, tmp_path)
+
+    service.enqueue([('cab', 'en', False, 0.0)])
+    service._executor.shutdown(wait=True)
+
+    assert audio.is_audio_cached('cab', 'en')
+    assert _rows(word.id) == {}
+
+
+def test_failed_render_is_marked_failed(audio_env, tmp_path, monkeypatch):
+    from models import Word
+    audio, word_audio, _synthesized = audio_env
+    word = Word(word='cab', meaning='出租车', language='en')
+    db.session.add(word)
+    db.session.commit()
+    service = _service(audio, word_audio, tmp_path)
+    monkeypatch.setattr(audio, 'generate_audio', lambda *args, **kwargs: None)
+
+    service.enqueue([('cab', 'en', False, 0.0)], current_app._get_current_object(), [word.id])
+    service._executor.shutdown(wait=True)
+
+    assert _rows(word.id)[('word', 0.0)].status == 'failed'
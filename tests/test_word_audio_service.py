@@ -0,0 +1,64 @@
+"""单词音频清理不得删除共享的片段音频
+
+单字母单词（如 "A"）的发音与拼读用的字母片段、单片段含义与其他含义的同名片段是同一个缓存键，
+删除或修改这样的单词时这些音频仍被其他单词使用，必须保留。
+"""
+from extensions import db
+
+
+def _add(word, meaning, language='en'):
+    from models import Word
+    row = Word(word=word, meaning=meaning, language=language)
+    db.session.add(row)
+    db.session.commit()
+    return row
+
+
+def _delete(word_audio, word):
+    stale = (word_audio.audio_keys(word), word.word, word.meaning)
+    db.session.delete(word)
+    db.session.commit()
+    return word_audio.discard_unused(*stale)
+
+
+def test_deleting_single_letter_word_keeps_letter_clip(audio_env):
+    audio, word_audio, synthesized = audio_env
+    letter = _add('A', '字母')
+    _add('cab', '出租车')
+    assert audio.generate_audio('A', 'en')
+    assert audio.generate_audio('cab', 'en', spell_mode=True, spell_delay=0.5)
+    word_audio.refresh([letter])
+
+    _delete(word_audio, letter)
+
+    assert audio.is_audio_cached('A', 'en')
+    synthesized.clear()
+    # 拼读另一个单词直接复用字母片段，不再合成
+    assert audio.generate_audio('bac', 'en', spell_mode=True, spell_delay=0.3)
+    assert synthesized == []
+
+
+def test_deleting_single_segment_meaning_keeps_shared_segment(audio_env):
+    audio, word_audio, synthesized = audio_env
+    apple = _add('apple', '苹果')
+    _add('fruit', '苹果，梨')
+    assert audio.generate_meaning_audio('苹果，梨')
+    word_audio.refresh([apple])
+
+    _delete(word_audio, apple)
+
+    synthesized.clear()
+    audio.cache.discard([audio.resolve_meaning_audio('苹果，梨')[1]])
+    # 重新拼接含义音频时各片段仍在缓存中
+    assert audio.generate_meaning_audio('苹果，梨')
+    assert synthesized == []
+
+
+def test_unshared_word_audio_is_discarded(audio_env):
+    audio, word_audio, _synthesized = audio_env
+    word = _add('banana', '香蕉')
+    assert audio.generate_audio('banana', 'en')
+    word_audio.refresh([word])
+
+    assert _delete(word_audio, word) >= 1
+    assert not audio.is_audio_cached('banana', 'en')